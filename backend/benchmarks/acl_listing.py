@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Listing latency under document ACLs.
+
+Seeds ``--rows`` document_permissions grants (1M by default) spread over the existing
+documents, users, roles and departments, then times the first listing page for a
+user with ACLs off, with the user's grants inlined as document IDs, and with the
+semi-join path used when a principal has more than ACL_INLINE_GRANTS_MAX grants.
+The seed runs in the benchmark's own transaction and is rolled back unless --keep is
+given. Run from the backend directory against a development database, e.g.:
+
+    python benchmarks/acl_listing.py --email user@example.com --search report
+"""
+from pathlib import Path
+import argparse
+import statistics
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import text  # noqa: E402
+
+from src.core.config import settings  # noqa: E402
+from src.core.database import SessionLocal  # noqa: E402
+from src.repositories.document_repository import DocumentRepository  # noqa: E402
+from src.repositories.permission_repository import PermissionRepository  # noqa: E402
+from src.repositories.user_repository import UserRepository  # noqa: E402
+
+# Every third grant goes to a user, a role and a department respectively
+SEED_GRANTS = text("""
+    WITH docs AS (SELECT array_agg(document_id) AS ids FROM documents),
+         usrs AS (SELECT array_agg(user_id) AS ids FROM users),
+         rols AS (SELECT array_agg(role_id) AS ids FROM roles),
+         dpts AS (SELECT array_agg(department_id) AS ids FROM departments)
+    INSERT INTO document_permissions (document_id, user_id, role_id, department_id, permission_type, granted_by)
+    SELECT docs.ids[1 + i % cardinality(docs.ids)],
+           CASE WHEN i % 3 = 0 THEN usrs.ids[1 + (i / 3) % cardinality(usrs.ids)] END,
+           CASE WHEN i % 3 = 1 THEN rols.ids[1 + (i / 3) % cardinality(rols.ids)] END,
+           CASE WHEN i % 3 = 2 THEN dpts.ids[1 + (i / 3) % cardinality(dpts.ids)] END,
+           'read', usrs.ids[1]
+    FROM generate_series(1, :rows) AS i, docs, usrs, rols, dpts
+""")
+
+
+def time_listing(repo: DocumentRepository, acl, search, runs: int):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        repo.get_documents_with_details(search=search, limit=100, acl=acl)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main(args) -> int:
+    db = SessionLocal()
+    try:
+        user = UserRepository(db).get_user_with_details(args.email)
+        if not user:
+            print(f"❌ No user {args.email}")
+            return 1
+
+        start = time.perf_counter()
+        seeded = db.execute(SEED_GRANTS, {"rows": args.rows}).rowcount
+        db.execute(text("ANALYZE document_permissions"))
+        db.execute(text("ANALYZE document_summary"))
+        print(f"🌱 Seeded {seeded} grant(s) in {time.perf_counter() - start:.1f}s")
+
+        # The listing never commits, so every run sees the uncommitted seed
+        repo = DocumentRepository(db)
+        context = PermissionRepository(db).get_grant_context(user["user_id"], args.inline)
+        semi_join = {**context, "is_admin": False, "document_ids": None}
+        inline = dict(semi_join)
+        if context["document_ids"] is None:
+            # More grants than fit inline: time the inline path with as many as would
+            inline["document_ids"] = [
+                str(row[0]) for row in db.execute(text("""
+                    SELECT document_id FROM document_permissions
+                    WHERE is_active AND user_id = CAST(:user_id AS uuid) LIMIT :limit
+                """), {"user_id": user["user_id"], "limit": args.inline}).fetchall()
+            ]
+        else:
+            inline["document_ids"] = context["document_ids"]
+
+        print(f"📊 {args.runs} listing(s) of 100 documents for {args.email}"
+              f"{f' searching {args.search!r}' if args.search else ''}")
+        for label, acl in (("ACL off", None),
+                           (f"inline ({len(inline['document_ids'])} IDs)", inline),
+                           ("semi-join", semi_join)):
+            time_listing(repo, acl, args.search, 2)  # Warm up caches and plans
+            timings = sorted(time_listing(repo, acl, args.search, args.runs))
+            p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+            print(f"   {label:<24} mean {statistics.mean(timings) * 1000:7.1f}ms   p99 {p99 * 1000:7.1f}ms")
+
+        if args.keep:
+            db.commit()
+            print("💾 Kept the seeded grants")
+        else:
+            db.rollback()
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--email", required=True, help="User whose grants filter the listing")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Grants to seed")
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--search", help="Full-text query to list with")
+    parser.add_argument("--inline", type=int, default=settings.ACL_INLINE_GRANTS_MAX,
+                        help="Granted document IDs to inline")
+    parser.add_argument("--keep", action="store_true", help="Commit the seeded grants")
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Concurrency benchmark for DocRepo read endpoints.
+
+Runs a closed-loop load at increasing concurrency levels and reports throughput and
+latency percentiles per level. With the async database path, throughput should keep
+rising with concurrency until the connection pool or database saturates, instead of
+flattening at the size of the sync thread pool. Start the API first, then run from
+the backend directory, e.g.:
+
+    python benchmarks/concurrency.py --email user@example.com --password secret
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+import httpx
+
+from login_burst import percentile
+
+
+async def worker(client, path, headers, deadline, samples, errors):
+    """Issue requests back to back until the deadline"""
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            response = await client.get(path, headers=headers)
+            if response.status_code != 200:
+                errors[response.status_code] = errors.get(response.status_code, 0) + 1
+                continue
+        except httpx.HTTPError as e:
+            errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+            continue
+        samples.append(time.perf_counter() - start)
+
+
+async def run_level(client, path, headers, concurrency, duration):
+    samples, errors = [], {}
+    deadline = time.perf_counter() + duration
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(client, path, headers, deadline, samples, errors)
+                           for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return samples, errors, elapsed
+
+
+async def main(args) -> int:
+    levels = [int(level) for level in args.levels.split(",")]
+    limits = httpx.Limits(max_connections=max(levels) + 5)
+    async with httpx.AsyncClient(base_url=args.url, timeout=60, limits=limits) as client:
+        response = await client.post("/api/auth/login", json={"email": args.email, "password": args.password})
+        if response.status_code != 200:
+            print(f"❌ Login failed ({response.status_code}): {response.text}")
+            return 1
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        # Warm up connection pools and caches
+        await run_level(client, args.path, headers, 4, 1.0)
+
+        print(f"📊 GET {args.path}, {args.duration:.0f}s per level")
+        print(f"{'conc':>5} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9}  errors")
+        for concurrency in levels:
+            samples, errors, elapsed = await run_level(client, args.path, headers, concurrency, args.duration)
+            print(f"{concurrency:>5} {len(samples) / elapsed:>9.1f} {percentile(samples, 50) * 1000:>9.1f} "
+                  f"{percentile(samples, 99) * 1000:>9.1f}  {errors or '-'}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8088")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--path", default="/api/documents?limit=20", help="Endpoint to load")
+    parser.add_argument("--levels", default="1,4,16,32,64", help="Comma-separated concurrency levels")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per level")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Login burst benchmark for DocRepo.
+
+Measures the latency of an unrelated endpoint while a burst of logins is running,
+to check that password hashing no longer stalls the event loop. Start the API
+first, then run from the backend directory, e.g.:
+
+    python benchmarks/login_burst.py --email user@example.com --password secret
+
+Expect the probe's p99 during the burst to stay close to the baseline; logins
+beyond PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE_SIZE are answered with 503.
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+import httpx
+
+
+def percentile(samples, pct):
+    if not samples:
+        return float("nan")
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def report(label, samples):
+    print(f"{label:<18} n={len(samples):<5} p50={percentile(samples, 50) * 1000:8.1f}ms "
+          f"p99={percentile(samples, 99) * 1000:8.1f}ms max={max(samples, default=0) * 1000:8.1f}ms")
+
+
+async def probe(client, path, headers, stop, samples, interval):
+    """Hit an unrelated endpoint at a steady rate until stopped"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        response = await client.get(path, headers=headers)
+        response.raise_for_status()
+        samples.append(time.perf_counter() - start)
+        await asyncio.sleep(interval)
+
+
+async def login(client, email, password, statuses):
+    response = await client.post("/api/auth/login", json={"email": email, "password": password})
+    statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    return response
+
+
+async def main(args) -> int:
+    limits = httpx.Limits(max_connections=args.logins + 10)
+    async with httpx.AsyncClient(base_url=args.url, timeout=60, limits=limits) as client:
+        response = await login(client, args.email, args.password, {})
+        if response.status_code != 200:
+            print(f"❌ Login failed ({response.status_code}): {response.text}")
+            return 1
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        # Baseline: probe alone
+        baseline = []
+        stop = asyncio.Event()
+        task = asyncio.create_task(probe(client, args.probe, headers, stop, baseline, args.interval))
+        await asyncio.sleep(args.duration)
+        stop.set()
+        await task
+
+        # Burst: the same probe while logins run concurrently
+        during = []
+        statuses = {}
+        stop = asyncio.Event()
+        task = asyncio.create_task(probe(client, args.probe, headers, stop, during, args.interval))
+        burst_start = time.perf_counter()
+        await asyncio.gather(*(login(client, args.email, args.password, statuses)
+                               for _ in range(args.logins)))
+        burst_time = time.perf_counter() - burst_start
+        stop.set()
+        await task
+
+    print(f"🔐 {args.logins} concurrent logins finished in {burst_time:.2f}s, status codes: {statuses}")
+    report(f"{args.probe} idle", baseline)
+    report(f"{args.probe} burst", during)
+    if baseline and during:
+        print(f"📈 p99 ratio burst/idle: {percentile(during, 99) / percentile(baseline, 99):.2f}x "
+              f"(mean {statistics.mean(during) * 1000:.1f}ms vs {statistics.mean(baseline) * 1000:.1f}ms)")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8088")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--logins", type=int, default=200, help="Concurrent logins in the burst")
+    parser.add_argument("--probe", default="/api/tags", help="Unrelated authenticated endpoint to time")
+    parser.add_argument("--interval", type=float, default=0.01, help="Seconds between probe requests")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds of baseline probing")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Round trips per document update.
+
+Counts the SQL statements and commits DocumentService.update_document issues for a
+metadata-only edit of an existing document, using the app's own engine. The edit
+rewrites the document's current title, description and tags, so it only adds
+versions. Run from the backend directory against a development database, e.g.:
+
+    python benchmarks/update_round_trips.py --document-id <uuid> --email user@example.com
+"""
+from pathlib import Path
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import event  # noqa: E402
+
+from src.core.database import SessionLocal, engine  # noqa: E402
+from src.repositories.user_repository import UserRepository  # noqa: E402
+from src.services.document_service import DocumentService  # noqa: E402
+
+
+async def main(args) -> int:
+    counts = {"statements": 0, "commits": 0}
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_statement(*_):
+        counts["statements"] += 1
+
+    @event.listens_for(engine, "commit")
+    def count_commit(*_):
+        counts["commits"] += 1
+
+    db = SessionLocal()
+    try:
+        user = UserRepository(db).get_user_with_details(args.email)
+        if not user:
+            print(f"❌ No user {args.email}")
+            return 1
+        service = DocumentService(db)
+        document = service.get_document_details(args.document_id)
+        if not document:
+            print(f"❌ No document {args.document_id}")
+            return 1
+
+        per_update, timings = [], []
+        for _ in range(args.updates):
+            counts.update(statements=0, commits=0)
+            start = time.perf_counter()
+            await service.update_document(
+                document_id=args.document_id, title=document["title"],
+                description=document["description"], tags=[],
+                existing_tags=document["tags"], current_user_id=user["user_id"]
+            )
+            timings.append(time.perf_counter() - start)
+            per_update.append(dict(counts))
+    finally:
+        db.close()
+
+    print(f"📊 {args.updates} update(s) of a document with {len(document['tags'])} tag(s)")
+    print(f"   statements per update: {statistics.mean(c['statements'] for c in per_update):.1f}")
+    print(f"   commits per update:    {statistics.mean(c['commits'] for c in per_update):.1f}")
+    print(f"   mean latency:          {statistics.mean(timings) * 1000:.1f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--document-id", required=True)
+    parser.add_argument("--email", required=True, help="User recorded as the editor")
+    parser.add_argument("--updates", type=int, default=20)
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,39 @@
+"""
+Gunicorn configuration for multi-process production serving.
+
+    gunicorn -c gunicorn.conf.py main_production_fast:app
+
+Workers run uvicorn's ASGI worker. With WEB_PRELOAD the app and its routers are
+imported once in the master, so workers fork warm and share those pages; each
+worker then opens its own database pools, sized from DB_CONNECTION_BUDGET.
+"""
+from src.core.config import settings
+
+bind = f"{settings.HOST}:{settings.PORT}"
+workers = max(1, settings.WEB_WORKERS)
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = settings.WEB_PRELOAD
+
+# On SIGTERM workers stop accepting connections, finish in-flight requests and run the
+# app's shutdown hooks; anything still running after graceful_timeout is killed
+graceful_timeout = settings.WEB_GRACEFUL_TIMEOUT
+timeout = 120
+keepalive = 5
+
+accesslog = None
+errorlog = "-"
+loglevel = "info"
+
+
+def when_ready(server):
+    """Runs in the master after the app is loaded and before workers are forked"""
+    if preload_app:
+        import main_production_fast
+        main_production_fast.load_routers(main_production_fast.app)
+    print(f"🚀 Serving with {workers} workers (preload={'on' if preload_app else 'off'})")
+
+
+def post_fork(server, worker):
+    """Make sure no worker reuses a database connection opened before the fork"""
+    from src.core.database import dispose_inherited_pools
+    dispose_inherited_pools()
@@ -2,6 +2,8 @@
 """
 PRODUCTION FAST SERVER - Optimized startup with lazy loading
 """
+import asyncio
+import os
 import time
 import uvicorn
 from contextlib import asynccontextmanager
@@ -10,39 +12,65 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 
+# A direct run is a single process; settings are read on the first src import below,
+# so the DB pools must be sized for one worker before then
+if __name__ == "__main__":
+    os.environ["WEB_WORKERS"] = "1"
+
 # Global variables for lazy loading
 routers_loaded = False
 
+def load_routers(app: FastAPI) -> None:
+    """Import and register the API routers once; gunicorn calls this before forking workers"""
+    global routers_loaded
+    if routers_loaded:
+        return
+    
+    print("📦 Loading routers...")
+    load_start = time.time()
+    
+    # Import and load routers
+    from src.controllers.auth_controller import auth_router
+    from src.controllers.document_controller import document_router
+    from src.controllers.tag_controller import tag_router
+    from src.controllers.department_controller import department_router
+    from src.controllers.role_controller import role_router
+    from src.controllers.upload_controller import upload_router
+    from src.controllers.audit_controller import audit_router
+    from src.controllers.user_controller import user_router
+    
+    # Include routers with API prefix
+    app.include_router(auth_router, prefix="/api")
+    app.include_router(document_router, prefix="/api")
+    app.include_router(tag_router, prefix="/api")
+    app.include_router(department_router, prefix="/api")
+    app.include_router(role_router, prefix="/api")
+    app.include_router(upload_router, prefix="/api")
+    app.include_router(audit_router, prefix="/api")
+    app.include_router(user_router, prefix="/api")
+    
+    routers_loaded = True
+    load_time = time.time() - load_start
+    print(f"✅ Routers loaded in {load_time:.3f}s")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Modern FastAPI lifespan events - replaces on_event."""
-    global routers_loaded
-    
     # Startup
-    print("🚀 Server starting up...")
+    print(f"🚀 Server starting up (pid {os.getpid()})...")
     startup_time = time.time()
     
-    if not routers_loaded:
-        print("📦 Loading routers...")
-        load_start = time.time()
-        
-        # Import and load routers
-        from src.controllers.auth_controller import auth_router
-        from src.controllers.document_controller import document_router
-        from src.controllers.tag_controller import tag_router
-        from src.controllers.department_controller import department_router
-        from src.controllers.role_controller import role_router
-        
-        # Include routers with API prefix
-        app.include_router(auth_router, prefix="/api")
-        app.include_router(document_router, prefix="/api")
-        app.include_router(tag_router, prefix="/api")
-        app.include_router(department_router, prefix="/api")
-        app.include_router(role_router, prefix="/api")
-        
-        routers_loaded = True
-        load_time = time.time() - load_start
-        print(f"✅ Routers loaded in {load_time:.3f}s")
+    load_routers(app)
+    
+    # Expire abandoned resumable uploads in the background
+    from src.services.upload_service import run_session_sweeper
+    sweeper = asyncio.create_task(run_session_sweeper())
+    
+    # Audit events are written in batches by a per-process background thread, into
+    # monthly partitions created (and expired) ahead of time
+    from src.services.audit_service import start_audit_logger, run_partition_maintenance
+    start_audit_logger()
+    partitioner = asyncio.create_task(run_partition_maintenance())
     
     total_startup = time.time() - startup_time
     print(f"🎯 Total startup time: {total_startup:.3f}s")
@@ -51,6 +79,16 @@ async def lifespan(app: FastAPI):
     
     # Shutdown
     print("🛑 Server shutting down...")
+    sweeper.cancel()
+    partitioner.cancel()
+    from src.services.audit_service import shutdown_audit_logger
+    shutdown_audit_logger()
+    from src.services.content_extraction_service import shutdown_extraction_workers
+    shutdown_extraction_workers()
+    from src.core.auth import shutdown_password_hashing
+    shutdown_password_hashing()
+    from src.core.database import dispose_async_engines
+    await dispose_async_engines()
 
 # Create FastAPI app with lifespan
 app = FastAPI(
@@ -76,8 +114,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "Content-Range", "Accept-Ranges", "Content-Disposition",
+                    "X-Primary-Until"],
 )
 
+# After a write, the client reads from the primary for a few seconds (read-your-writes)
+from src.core.config import settings as app_settings
+if app_settings.DATABASE_REPLICA_URLS:
+    from src.core.db_routing import PrimaryPinMiddleware
+    app.add_middleware(PrimaryPinMiddleware)
+
 # Fast health checks (no database imports needed)
 @app.get("/")
 async def root():
@@ -102,6 +148,24 @@ async def api_health():
         "api_ready": True
     }
 
+@app.get("/api/status")
+async def server_status():
+    """Serving configuration of this worker: process counts, database pool sizes and audit queue."""
+    from src.core.config import settings
+    from src.core.database import pool_status
+    from src.services.audit_service import audit_logger
+    
+    return {
+        "status": "ok",
+        "pid": os.getpid(),
+        "workers": settings.WEB_WORKERS,
+        "preload": settings.WEB_PRELOAD,
+        "graceful_timeout": settings.WEB_GRACEFUL_TIMEOUT,
+        "routers_loaded": routers_loaded,
+        "database_pools": pool_status(),
+        "audit": audit_logger.status()
+    }
+
 # Database health check (lazy loaded)
 @app.get("/api/db-health")
 async def database_health():
@@ -130,6 +194,7 @@ async def database_health():
         return {"status": "error", "database": "disconnected", "error": str(e)}
 
 if __name__ == "__main__":
+    # Single process (development); production runs gunicorn -c gunicorn.conf.py
     print("🚀 Starting PRODUCTION FAST server...")
     from src.core.config import Settings
     settings = Settings()
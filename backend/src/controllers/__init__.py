@@ -3,11 +3,15 @@ from .document_controller import document_router
 from .tag_controller import tag_router
 from .department_controller import department_router
 from .role_controller import role_router
+from .upload_controller import upload_router
+from .audit_controller import audit_router
 
 __all__ = [
     "auth_router",
     "document_router",
     "tag_router",
     "department_router", 
-    "role_router"
+    "role_router",
+    "upload_router",
+    "audit_router"
 ]
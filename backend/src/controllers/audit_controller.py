@@ -0,0 +1,49 @@
+from fastapi import APIRouter, HTTPException, Depends, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..core.db_routing import get_read_db
+from ..services.audit_service import AsyncAuditService
+from ..schemas import AuditEventResponse
+from ..core.auth import get_current_active_user
+from ..core.acl import is_admin as is_admin_user
+from datetime import datetime
+from typing import List, Optional
+
+audit_router = APIRouter(prefix="/audit", tags=["audit"])
+
+@audit_router.get("", response_model=List[AuditEventResponse])
+async def get_audit_trail(
+    response: Response,
+    document_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+    since: Optional[datetime] = None,  # Inclusive; defaults to 30 days before until
+    until: Optional[datetime] = None,  # Exclusive; defaults to now
+    limit: int = 100,
+    cursor: Optional[str] = None,  # Opaque keyset cursor from X-Next-Cursor
+    current_user: dict = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get the audit trail of a document or user within a time window, newest first.
+    
+    The cursor for the following page is returned in the ``X-Next-Cursor`` header.
+    """
+    # Only administrators may read document trails and other users' trails
+    is_admin = is_admin_user(current_user)
+    if not is_admin and (document_id or (user_id and user_id != current_user["user_id"])):
+        raise HTTPException(status_code=403, detail="Only administrators can read this audit trail")
+    if not is_admin:
+        user_id = current_user["user_id"]
+    
+    try:
+        audit_service = AsyncAuditService(db)
+        events = await audit_service.get_audit_trail(
+            document_id=document_id, user_id=user_id, since=since, until=until,
+            limit=limit, cursor=cursor
+        )
+        next_cursor = audit_service.get_next_cursor(events, limit)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return events
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch audit trail: {str(e)}")
@@ -1,10 +1,12 @@
 from fastapi import APIRouter, HTTPException, Depends, status
 from fastapi.security import HTTPBearer
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..core.database import get_db
-from ..services.user_service import UserService
-from ..schemas import UserCreate, UserLogin, Token, UserResponse
-from ..core.auth import get_current_active_user
+from ..core.db_routing import get_read_db
+from ..services.user_service import UserService, AsyncUserService
+from ..schemas import UserCreate, UserLogin, Token, UserResponse, RefreshRequest
+from ..core.auth import get_current_active_user, PasswordHashingBusy
 
 auth_router = APIRouter(prefix="/auth", tags=["authentication"])
 security = HTTPBearer()
@@ -15,8 +17,10 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     """Register a new user"""
     try:
         user_service = UserService(db)
-        result = user_service.register_user(user_data)
+        result = await user_service.register_user(user_data)
         return result
+    except PasswordHashingBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -26,51 +30,65 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
 @auth_router.post("/login", response_model=Token)
 async def login(user_data: UserLogin, db: Session = Depends(get_db)):
     """Login user"""
-    import time
-    start_time = time.time()
-    print(f"🔍 Login request started for: {user_data.email}")
-    
     try:
-        db_start = time.time()
         user_service = UserService(db)
-        db_time = time.time() - db_start
-        print(f"🔍 UserService created in {db_time:.3f}s")
-        
-        auth_start = time.time()
-        result = user_service.authenticate_user(user_data.email, user_data.password)
-        auth_time = time.time() - auth_start
-        print(f"🔍 Authentication took {auth_time:.3f}s")
-        
+        result = await user_service.authenticate_user(user_data.email, user_data.password)
         if not result:
-            print(f"🔍 Authentication failed for {user_data.email}")
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect email or password",
                 headers={"WWW-Authenticate": "Bearer"},
             )
-        
-        total_time = time.time() - start_time
-        print(f"🔍 Total login time: {total_time:.3f}s")
         return result
+    except PasswordHashingBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     except ValueError as e:
-        print(f"🔍 ValueError in login: {e}")
         raise HTTPException(status_code=400, detail=str(e))
     except HTTPException:
         raise
     except Exception as e:
-        print(f"🔍 Exception in login: {e}")
         raise HTTPException(status_code=500, detail=f"Login failed: {str(e)}")
 
 
+@auth_router.post("/refresh", response_model=Token)
+def refresh(refresh_request: RefreshRequest, db: Session = Depends(get_db)):
+    """Get a new access token (and rotated refresh token) without logging in again"""
+    try:
+        user_service = UserService(db)
+        result = user_service.refresh_session(refresh_request.refresh_token)
+        if not result:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid or expired refresh token",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        return result
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Token refresh failed: {str(e)}")
+
+
+@auth_router.post("/logout")
+def logout(refresh_request: RefreshRequest, db: Session = Depends(get_db)):
+    """Revoke a refresh token's session"""
+    try:
+        user_service = UserService(db)
+        user_service.logout(refresh_request.refresh_token)
+        return {"message": "Logged out successfully"}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Logout failed: {str(e)}")
+
+
 @auth_router.get("/me", response_model=UserResponse)
 async def get_current_user_info(
     current_user: dict = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get current user information"""
     try:
-        user_service = UserService(db)
-        user_info = user_service.get_current_user(current_user["email"])
+        user_service = AsyncUserService(db)
+        user_info = await user_service.get_current_user(current_user["email"])
         
         if not user_info:
             raise HTTPException(status_code=404, detail="User not found")
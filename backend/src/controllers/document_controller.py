@@ -1,12 +1,25 @@
-from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Form, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..core.database import get_db
-from ..services.document_service import DocumentService
-from ..schemas import DocumentCreate, DocumentResponse, DocumentVersionResponse
+from ..core.db_routing import get_read_db
+from ..services.document_service import DocumentService, AsyncDocumentService
+from ..services.bulk_ingest_service import BulkIngestService, parse_manifest
+from ..services.export_service import ExportService, stream_zip
+from ..services.audit_service import record_audit_event
+from ..services.permission_service import PermissionService
+from ..schemas import (DocumentCreate, DocumentResponse, DocumentVersionResponse, BulkIngestResponse, ExportRequest,
+                       PermissionGrantRequest, PermissionResponse)
 from ..core.auth import get_current_active_user
+from ..core.acl import get_document_acl
+from ..core.storage import FileTooLargeError
+from ..core.config import settings
+from ..core.file_responses import file_response, make_etag, BODY_STATUSES, IMMUTABLE_CACHE_CONTROL
 from pathlib import Path
+from datetime import datetime
 from typing import List, Optional
+import zipfile
 from pydantic import BaseModel
 
 document_router = APIRouter(prefix="/documents", tags=["documents"])
@@ -20,8 +33,15 @@ class AddTagsRequest(BaseModel):
     tags: List[str]
 
 
+def _check_readable(document_service: DocumentService, document_id: str, acl: Optional[dict]) -> None:
+    """Answer 404 for documents the principal may not read, as if they did not exist"""
+    if acl and not acl["is_admin"] and not document_service.document_exists(document_id, acl):
+        raise HTTPException(status_code=404, detail="Document not found")
+
+
 @document_router.post("", response_model=DocumentResponse)
 async def create_document(
+    request: Request,
     title: str = Form(...),
     description: Optional[str] = Form(None),
     tags: str = Form(""),  # Comma-separated tags
@@ -35,7 +55,7 @@ async def create_document(
         tag_list = [tag.strip() for tag in tags.split(",") if tag.strip()] if tags else []
         
         document_service = DocumentService(db)
-        result = document_service.create_document(
+        result = await document_service.create_document(
             title=title,
             description=description,
             tags=tag_list,
@@ -43,30 +63,131 @@ async def create_document(
             current_user_id=current_user["user_id"]
         )
         
+        record_audit_event("create", result["document_id"], current_user["user_id"], request,
+                           new_values={"title": title, "tags": tag_list})
         return result
+    except FileTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create document: {str(e)}")
 
 
+@document_router.post("/bulk", response_model=BulkIngestResponse)
+async def bulk_create_documents(
+    request: Request,
+    files: List[UploadFile] = File(None),
+    archive: Optional[UploadFile] = File(None),  # ZIP, optionally with a manifest.json
+    manifest: Optional[str] = Form(None),  # JSON list of {file_name, title, description, tags}
+    tags: str = Form(""),  # Comma-separated tags applied to every document
+    current_user: dict = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Create many documents from several files or a ZIP archive, reporting each item"""
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > settings.BULK_INGEST_MAX_BYTES:
+        raise HTTPException(status_code=413,
+                            detail=f"Request exceeds the maximum of {settings.BULK_INGEST_MAX_BYTES} bytes")
+    if bool(files) == bool(archive):
+        raise HTTPException(status_code=400, detail="Send either files or a single archive")
+    try:
+        common_tags = [tag.strip() for tag in tags.split(",") if tag.strip()] if tags else []
+        manifest_entries = parse_manifest(manifest)
+        
+        bulk_service = BulkIngestService(db)
+        if archive:
+            with zipfile.ZipFile(archive.file) as zip_archive:
+                items = bulk_service.items_from_archive(zip_archive, manifest_entries, common_tags)
+                report = await bulk_service.ingest(items, current_user["user_id"])
+        else:
+            items = bulk_service.items_from_files(files, manifest_entries, common_tags)
+            report = await bulk_service.ingest(items, current_user["user_id"])
+        
+        for item in report["items"]:
+            if item["document_id"]:
+                record_audit_event("create", item["document_id"], current_user["user_id"], request,
+                                   new_values={"file_name": item["file_name"], "bulk": True})
+        return report
+    except zipfile.BadZipFile:
+        raise HTTPException(status_code=400, detail="Archive is not a valid ZIP file")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to ingest documents: {str(e)}")
+
+
+@document_router.post("/export")
+async def export_documents(
+    export_request: ExportRequest,
+    request: Request,
+    current_user: dict = Depends(get_current_active_user),
+    acl: Optional[dict] = Depends(get_document_acl),
+    db: Session = Depends(get_db)
+):
+    """Download many documents or versions as one ZIP, streamed while it is built"""
+    try:
+        export_service = ExportService(db)
+        entries = export_service.get_export_entries(
+            search=export_request.search,
+            tag_filter=export_request.tags,
+            document_ids=export_request.document_ids,
+            version_ids=export_request.version_ids,
+            acl=acl
+        )
+        if not entries:
+            raise HTTPException(status_code=404, detail="No documents match the export")
+        
+        def record_download(entry: dict) -> None:
+            record_audit_event("download", entry["document_id"], current_user["user_id"], request,
+                               new_values={"version_id": entry["version_id"], "export": True})
+        
+        file_name = f"documents-{datetime.now().strftime('%Y%m%d-%H%M%S')}.zip"
+        return StreamingResponse(
+            stream_zip(entries, on_exported=record_download),
+            media_type="application/zip",
+            headers={"Content-Disposition": f'attachment; filename="{file_name}"'}
+        )
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to export documents: {str(e)}")
+
+
 @document_router.get("", response_model=List[DocumentResponse])
 async def get_documents(
+    response: Response,
     search: Optional[str] = None,
     tags: Optional[str] = None,  # Changed from 'tag' to 'tags' for multiple tags
     limit: int = 100,
     offset: int = 0,
+    cursor: Optional[str] = None,  # Opaque keyset cursor from X-Next-Cursor; overrides offset
+    sort: str = "newest",  # "newest" or "relevance" (ranked full-text matches)
     current_user: dict = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    acl: Optional[dict] = Depends(get_document_acl),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get documents with optional search and filtering"""
+    """Get documents with optional search and filtering.
+    
+    The cursor for the following page is returned in the ``X-Next-Cursor`` header.
+    """
     try:
-        document_service = DocumentService(db)
-        documents = document_service.get_documents(
+        document_service = AsyncDocumentService(db)
+        documents = await document_service.get_documents(
             search=search,
             tag_filter=tags,  # Pass the tags string to service
             limit=limit,
-            offset=offset
+            offset=offset,
+            cursor=cursor,
+            sort=sort,
+            acl=acl
         )
+        next_cursor = document_service.get_next_cursor(documents, limit)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
         return documents
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch documents: {str(e)}")
 
@@ -74,17 +195,20 @@ async def get_documents(
 @document_router.get("/{document_id}", response_model=DocumentResponse)
 async def get_document(
     document_id: str,
+    request: Request,
     current_user: dict = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    acl: Optional[dict] = Depends(get_document_acl),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get a specific document"""
     try:
-        document_service = DocumentService(db)
-        document = document_service.get_document_details(document_id)
+        document_service = AsyncDocumentService(db)
+        document = await document_service.get_document_details(document_id, acl)
         
         if not document:
             raise HTTPException(status_code=404, detail="Document not found")
         
+        record_audit_event("view", document_id, current_user["user_id"], request)
         return document
     except HTTPException:
         raise
@@ -96,18 +220,18 @@ async def get_document(
 async def get_document_versions(
     document_id: str,
     current_user: dict = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    acl: Optional[dict] = Depends(get_document_acl),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all versions of a document"""
     try:
-        document_service = DocumentService(db)
+        document_service = AsyncDocumentService(db)
         
         # Check if document exists
-        document = document_service.get_document_details(document_id)
-        if not document:
+        if not await document_service.document_exists(document_id, acl):
             raise HTTPException(status_code=404, detail="Document not found")
         
-        versions = document_service.get_document_versions(document_id)
+        versions = await document_service.get_document_versions(document_id)
         return versions
     except HTTPException:
         raise
@@ -119,22 +243,29 @@ async def get_document_versions(
 async def set_current_version(
     document_id: str,
     version_id: str,
+    request: Request,
     current_user: dict = Depends(get_current_active_user),
+    acl: Optional[dict] = Depends(get_document_acl),
     db: Session = Depends(get_db)
 ):
     """Set a specific version as the current version"""
     try:
         document_service = DocumentService(db)
         
-        # Check if document exists
-        document = document_service.get_document_details(document_id)
-        if not document:
+        # Check if document exists; unreadable documents look missing
+        if not document_service.document_exists(document_id, acl):
             raise HTTPException(status_code=404, detail="Document not found")
         
+        previous_version_id = next(
+            (v["version_id"] for v in document_service.get_document_versions(document_id) if v["is_current"]), None
+        )
         success = document_service.set_current_version(document_id, version_id)
         if not success:
             raise HTTPException(status_code=400, detail="Failed to set current version")
         
+        record_audit_event("update", document_id, current_user["user_id"], request,
+                           old_values={"current_version_id": previous_version_id},
+                           new_values={"current_version_id": version_id})
         return {"message": "Current version updated successfully"}
     except HTTPException:
         raise
@@ -145,12 +276,14 @@ async def set_current_version(
 @document_router.put("/{document_id}")
 async def update_document(
     document_id: str,
+    request: Request,
     title: str = Form(...),
     description: Optional[str] = Form(None),
     tags: str = Form(""),
     existing_tags: str = Form(""),
     file: Optional[UploadFile] = File(None),
     current_user: dict = Depends(get_current_active_user),
+    acl: Optional[dict] = Depends(get_document_acl),
     db: Session = Depends(get_db)
 ):
     """Update document details and optionally add a new version"""
@@ -160,13 +293,10 @@ async def update_document(
         existing_tag_list = [tag.strip() for tag in existing_tags.split(",") if tag.strip()] if existing_tags else []
         
         document_service = DocumentService(db)
+        _check_readable(document_service, document_id, acl)
         
-        # Check if document exists
-        document = document_service.get_document_details(document_id)
-        if not document:
-            raise HTTPException(status_code=404, detail="Document not found")
-        
-        result = document_service.update_document(
+        # One transaction; returns None if the document does not exist
+        result = await document_service.update_document(
             document_id=document_id,
             title=title,
             description=description,
@@ -177,11 +307,19 @@ async def update_document(
         )
         
         if not result:
-            raise HTTPException(status_code=400, detail="Failed to update document")
+            raise HTTPException(status_code=404, detail="Document not found")
         
+        record_audit_event("update", document_id, current_user["user_id"], request,
+                           new_values={"title": title, "tags": result["tags"],
+                                       "version_number": result["version_number"],
+                                       "new_file": file.filename if file else None})
         return result
     except HTTPException:
         raise
+    except FileTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to update document: {str(e)}")
 
@@ -189,14 +327,17 @@ async def update_document(
 @document_router.delete("/{document_id}")
 async def delete_document(
     document_id: str,
+    request: Request,
     current_user: dict = Depends(get_current_active_user),
+    acl: Optional[dict] = Depends(get_document_acl),
     db: Session = Depends(get_db)
 ):
     """Delete a document"""
     try:
         document_service = DocumentService(db)
+        _check_readable(document_service, document_id, acl)
         
-        # Check if document exists
+        # Check if document exists; the versions it loads are reused to clean up files
         document = document_service.get_document_details(document_id)
         if not document:
             raise HTTPException(status_code=404, detail="Document not found")
@@ -205,6 +346,8 @@ async def delete_document(
         if not success:
             raise HTTPException(status_code=400, detail="Failed to delete document")
         
+        record_audit_event("delete", document_id, current_user["user_id"], request,
+                           old_values={"title": document["title"], "tags": document["tags"]})
         return {"message": "Document deleted successfully"}
     except HTTPException:
         raise
@@ -215,13 +358,15 @@ async def delete_document(
 @document_router.get("/{document_id}/download")
 async def download_document(
     document_id: str,
+    request: Request,
     current_user: dict = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    acl: Optional[dict] = Depends(get_document_acl),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Download the current version of a document"""
     try:
-        document_service = DocumentService(db)
-        version_info = document_service.get_document_for_download(document_id)
+        document_service = AsyncDocumentService(db)
+        version_info = await document_service.get_document_for_download(document_id, acl=acl)
         
         if not version_info:
             raise HTTPException(status_code=404, detail="Document not found")
@@ -230,11 +375,18 @@ async def download_document(
         if not file_path.exists():
             raise HTTPException(status_code=404, detail="File not found on server")
         
-        return FileResponse(
-            path=str(file_path),
-            filename=version_info["file_name"],
-            media_type=version_info["file_type"] or 'application/octet-stream'
+        # Revalidates on every use: the current version can change
+        response = file_response(
+            request, file_path,
+            file_name=version_info["file_name"],
+            media_type=version_info["file_type"],
+            etag=make_etag(version_info["checksum"], version_info["version_id"]),
+            last_modified=version_info["uploaded_at"]
         )
+        if response.status_code in BODY_STATUSES:
+            record_audit_event("download", document_id, current_user["user_id"], request,
+                               new_values={"version_id": version_info["version_id"]})
+        return response
     except HTTPException:
         raise
     except Exception as e:
@@ -245,13 +397,15 @@ async def download_document(
 async def download_document_version(
     document_id: str,
     version_id: str,
+    request: Request,
     current_user: dict = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    acl: Optional[dict] = Depends(get_document_acl),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Download a specific version of a document"""
     try:
-        document_service = DocumentService(db)
-        version_info = document_service.get_document_for_download(document_id, version_id)
+        document_service = AsyncDocumentService(db)
+        version_info = await document_service.get_document_for_download(document_id, version_id, acl=acl)
         
         if not version_info:
             raise HTTPException(status_code=404, detail="Document version not found")
@@ -260,11 +414,19 @@ async def download_document_version(
         if not file_path.exists():
             raise HTTPException(status_code=404, detail="File not found on server")
         
-        return FileResponse(
-            path=str(file_path),
-            filename=version_info["file_name"],
-            media_type=version_info["file_type"] or 'application/octet-stream'
+        # A version's content never changes, so clients may cache it indefinitely
+        response = file_response(
+            request, file_path,
+            file_name=version_info["file_name"],
+            media_type=version_info["file_type"],
+            etag=make_etag(version_info["checksum"], version_info["version_id"]),
+            last_modified=version_info["uploaded_at"],
+            cache_control=IMMUTABLE_CACHE_CONTROL
         )
+        if response.status_code in BODY_STATUSES:
+            record_audit_event("download", document_id, current_user["user_id"], request,
+                               new_values={"version_id": version_info["version_id"]})
+        return response
     except HTTPException:
         raise
     except Exception as e:
@@ -275,15 +437,18 @@ async def download_document_version(
 async def add_document_tags(
     document_id: str,
     request: AddTagsRequest,
+    http_request: Request,
     current_user: dict = Depends(get_current_active_user),
+    acl: Optional[dict] = Depends(get_document_acl),
     db: Session = Depends(get_db)
 ):
     """Add tags to an existing document"""
     try:
         document_service = DocumentService(db)
+        _check_readable(document_service, document_id, acl)
         
         # Get current document to preserve existing tags
-        document_details = document_service.get_document_details(document_id)
+        document_details = document_service.get_document_with_tags(document_id)
         if not document_details:
             raise HTTPException(status_code=404, detail="Document not found")
         
@@ -294,7 +459,7 @@ async def add_document_tags(
         all_tags = list(set(existing_tags + request.tags))
         
         # Update document with combined tags
-        result = document_service.update_document(
+        result = await document_service.update_document(
             document_id=document_id,
             title=document_details['title'],
             description=document_details['description'],
@@ -304,6 +469,8 @@ async def add_document_tags(
         )
         
         if result:
+            record_audit_event("update", document_id, current_user["user_id"], http_request,
+                               old_values={"tags": existing_tags}, new_values={"tags": all_tags})
             return {"message": "Tags added successfully", "tags": all_tags}
         else:
             raise HTTPException(status_code=500, detail="Failed to add tags")
@@ -312,3 +479,79 @@ async def add_document_tags(
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to add tags: {str(e)}")
+
+
+@document_router.get("/{document_id}/permissions", response_model=List[PermissionResponse])
+async def get_document_permissions(
+    document_id: str,
+    current_user: dict = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Get a document's active grants"""
+    try:
+        permissions = PermissionService(db).get_permissions(document_id, current_user)
+        if permissions is None:
+            raise HTTPException(status_code=404, detail="Document not found")
+        return permissions
+    except HTTPException:
+        raise
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch permissions: {str(e)}")
+
+
+@document_router.post("/{document_id}/permissions", response_model=PermissionResponse)
+async def grant_document_permission(
+    document_id: str,
+    grant: PermissionGrantRequest,
+    request: Request,
+    current_user: dict = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Grant a user, role or department access to a document, which restricts it to its grantees"""
+    try:
+        permission = PermissionService(db).grant_permission(
+            document_id, current_user, grant.permission_type,
+            user_id=grant.user_id, role_id=grant.role_id, department_id=grant.department_id
+        )
+        if permission is None:
+            raise HTTPException(status_code=404, detail="Document not found")
+        
+        record_audit_event("update", document_id, current_user["user_id"], request,
+                           new_values={"permission_granted": permission["permission_id"]})
+        return permission
+    except HTTPException:
+        raise
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except ValueError as e:
+        status_code = 409 if "already granted" in str(e) else 400
+        raise HTTPException(status_code=status_code, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to grant permission: {str(e)}")
+
+
+@document_router.delete("/{document_id}/permissions/{permission_id}")
+async def revoke_document_permission(
+    document_id: str,
+    permission_id: str,
+    request: Request,
+    current_user: dict = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Revoke a grant; the document is unrestricted again once it has no active grants"""
+    try:
+        revoked = PermissionService(db).revoke_permission(document_id, permission_id, current_user)
+        if not revoked:
+            raise HTTPException(status_code=404, detail="Permission not found")
+        
+        record_audit_event("update", document_id, current_user["user_id"], request,
+                           old_values={"permission_revoked": permission_id})
+        return {"message": "Permission revoked successfully"}
+    except HTTPException:
+        raise
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to revoke permission: {str(e)}")
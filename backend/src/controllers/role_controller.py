@@ -1,7 +1,7 @@
 from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
-from ..core.database import get_db
-from ..services.role_service import RoleService
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..core.db_routing import get_read_db
+from ..services.role_service import AsyncRoleService
 from ..schemas import RoleResponse
 from typing import List
 
@@ -10,12 +10,12 @@ role_router = APIRouter(prefix="/roles", tags=["roles"])
 
 @role_router.get("", response_model=List[RoleResponse])
 async def get_roles(
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all roles (public endpoint for registration)"""
     try:
-        role_service = RoleService(db)
-        roles = role_service.get_all_roles()
+        role_service = AsyncRoleService(db)
+        roles = await role_service.get_all_roles()
         return roles
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to fetch roles: {str(e)}")
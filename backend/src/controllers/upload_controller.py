@@ -0,0 +1,131 @@
+from fastapi import APIRouter, HTTPException, Depends, Request
+from sqlalchemy.orm import Session
+from ..core.database import get_db
+from ..services.upload_service import (
+    UploadService, UploadSessionNotFound, ChunkOffsetConflict, ChunkTooLargeError, read_chunk
+)
+from ..services.audit_service import record_audit_event
+from ..schemas import UploadSessionCreate, UploadSessionResponse, DocumentResponse
+from ..core.auth import get_current_active_user
+from ..core.acl import get_document_acl
+from ..core.storage import FileTooLargeError
+from ..core.config import settings
+from typing import Optional
+
+upload_router = APIRouter(prefix="/uploads", tags=["uploads"])
+
+
+@upload_router.post("", response_model=UploadSessionResponse)
+def create_upload_session(
+    session_data: UploadSessionCreate,
+    current_user: dict = Depends(get_current_active_user),
+    acl: Optional[dict] = Depends(get_document_acl),
+    db: Session = Depends(get_db)
+):
+    """Start a resumable upload; set document_id to upload a new version"""
+    try:
+        upload_service = UploadService(db)
+        return upload_service.create_session(session_data, current_user["user_id"], acl=acl)
+    except UploadSessionNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except FileTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to create upload session: {str(e)}")
+
+
+@upload_router.put("/{session_id}/chunks/{chunk_number}", response_model=UploadSessionResponse)
+async def upload_chunk(
+    session_id: str,
+    chunk_number: int,
+    request: Request,
+    offset: Optional[int] = None,  # Optional byte offset, checked against chunk_number * chunk_size
+    current_user: dict = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Upload one chunk as the raw request body; re-sending a received chunk is a no-op"""
+    if chunk_number < 0:
+        raise HTTPException(status_code=400, detail="chunk_number must not be negative")
+    try:
+        upload_service = UploadService(db)
+        # No session allows chunks above UPLOAD_CHUNK_SIZE, so nothing larger is buffered
+        data = await read_chunk(
+            request.stream(), request.headers.get("content-length"), settings.UPLOAD_CHUNK_SIZE
+        )
+        return await upload_service.write_chunk(
+            session_id, current_user["user_id"], chunk_number, data, offset=offset
+        )
+    except UploadSessionNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ChunkOffsetConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ChunkTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to store chunk: {str(e)}")
+
+
+@upload_router.get("/{session_id}", response_model=UploadSessionResponse)
+def get_upload_session(
+    session_id: str,
+    current_user: dict = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Get upload progress, e.g. to find the chunk to resume from"""
+    try:
+        upload_service = UploadService(db)
+        return upload_service.get_session(session_id, current_user["user_id"])
+    except UploadSessionNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to fetch upload session: {str(e)}")
+
+
+@upload_router.post("/{session_id}/complete", response_model=DocumentResponse)
+async def complete_upload_session(
+    session_id: str,
+    request: Request,
+    current_user: dict = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Finalize a fully received upload into a document or a new version"""
+    try:
+        upload_service = UploadService(db)
+        result = await upload_service.complete_session(session_id, current_user["user_id"])
+        if not result:
+            raise HTTPException(status_code=400, detail="Failed to update document")
+        
+        # Completing a session either creates a document or adds a version to one
+        action = "update" if "version_number" in result else "create"
+        record_audit_event(action, result["document_id"], current_user["user_id"], request,
+                           new_values={"title": result["title"], "upload_session_id": session_id})
+        return result
+    except HTTPException:
+        raise
+    except UploadSessionNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ChunkOffsetConflict as e:
+        raise HTTPException(status_code=409, detail=f"Upload is incomplete; {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to complete upload: {str(e)}")
+
+
+@upload_router.delete("/{session_id}")
+def abort_upload_session(
+    session_id: str,
+    current_user: dict = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Cancel an upload and discard the received chunks"""
+    try:
+        upload_service = UploadService(db)
+        upload_service.abort_session(session_id, current_user["user_id"])
+        return {"message": "Upload session cancelled"}
+    except UploadSessionNotFound as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to cancel upload session: {str(e)}")
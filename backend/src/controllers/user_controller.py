@@ -0,0 +1,57 @@
+from fastapi import APIRouter, HTTPException, Depends
+from sqlalchemy.orm import Session
+from ..core.database import get_db
+from ..services.user_service import UserService
+from ..schemas import UserResponse, UserStatusUpdate, UserAssignmentUpdate
+from ..core.auth import get_current_active_user
+from ..core.acl import is_admin
+
+user_router = APIRouter(prefix="/users", tags=["users"])
+
+
+def require_admin(current_user: dict = Depends(get_current_active_user)) -> dict:
+    if not is_admin(current_user):
+        raise HTTPException(status_code=403, detail="Only administrators can manage users")
+    return current_user
+
+
+@user_router.put("/{email}/status", response_model=UserResponse)
+def set_user_status(
+    email: str,
+    status_update: UserStatusUpdate,
+    current_user: dict = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """Activate or deactivate a user; deactivation also ends their sessions"""
+    if not status_update.is_active and email == current_user["email"]:
+        raise HTTPException(status_code=400, detail="Administrators cannot deactivate themselves")
+    try:
+        user_service = UserService(db)
+        if not user_service.set_user_active(email, status_update.is_active):
+            raise HTTPException(status_code=404, detail="User not found")
+        return user_service.get_current_user(email)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to update user status: {str(e)}")
+
+
+@user_router.put("/{email}/assignment", response_model=UserResponse)
+def set_user_assignment(
+    email: str,
+    assignment: UserAssignmentUpdate,
+    current_user: dict = Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """Move a user to another department and/or role"""
+    try:
+        user_service = UserService(db)
+        if not user_service.change_user_assignment(email, assignment.department_id, assignment.role_id):
+            raise HTTPException(status_code=404, detail="User not found")
+        return user_service.get_current_user(email)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to update user assignment: {str(e)}")
@@ -1,5 +1,5 @@
 from .config import settings
-from .database import engine, get_db, Base
+from .database import engine, get_db, async_engine, get_async_db, Base
 from .auth import (
     verify_password,
     get_password_hash,
@@ -8,6 +8,7 @@ from .auth import (
     get_current_user,
     get_current_active_user,
     authenticate_user,
+    invalidate_principal,
     ACCESS_TOKEN_EXPIRE_MINUTES
 )
 
@@ -15,6 +16,8 @@ __all__ = [
     "settings",
     "engine",
     "get_db", 
+    "async_engine",
+    "get_async_db",
     "Base",
     "verify_password",
     "get_password_hash",
@@ -23,5 +26,6 @@ __all__ = [
     "get_current_user",
     "get_current_active_user",
     "authenticate_user",
+    "invalidate_principal",
     "ACCESS_TOKEN_EXPIRE_MINUTES"
 ]
@@ -0,0 +1,53 @@
+"""Document read access control.
+
+A document with an active ``document_permissions`` grant is restricted: only its
+creator, its grantees (directly, through their role or department, or through
+``user_document_permissions``) and administrators may read it. Read endpoints depend on
+``get_document_acl`` and pass its grant context down to the queries, which filter in
+SQL (see ``repositories.document_queries.acl_condition``).
+"""
+from typing import Any, Dict, Optional
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from .auth import get_current_active_user
+from .cache import TTLCache
+from .config import settings
+from .db_routing import get_read_db
+
+ADMIN_ROLE = "Administrator"
+
+# User ID -> grant context; cleared on every grant change made by this process
+grant_cache: TTLCache[dict] = TTLCache(maxsize=settings.ACL_CACHE_SIZE, ttl=settings.ACL_CACHE_TTL_SECONDS)
+
+
+def is_admin(current_user: dict) -> bool:
+    return current_user.get("role_name") == ADMIN_ROLE
+
+
+async def get_document_acl(current_user: dict = Depends(get_current_active_user),
+                           db: AsyncSession = Depends(get_read_db)) -> Optional[Dict[str, Any]]:
+    """Grant context of the current user, or None when ACL_ENABLED is off"""
+    if not settings.ACL_ENABLED:
+        return None
+    user_id = current_user["user_id"]
+    if is_admin(current_user):
+        return {"user_id": user_id, "role_id": None, "department_id": None,
+                "is_admin": True, "document_ids": None}
+
+    acl = grant_cache.get(user_id)
+    if acl is None:
+        from ..repositories.async_permission_repository import AsyncPermissionRepository
+
+        acl = await AsyncPermissionRepository(db).get_grant_context(user_id, settings.ACL_INLINE_GRANTS_MAX)
+        acl["is_admin"] = acl.pop("role_name") == ADMIN_ROLE
+        grant_cache.set(user_id, acl)
+    return acl
+
+
+def invalidate_grants() -> None:
+    """Forget cached grant contexts after a grant change.
+
+    A role or department grant affects many principals, so the whole cache is cleared;
+    other worker processes pick the change up within ACL_CACHE_TTL_SECONDS.
+    """
+    grant_cache.clear()
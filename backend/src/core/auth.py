@@ -1,13 +1,23 @@
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Callable, Optional, TypeVar
+from concurrent.futures import ThreadPoolExecutor
 from jose import JWTError, jwt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from .database import get_db
+from .db_routing import get_read_db
+from .config import settings
+from .cache import TTLCache
 from ..repositories.user_repository import UserRepository
+from ..repositories.async_user_repository import AsyncUserRepository
+import asyncio
+import hashlib
 import os
+import secrets
+import threading
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -30,19 +40,15 @@ else:
 # HTTP Bearer for token
 security = HTTPBearer()
 
+# Token subject (email) -> user dict, so most requests skip the users/departments/roles join
+principal_cache: TTLCache[dict] = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS
+)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash"""
-    import time
-    start_time = time.time()
-    result = pwd_context.verify(plain_password, hashed_password)
-    end_time = time.time()
-    
-    # Log performance for debugging
-    duration = end_time - start_time
-    print(f"🔒 Password verification took {duration:.3f} seconds (bcrypt rounds: {pwd_context.bcrypt__rounds if hasattr(pwd_context, 'bcrypt__rounds') else 'default'})")
-    
-    return result
+    return pwd_context.verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
@@ -50,6 +56,61 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+T = TypeVar("T")
+
+# bcrypt releases the GIL, so a few threads hash in parallel without touching the event loop.
+# The semaphore caps running plus queued work; anything beyond it is shed instead of queued.
+_hash_executor: Optional[ThreadPoolExecutor] = None
+_hash_executor_lock = threading.Lock()
+_hash_slots = threading.BoundedSemaphore(settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE_SIZE)
+
+
+class PasswordHashingBusy(RuntimeError):
+    """Raised when too many password hashes are already running or queued"""
+
+
+def _get_hash_executor() -> ThreadPoolExecutor:
+    global _hash_executor
+    with _hash_executor_lock:
+        if _hash_executor is None:
+            _hash_executor = ThreadPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash"
+            )
+        return _hash_executor
+
+
+async def _run_hashing(func: Callable[..., T], *args) -> T:
+    if not _hash_slots.acquire(blocking=False):
+        raise PasswordHashingBusy("Too many concurrent sign-ins, please retry shortly")
+    try:
+        future = _get_hash_executor().submit(func, *args)
+    except Exception:
+        _hash_slots.release()
+        raise
+    # Free the slot when the hash finishes, even if the request was abandoned meanwhile
+    future.add_done_callback(lambda _: _hash_slots.release())
+    return await asyncio.wrap_future(future)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the hashing pool; raises PasswordHashingBusy when saturated"""
+    return await _run_hashing(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the hashing pool; raises PasswordHashingBusy when saturated"""
+    return await _run_hashing(get_password_hash, password)
+
+
+def shutdown_password_hashing() -> None:
+    """Stop the hashing pool"""
+    global _hash_executor
+    with _hash_executor_lock:
+        if _hash_executor is not None:
+            _hash_executor.shutdown(wait=False, cancel_futures=True)
+            _hash_executor = None
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create JWT access token"""
     to_encode = data.copy()
@@ -62,6 +123,52 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
+def principal_claims(user: dict) -> dict:
+    """Token claims describing a user, used instead of a lookup when AUTH_TRUST_TOKEN_CLAIMS is on"""
+    return {
+        "sub": user["email"],
+        "uid": user["user_id"],
+        "given_name": user["first_name"],
+        "family_name": user["last_name"],
+        "dept": user["department_name"],
+        "role": user["role_name"],
+        "created": user["created_at"].isoformat() if user.get("created_at") else None
+    }
+
+
+def _principal_from_claims(payload: dict) -> Optional[dict]:
+    if not all(payload.get(claim) for claim in ("uid", "dept", "role")):
+        return None  # Token issued before claims were embedded
+    created = payload.get("created")
+    return {
+        "user_id": payload["uid"],
+        "email": payload["sub"],
+        "first_name": payload.get("given_name"),
+        "last_name": payload.get("family_name"),
+        # Tokens are only issued to active users; a deactivated user keeps access until the
+        # token expires, at most AUTH_TRUSTED_TOKEN_EXPIRE_MINUTES
+        "is_active": True,
+        "created_at": datetime.fromisoformat(created) if created else None,
+        "department_name": payload["dept"],
+        "role_name": payload["role"]
+    }
+
+
+def invalidate_principal(email: str) -> None:
+    """Drop a cached user, e.g. after deactivation or a department or role change"""
+    principal_cache.invalidate(email)
+
+
+def create_refresh_token() -> str:
+    """Opaque refresh token; only its hash is stored"""
+    return secrets.token_urlsafe(32)
+
+
+def hash_refresh_token(token: str) -> str:
+    """SHA-256 of a refresh token, the key of its server-side session"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
 def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
     """Verify JWT token"""
     token = credentials.credentials
@@ -75,22 +182,32 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
-        return {"email": email}
+        token_data = {"email": email}
+        if settings.AUTH_TRUST_TOKEN_CLAIMS:
+            token_data["principal"] = _principal_from_claims(payload)
+        return token_data
     except JWTError:
         raise credentials_exception
 
 
-def get_current_user(token_data: dict = Depends(verify_token), db: Session = Depends(get_db)):
-    """Get current authenticated user"""
-    user_repo = UserRepository(db)
-    user = user_repo.get_user_with_details(token_data["email"])
+async def get_current_user(token_data: dict = Depends(verify_token), db: AsyncSession = Depends(get_read_db)):
+    """Get current authenticated user; cache misses are looked up without blocking the event loop"""
+    if token_data.get("principal"):
+        return dict(token_data["principal"])
+    
+    email = token_data["email"]
+    user = principal_cache.get(email)
     if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    return user
+        user_repo = AsyncUserRepository(db)
+        user = await user_repo.get_user_with_details(email)
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        principal_cache.set(email, user)
+    return dict(user)  # Callers may modify their copy
 
 
 def get_current_active_user(current_user: dict = Depends(get_current_user)):
@@ -0,0 +1,68 @@
+"""Route read-only requests to read replicas, with read-your-writes pinning.
+
+Read endpoints depend on ``get_read_db``. It hands out a session on the next replica
+(round robin), or on the primary when no replicas are configured or the client wrote
+recently. ``PrimaryPinMiddleware`` marks writers with a short-lived cookie, so every
+worker can tell without shared state; the pin only affects the client that wrote.
+Cross-origin clients never send that cookie back, so the pin is also returned in the
+``X-Primary-Until`` response header, which such clients echo on their requests.
+"""
+from itertools import cycle
+from fastapi import Request
+from .config import settings
+from .database import AsyncSessionLocal, ReplicaSessions
+import time
+
+PIN_COOKIE = "docrepo_primary_until"
+PIN_HEADER = "x-primary-until"
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+_replica_cycle = cycle(ReplicaSessions) if ReplicaSessions else None
+
+
+def is_pinned_to_primary(request: Request) -> bool:
+    """Whether the client wrote within the last REPLICA_PIN_SECONDS, by cookie or header"""
+    now = time.time()
+    for pinned_until in (request.cookies.get(PIN_COOKIE), request.headers.get(PIN_HEADER)):
+        try:
+            if pinned_until and float(pinned_until) > now:
+                return True
+        except ValueError:
+            pass
+    return False
+
+
+async def get_read_db(request: Request):
+    """Session for read-only handlers: a replica, or the primary for recent writers"""
+    if _replica_cycle is None or is_pinned_to_primary(request):
+        session_factory = AsyncSessionLocal
+    else:
+        session_factory = next(_replica_cycle)
+    async with session_factory() as db:
+        yield db
+
+
+class PrimaryPinMiddleware:
+    """Set the pin cookie and header on every successful non-read request"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in READ_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_pin(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                pin_seconds = settings.REPLICA_PIN_SECONDS
+                pinned_until = f"{time.time() + pin_seconds:.3f}"
+                cookie = f"{PIN_COOKIE}={pinned_until}; Max-Age={pin_seconds}; Path=/; HttpOnly; SameSite=Lax"
+                message = {**message, "headers": [
+                    *message.get("headers", []),
+                    (b"set-cookie", cookie.encode()),
+                    (PIN_HEADER.encode(), pinned_until.encode())
+                ]}
+            await send(message)
+
+        await self.app(scope, receive, send_with_pin)
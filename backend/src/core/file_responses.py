@@ -0,0 +1,230 @@
+from fastapi import Request
+from fastapi.responses import Response, StreamingResponse
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from pathlib import Path
+from typing import AsyncIterator, List, Optional, Tuple
+from urllib.parse import quote
+import anyio
+import os
+import secrets
+
+from .config import settings
+from .storage import CHUNK_SIZE
+
+# Beyond this many ranges a request is answered with the whole file instead
+MAX_RANGES = 32
+
+# A version's bytes never change, so version downloads may be cached for good
+IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+# Responses that carry the file or part of it; 304 and 416 send no content
+BODY_STATUSES = {200, 206}
+
+
+def make_etag(checksum: Optional[str], version_id: str) -> str:
+    """Strong ETag for a version's content; versions without a checksum fall back to their ID"""
+    return f'"{checksum or version_id}"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """Weak comparison, as used for If-None-Match"""
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    if "*" in candidates:
+        return True
+    return etag in [candidate[2:] if candidate.startswith("W/") else candidate for candidate in candidates]
+
+
+def _parse_http_date(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _if_range_matches(if_range: str, etag: str, last_modified: datetime) -> bool:
+    if if_range.startswith('"') or if_range.startswith("W/"):
+        # If-Range requires a strong comparison
+        return if_range.strip() == etag
+    if_range_date = _parse_http_date(if_range)
+    return if_range_date is not None and last_modified == if_range_date
+
+
+def parse_range_header(header: str, file_size: int) -> Optional[List[Tuple[int, int]]]:
+    """Parse a ``bytes=`` Range header into sorted, merged inclusive ranges.
+
+    Returns None when the header should be ignored (other units, malformed or too
+    many ranges) and an empty list when no range can be satisfied.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or not spec:
+        return None
+
+    ranges = []
+    parts = spec.split(",")
+    if len(parts) > MAX_RANGES:
+        return None
+    for part in parts:
+        start, dash, end = part.strip().partition("-")
+        if not dash:
+            return None
+        try:
+            if not start:
+                # Suffix range: the last N bytes
+                length = int(end)
+                if length <= 0:
+                    continue
+                ranges.append((max(file_size - length, 0), file_size - 1))
+                continue
+            first = int(start)
+            last = int(end) if end else None
+        except ValueError:
+            return None
+        if last is None:
+            last = file_size - 1
+        elif first > last:
+            return None
+        if first < file_size:
+            ranges.append((first, min(last, file_size - 1)))
+
+    merged: List[Tuple[int, int]] = []
+    for first, last in sorted(ranges):
+        if merged and first <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], last))
+        else:
+            merged.append((first, last))
+    return merged
+
+
+async def _read_range(file_path: Path, start: int, end: int) -> AsyncIterator[bytes]:
+    async with await anyio.open_file(file_path, "rb") as f:
+        await f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+async def _read_multipart(file_path: Path, parts: List[Tuple[bytes, int, int]],
+                          closing: bytes) -> AsyncIterator[bytes]:
+    for header, start, end in parts:
+        yield header
+        async for chunk in _read_range(file_path, start, end):
+            yield chunk
+    yield closing
+
+
+def _accel_redirect_path(request: Request, file_path: Path) -> Optional[str]:
+    """Internal nginx URI for a stored file, or None when Python should serve it"""
+    mode = settings.DOWNLOAD_MODE
+    if mode == "auto":
+        mode = "accel" if request.headers.get("x-accel-downloads") == "on" else "direct"
+    if mode != "accel":
+        return None
+    try:
+        relative = Path(file_path).resolve().relative_to(Path(settings.UPLOAD_DIR).resolve())
+    except ValueError:
+        return None  # Outside the uploads volume nginx can see
+    return settings.DOWNLOAD_ACCEL_PREFIX.rstrip("/") + "/" + quote(relative.as_posix())
+
+
+def content_disposition(file_name: str) -> str:
+    """Attachment header value that survives non-ASCII file names"""
+    quoted = quote(file_name)
+    if quoted != file_name:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{file_name}"'
+
+
+def file_response(request: Request, file_path: Path, file_name: str, media_type: Optional[str],
+                  etag: str, last_modified: Optional[datetime] = None,
+                  cache_control: str = REVALIDATE_CACHE_CONTROL) -> Response:
+    """Serve a stored file with conditional (304) and Range (206/416) support.
+
+    Behind nginx the transfer itself is delegated with X-Accel-Redirect (see DOWNLOAD_MODE).
+    """
+    media_type = media_type or "application/octet-stream"
+    stat = os.stat(file_path)
+    file_size = stat.st_size
+    if last_modified is None:
+        last_modified = datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc)
+    elif last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+    last_modified = last_modified.replace(microsecond=0)
+
+    headers = {
+        "ETag": etag,
+        "Last-Modified": format_datetime(last_modified, usegmt=True),
+        "Cache-Control": cache_control,
+        "Accept-Ranges": "bytes",
+    }
+
+    # Revalidation: If-None-Match takes precedence over If-Modified-Since
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+    else:
+        if_modified_since = _parse_http_date(request.headers.get("if-modified-since"))
+        if if_modified_since and last_modified <= if_modified_since:
+            return Response(status_code=304, headers=headers)
+
+    headers["Content-Disposition"] = content_disposition(file_name)
+
+    accel_path = _accel_redirect_path(request, file_path)
+    if accel_path:
+        # nginx serves the bytes (and any Range) with sendfile; this worker is done
+        headers["X-Accel-Redirect"] = accel_path
+        return Response(media_type=media_type, headers=headers)
+
+    ranges = None
+    range_header = request.headers.get("range")
+    if range_header:
+        # If-Range: only honour the Range when the client's copy is still current
+        if_range = request.headers.get("if-range")
+        if if_range is None or _if_range_matches(if_range, etag, last_modified):
+            ranges = parse_range_header(range_header, file_size)
+
+    if ranges is None:
+        headers["Content-Length"] = str(file_size)
+        return StreamingResponse(_read_range(file_path, 0, file_size - 1),
+                                 media_type=media_type, headers=headers)
+
+    if not ranges:
+        headers["Content-Range"] = f"bytes */{file_size}"
+        return Response(status_code=416, headers=headers)
+
+    if len(ranges) == 1:
+        start, end = ranges[0]
+        headers["Content-Range"] = f"bytes {start}-{end}/{file_size}"
+        headers["Content-Length"] = str(end - start + 1)
+        return StreamingResponse(_read_range(file_path, start, end), status_code=206,
+                                 media_type=media_type, headers=headers)
+
+    boundary = secrets.token_hex(16)
+    parts = [
+        (
+            (f"--{boundary}\r\nContent-Type: {media_type}\r\n"
+             f"Content-Range: bytes {start}-{end}/{file_size}\r\n\r\n").encode(),
+            start, end
+        )
+        for start, end in ranges
+    ]
+    # Every part but the first is preceded by the CRLF that ends the previous body
+    parts = [(header if i == 0 else b"\r\n" + header, start, end)
+             for i, (header, start, end) in enumerate(parts)]
+    closing = f"\r\n--{boundary}--\r\n".encode()
+    headers["Content-Length"] = str(
+        sum(len(header) + end - start + 1 for header, start, end in parts) + len(closing)
+    )
+    return StreamingResponse(_read_multipart(file_path, parts, closing), status_code=206,
+                             media_type=f"multipart/byteranges; boundary={boundary}",
+                             headers=headers)
+
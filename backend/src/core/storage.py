@@ -0,0 +1,114 @@
+from pathlib import Path
+from typing import BinaryIO, NamedTuple
+import hashlib
+import os
+import uuid
+
+# Large buffers keep syscalls and hash updates per upload low
+CHUNK_SIZE = 1024 * 1024
+
+
+class FileTooLargeError(ValueError):
+    """Raised when an upload exceeds the configured maximum size"""
+
+    def __init__(self, max_size: int):
+        super().__init__(f"File exceeds the maximum allowed size of {max_size} bytes")
+        self.max_size = max_size
+
+
+class StoredFile(NamedTuple):
+    path: Path
+    size: int
+    checksum: str  # SHA-256 hex digest
+
+
+def ingest_stream(source: BinaryIO, destination: Path, max_size: int) -> StoredFile:
+    """Copy a stream to disk in one pass, hashing and size-checking as bytes arrive.
+
+    Blocking; call it from a worker thread. The partial file is removed if the
+    stream exceeds ``max_size`` or the copy fails.
+    """
+    hasher = hashlib.sha256()
+    size = 0
+    try:
+        with open(destination, "wb", buffering=CHUNK_SIZE) as out:
+            while True:
+                chunk = source.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_size:
+                    raise FileTooLargeError(max_size)
+                hasher.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        destination.unlink(missing_ok=True)
+        raise
+
+    return StoredFile(destination, size, hasher.hexdigest())
+
+
+def hash_file(file_path: Path) -> StoredFile:
+    """Compute the SHA-256 and size of a file already on disk"""
+    hasher = hashlib.sha256()
+    size = 0
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            size += len(chunk)
+            hasher.update(chunk)
+    return StoredFile(file_path, size, hasher.hexdigest())
+
+
+class BlobStore:
+    """Content-addressed file store: each distinct payload is kept once, keyed by SHA-256.
+
+    Uploads are first streamed to ``tmp/`` and then moved to ``blobs/ab/cd/<checksum>``.
+    Reference counts live in the ``blobs`` table. Callers record the reference, call
+    :meth:`commit` and only then commit their transaction: the locked blob row keeps a
+    concurrent release from unlinking the file, and a failed move rolls the reference
+    back. A move followed by a failed transaction leaves an unreferenced blob, which is
+    harmless because its path is derived from its content.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.blob_dir = self.root / "blobs"
+        self.tmp_dir = self.root / "tmp"
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+
+    def blob_path(self, checksum: str) -> Path:
+        """Final location of the blob with the given SHA-256 checksum"""
+        return self.blob_dir / checksum[:2] / checksum[2:4] / checksum
+
+    def is_blob_path(self, file_path: str) -> bool:
+        """Whether a stored version path points into the blob store"""
+        return Path(file_path).resolve().is_relative_to(self.blob_dir.resolve())
+
+    def new_temp_path(self) -> Path:
+        return self.tmp_dir / f"{uuid.uuid4()}.part"
+
+    def ingest(self, source: BinaryIO, max_size: int) -> StoredFile:
+        """Stream an upload into a temporary file; blocking, call from a worker thread"""
+        return ingest_stream(source, self.new_temp_path(), max_size)
+
+    def commit(self, stored: StoredFile) -> Path:
+        """Move a temporary file into the store, or drop it if the blob already exists"""
+        target = self.blob_path(stored.checksum)
+        if stored.path == target:
+            return target
+        if target.exists():
+            stored.path.unlink(missing_ok=True)
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(stored.path, target)
+        return target
+
+    def discard(self, stored: StoredFile) -> None:
+        """Remove a temporary file that will not be committed"""
+        if stored.path != self.blob_path(stored.checksum):
+            stored.path.unlink(missing_ok=True)
+
+    def release(self, file_path: str) -> None:
+        """Unlink a blob whose last reference has been removed"""
+        Path(file_path).unlink(missing_ok=True)
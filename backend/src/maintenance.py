@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Maintenance commands for DocRepo.
+
+Run from the backend directory, e.g.:
+    python -m src.maintenance extract-content --retry-failed
+    python -m src.maintenance migrate-blobs --dry-run
+    python -m src.maintenance prune-sessions
+    python -m src.maintenance repair-current-versions
+    python -m src.maintenance rebuild-document-summary
+    python -m src.maintenance check-document-summary --repair
+    python -m src.maintenance partition-audit
+"""
+from pathlib import Path
+import argparse
+import os
+import shutil
+import sys
+
+from .core.database import SessionLocal
+
+
+def extract_content(args: argparse.Namespace) -> None:
+    """Extract and index text for current versions that were never indexed (or failed, with --retry-failed)"""
+    from .services.content_extraction_service import ContentExtractionService
+
+    db = SessionLocal()
+    try:
+        indexed = ContentExtractionService(db).index_missing(
+            batch_size=args.batch_size, retry_failed=args.retry_failed
+        )
+        print(f"✅ Indexed content for {indexed} version(s)")
+    finally:
+        db.close()
+
+
+def migrate_blobs(args: argparse.Namespace) -> None:
+    """Fold the legacy uploads/<document_id>/ tree into the content-addressed blob store.
+    
+    Run with the API stopped. Each file is hard-linked (or copied) into the store and the
+    database is committed before the legacy file is removed, so an interrupted run can
+    simply be restarted.
+    """
+    from sqlalchemy import text
+    from .core.config import settings
+    from .core.storage import BlobStore, hash_file
+
+    store = BlobStore(Path(settings.UPLOAD_DIR))
+    moved = duplicates = missing = reclaimed = 0
+    seen_checksums = set()
+
+    db = SessionLocal()
+    try:
+        file_paths = [
+            result[0] for result in
+            db.execute(text("SELECT DISTINCT file_path FROM document_versions")).fetchall()
+        ]
+        for file_path in file_paths:
+            if store.is_blob_path(file_path):
+                continue
+            source = Path(file_path)
+            if not source.exists():
+                missing += 1
+                print(f"⚠️ Missing file: {file_path}")
+                continue
+
+            stored = hash_file(source)
+            target = store.blob_path(stored.checksum)
+            if target.exists() or stored.checksum in seen_checksums:
+                duplicates += 1
+                reclaimed += stored.size
+            else:
+                moved += 1
+            seen_checksums.add(stored.checksum)
+            if args.dry_run:
+                continue
+
+            if not target.exists():
+                target.parent.mkdir(parents=True, exist_ok=True)
+                try:
+                    os.link(source, target)
+                except OSError:
+                    shutil.copy2(source, target)
+
+            old_checksums = [
+                result[0] for result in db.execute(
+                    text("""UPDATE document_versions dv
+                            SET file_path = :target, checksum = :checksum
+                            FROM document_versions old
+                            WHERE dv.version_id = old.version_id AND dv.file_path = :file_path
+                            RETURNING old.checksum"""),
+                    {"target": str(target), "checksum": stored.checksum, "file_path": file_path}
+                ).fetchall()
+            ]
+            # Keep extracted text, which was keyed by the old MD5 checksum
+            for old_checksum in set(old_checksums) - {None, "", stored.checksum}:
+                db.execute(
+                    text("""UPDATE document_contents SET checksum = :checksum
+                            WHERE checksum = :old_checksum
+                              AND NOT EXISTS (SELECT 1 FROM document_contents WHERE checksum = :checksum)"""),
+                    {"checksum": stored.checksum, "old_checksum": old_checksum}
+                )
+            db.commit()
+            source.unlink()
+
+        if not args.dry_run:
+            # Rebuild reference counts from the versions now pointing into the store
+            db.execute(text("DELETE FROM blobs"))
+            db.execute(
+                text("""
+                    INSERT INTO blobs (checksum, file_path, file_size, ref_count)
+                    SELECT checksum, MIN(file_path), MAX(file_size), COUNT(*)
+                    FROM document_versions
+                    WHERE checksum IS NOT NULL AND checksum <> '' AND file_path LIKE :prefix
+                    GROUP BY checksum
+                """),
+                {"prefix": f"{store.blob_dir}/%"}
+            )
+            db.commit()
+
+            # Remove legacy per-document directories left empty
+            for directory in store.root.iterdir():
+                if directory.is_dir() and directory not in (store.blob_dir, store.tmp_dir):
+                    try:
+                        directory.rmdir()
+                    except OSError:
+                        pass
+    finally:
+        db.close()
+
+    prefix = "Would reclaim" if args.dry_run else "Reclaimed"
+    print(f"✅ Moved {moved} file(s) into the blob store, folded {duplicates} duplicate(s), "
+          f"{missing} missing")
+    print(f"💾 {prefix} {reclaimed} bytes ({reclaimed / (1024 * 1024):.1f} MB)")
+
+
+def prune_sessions(args: argparse.Namespace) -> None:
+    """Delete expired and revoked refresh-token sessions"""
+    from .repositories.auth_session_repository import AuthSessionRepository
+
+    db = SessionLocal()
+    try:
+        deleted = AuthSessionRepository(db).delete_stale_sessions()
+        print(f"✅ Deleted {deleted} expired or revoked session(s)")
+    finally:
+        db.close()
+
+
+def repair_current_versions(args: argparse.Namespace) -> None:
+    """Fix documents with zero or several current versions, then enforce one per document.
+    
+    Databases created before the partial unique index existed get it here, once the data
+    satisfies it. Safe to re-run.
+    """
+    from sqlalchemy import text
+    from .repositories.document_repository import DocumentRepository
+
+    db = SessionLocal()
+    try:
+        counts = DocumentRepository(db).repair_current_versions()
+        print(f"✅ Demoted {counts['demoted']} extra current version(s), promoted {counts['promoted']}, "
+              f"re-pointed {counts['repointed']} document(s)")
+
+        db.execute(text("""CREATE UNIQUE INDEX IF NOT EXISTS idx_document_versions_current
+                           ON document_versions(document_id) WHERE is_current"""))
+        db.execute(text("DROP INDEX IF EXISTS idx_document_versions_is_current"))
+        db.commit()
+        print("🔒 One current version per document is now enforced by idx_document_versions_current")
+    finally:
+        db.close()
+
+
+def rebuild_document_summary(args: argparse.Namespace) -> None:
+    """Recompute the document_summary read model from the normalized tables.
+    
+    Needed once after adding the table to an existing database; safe to run on a live one.
+    """
+    from .repositories.document_repository import DocumentRepository
+
+    db = SessionLocal()
+    try:
+        rebuilt = DocumentRepository(db).rebuild_document_summary(batch_size=args.batch_size)
+        print(f"✅ Rebuilt the summary of {rebuilt} document(s)")
+    finally:
+        db.close()
+
+
+def check_document_summary(args: argparse.Namespace) -> int:
+    """Report documents whose document_summary row is missing or stale; exits 1 on drift"""
+    from .repositories.document_repository import DocumentRepository
+
+    db = SessionLocal()
+    try:
+        repo = DocumentRepository(db)
+        report = repo.check_document_summary(limit=args.limit)
+        drifted = report["missing"] + report["stale"]
+        if not drifted:
+            print("✅ document_summary matches the source tables")
+            return 0
+
+        print(f"⚠️ {report['missing']} document(s) missing a summary row, {report['stale']} stale")
+        for document_id in report["document_ids"]:
+            print(f"   {document_id}")
+        if not args.repair:
+            return 1
+
+        # Re-check so every drifted row is refreshed, not only the listed ones: one pass per
+        # page of the drift found, plus one for rows that drifted meanwhile, unless overridden
+        max_passes = args.max_passes or -(-drifted // args.limit) + 1
+        passes = 0
+        while report["document_ids"] and passes < max_passes:
+            repo.refresh_document_summary(report["document_ids"])
+            report = repo.check_document_summary(limit=args.limit)
+            passes += 1
+        remaining = report["missing"] + report["stale"]
+        if remaining:
+            print(f"❌ {remaining} summary row(s) still drifted after {passes} pass(es)")
+            return 1
+        print(f"🔧 Refreshed {drifted} summary row(s)")
+        return 0
+    finally:
+        db.close()
+
+
+def partition_audit(args: argparse.Namespace) -> int:
+    """Move document_audit to monthly partitions if needed, then create and expire partitions.
+    
+    The conversion copies every row in one transaction and locks the table meanwhile, so
+    run it in a quiet period. Afterwards the API keeps partitions up to date by itself.
+    """
+    from .core.config import settings
+    from .repositories.audit_repository import AuditRepository
+
+    db = SessionLocal()
+    try:
+        repo = AuditRepository(db)
+        if not repo.is_partitioned():
+            moved = repo.partition_existing_table(settings.AUDIT_PARTITION_MONTHS_AHEAD)
+            print(f"✅ Partitioned document_audit by month, moved {moved} event(s)")
+
+        retention = settings.AUDIT_RETENTION_MONTHS if args.retention_months is None else args.retention_months
+        changes = repo.maintain_partitions(settings.AUDIT_PARTITION_MONTHS_AHEAD, retention, wait=True)
+        print(f"🗂️ Created {len(changes['created'])} partition(s), "
+              f"dropped {len(changes['dropped'])} expired partition(s)")
+        for name in changes["dropped"]:
+            print(f"   dropped {name}")
+        if changes["moved"]:
+            print(f"   moved {changes['moved']} event(s) from the default partition into their month")
+        if changes["trimmed"]:
+            print(f"   deleted {changes['trimmed']} expired event(s) from the default partition")
+        for failure in changes["failed"]:
+            print(f"❌ Could not create {failure}")
+        return 1 if changes["failed"] else 0
+    finally:
+        db.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="DocRepo maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    extract_parser = subparsers.add_parser(
+        "extract-content", help="Backfill full-text content for unindexed versions"
+    )
+    extract_parser.add_argument("--batch-size", type=int, default=100)
+    extract_parser.add_argument("--retry-failed", action="store_true",
+                                help="Also retry versions whose extraction failed or was unsupported")
+    extract_parser.set_defaults(handler=extract_content)
+
+    blobs_parser = subparsers.add_parser(
+        "migrate-blobs", help="Move legacy uploads into the deduplicating blob store"
+    )
+    blobs_parser.add_argument("--dry-run", action="store_true",
+                              help="Only report how much space would be reclaimed")
+    blobs_parser.set_defaults(handler=migrate_blobs)
+
+    sessions_parser = subparsers.add_parser(
+        "prune-sessions", help="Delete expired and revoked login sessions"
+    )
+    sessions_parser.set_defaults(handler=prune_sessions)
+
+    current_parser = subparsers.add_parser(
+        "repair-current-versions", help="Repair current-version flags and pointers, then add the unique index"
+    )
+    current_parser.set_defaults(handler=repair_current_versions)
+
+    rebuild_parser = subparsers.add_parser(
+        "rebuild-document-summary", help="Recompute the document listing read model"
+    )
+    rebuild_parser.add_argument("--batch-size", type=int, default=5000)
+    rebuild_parser.set_defaults(handler=rebuild_document_summary)
+
+    check_parser = subparsers.add_parser(
+        "check-document-summary", help="Find listing read model rows that drifted from the source tables"
+    )
+    check_parser.add_argument("--limit", type=int, default=100,
+                              help="How many drifted document IDs to list")
+    check_parser.add_argument("--repair", action="store_true",
+                              help="Refresh the drifted rows")
+    check_parser.add_argument("--max-passes", type=int, default=None,
+                              help="Give up repairing after this many refresh passes")
+    check_parser.set_defaults(handler=check_document_summary)
+
+    audit_parser = subparsers.add_parser(
+        "partition-audit", help="Partition document_audit by month and apply audit retention"
+    )
+    audit_parser.add_argument("--retention-months", type=int, default=None,
+                              help="Override AUDIT_RETENTION_MONTHS (0 keeps everything)")
+    audit_parser.set_defaults(handler=partition_audit)
+
+    args = parser.parse_args(argv)
+    return args.handler(args) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,10 @@
 from .user import User
-from .document import Document, DocumentVersion, DocumentPermission, DocumentAudit
+from .document import Document, DocumentVersion, Blob, DocumentContent, DocumentPermission, DocumentAudit
 from .tag import Tag, DocumentTag
 from .department import Department
 from .role import Role
+from .upload_session import UploadSession
+from .auth_session import AuthSession
 from .base import Base
 
 __all__ = [
@@ -10,10 +12,14 @@ __all__ = [
     "User",
     "Document",
     "DocumentVersion", 
+    "Blob",
+    "DocumentContent",
     "DocumentPermission",
     "DocumentAudit",
     "Tag",
     "DocumentTag",
     "Department",
-    "Role"
+    "Role",
+    "UploadSession",
+    "AuthSession"
 ]
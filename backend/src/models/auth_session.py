@@ -0,0 +1,17 @@
+from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+import uuid
+from datetime import datetime
+from .base import Base
+
+class AuthSession(Base):
+    __tablename__ = "auth_sessions"
+    
+    session_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.user_id"), nullable=False)
+    token_hash = Column(String(64), nullable=False, unique=True)  # SHA-256 of the current refresh token
+    previous_token_hash = Column(String(64), unique=True)  # Rotated-out token, kept to detect reuse
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_used_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime)
@@ -1,6 +1,6 @@
-from sqlalchemy import Column, String, DateTime, Boolean, Integer, Text, BigInteger, ForeignKey, CheckConstraint
+from sqlalchemy import Column, String, DateTime, Boolean, Integer, Text, BigInteger, ForeignKey, CheckConstraint, Computed
 from sqlalchemy.orm import relationship
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR, JSONB, INET
 import uuid
 from datetime import datetime
 from .base import Base
@@ -16,13 +16,25 @@ class Document(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow)
     is_active = Column(Boolean, default=True)
+    is_restricted = Column(Boolean, nullable=False, default=False)  # Maintained by a trigger on document_permissions
+    content_vector = Column(TSVECTOR)  # Copied from DocumentContent of the current version
+    search_vector = Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'B') || "
+        "coalesce(content_vector, ''::tsvector)",
+        persisted=True
+    ))  # Generated by Postgres, GIN-indexed for full-text search
     
     # Relationships
     created_by_user = relationship("User", back_populates="documents")
     versions = relationship("DocumentVersion", back_populates="document", order_by="DocumentVersion.version_number.desc()")
     tags = relationship("Tag", secondary="document_tags", back_populates="documents")
     permissions = relationship("DocumentPermission", back_populates="document")
-    audit_entries = relationship("DocumentAudit", back_populates="document")
+    audit_entries = relationship(
+        "DocumentAudit",
+        primaryjoin="Document.document_id == foreign(DocumentAudit.document_id)",
+        back_populates="document"
+    )
 
 
 class DocumentVersion(Base):
@@ -51,12 +63,38 @@ class DocumentVersion(Base):
     uploaded_by_user = relationship("User")
 
 
+class Blob(Base):
+    __tablename__ = "blobs"
+    
+    # One stored file per distinct payload; versions reference it by checksum
+    checksum = Column(String(64), primary_key=True)
+    file_path = Column(String(500), nullable=False)
+    file_size = Column(BigInteger, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class DocumentContent(Base):
+    __tablename__ = "document_contents"
+    
+    # Keyed by file checksum so versions sharing the same bytes share one extraction
+    checksum = Column(String(64), primary_key=True)
+    content = Column(Text)
+    status = Column(String(20), nullable=False)  # 'extracted', 'truncated', 'unsupported', 'failed'
+    content_vector = Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('english', coalesce(content, '')), 'C')",
+        persisted=True
+    ))
+    extracted_at = Column(DateTime, default=datetime.utcnow)
+
+
 class DocumentPermission(Base):
     __tablename__ = "document_permissions"
     
     permission_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     document_id = Column(UUID(as_uuid=True), ForeignKey("documents.document_id"), nullable=False)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.user_id"), nullable=True)
+    role_id = Column(UUID(as_uuid=True), ForeignKey("roles.role_id"), nullable=True)
     department_id = Column(UUID(as_uuid=True), ForeignKey("departments.department_id"), nullable=True)
     permission_type = Column(String(20), nullable=False)  # 'read', 'write', 'admin'
     granted_by = Column(UUID(as_uuid=True), ForeignKey("users.user_id"), nullable=False)
@@ -74,14 +112,19 @@ class DocumentAudit(Base):
     __tablename__ = "document_audit"
     
     audit_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    document_id = Column(UUID(as_uuid=True), ForeignKey("documents.document_id"), nullable=False)
+    document_id = Column(UUID(as_uuid=True), nullable=False)  # No FK: kept after the document is deleted
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.user_id"), nullable=False)
     action = Column(String(50), nullable=False)  # 'create', 'update', 'delete', 'download', 'view'
-    details = Column(Text)  # JSON string with additional details
-    timestamp = Column(DateTime, default=datetime.utcnow)
-    ip_address = Column(String(45))  # Support IPv6
-    user_agent = Column(String(500))
+    old_values = Column(JSONB)
+    new_values = Column(JSONB)
+    timestamp = Column(DateTime, primary_key=True, default=datetime.utcnow)  # Partition key
+    ip_address = Column(INET)
+    user_agent = Column(Text)
     
     # Relationships
-    document = relationship("Document", back_populates="audit_entries")
+    document = relationship(
+        "Document",
+        primaryjoin="Document.document_id == foreign(DocumentAudit.document_id)",
+        back_populates="audit_entries"
+    )
     user = relationship("User", back_populates="audit_entries")
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, String, DateTime, Integer, Text, BigInteger, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+import uuid
+from datetime import datetime
+from .base import Base
+
+class UploadSession(Base):
+    __tablename__ = "upload_sessions"
+    
+    session_id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.user_id"), nullable=False)
+    document_id = Column(UUID(as_uuid=True), ForeignKey("documents.document_id"), nullable=True)  # Set for a new version
+    title = Column(String(255))
+    description = Column(Text)
+    tags = Column(Text)  # Comma-separated, same format as the upload form
+    file_name = Column(String(255), nullable=False)
+    file_type = Column(String(100))
+    total_size = Column(BigInteger, nullable=False)
+    chunk_size = Column(Integer, nullable=False)
+    received_bytes = Column(BigInteger, nullable=False, default=0)  # Contiguous bytes written so far
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)
@@ -3,11 +3,38 @@ from .document_repository import DocumentRepository
 from .tag_repository import TagRepository
 from .department_repository import DepartmentRepository
 from .role_repository import RoleRepository
+from .content_repository import ContentRepository
+from .upload_session_repository import UploadSessionRepository
+from .auth_session_repository import AuthSessionRepository
+from .audit_repository import AuditRepository
+from .permission_repository import PermissionRepository
+from .document_loader import DocumentLoader, AsyncDocumentLoader
+from .async_document_repository import AsyncDocumentRepository
+from .async_tag_repository import AsyncTagRepository
+from .async_user_repository import AsyncUserRepository
+from .async_department_repository import AsyncDepartmentRepository
+from .async_role_repository import AsyncRoleRepository
+from .async_audit_repository import AsyncAuditRepository
+from .async_permission_repository import AsyncPermissionRepository
 
 __all__ = [
     "UserRepository",
     "DocumentRepository", 
     "TagRepository",
     "DepartmentRepository",
-    "RoleRepository"
+    "RoleRepository",
+    "ContentRepository",
+    "UploadSessionRepository",
+    "AuthSessionRepository",
+    "AuditRepository",
+    "PermissionRepository",
+    "DocumentLoader",
+    "AsyncDocumentRepository",
+    "AsyncTagRepository",
+    "AsyncUserRepository",
+    "AsyncDepartmentRepository",
+    "AsyncRoleRepository",
+    "AsyncAuditRepository",
+    "AsyncPermissionRepository",
+    "AsyncDocumentLoader"
 ]
@@ -0,0 +1,19 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Dict, Any, Tuple
+from datetime import datetime
+from .audit_repository import audit_trail_query, audit_row_to_dict
+
+
+class AsyncAuditRepository:
+    """Read-only audit trail queries on an AsyncSession"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_audit_trail(self, since: datetime, until: datetime, document_id: Optional[str] = None,
+                              user_id: Optional[str] = None, limit: int = 100,
+                              cursor: Optional[Tuple[datetime, str]] = None) -> List[Dict[str, Any]]:
+        """Get audit events in a time window, see audit_trail_query"""
+        query, params = audit_trail_query(since, until, document_id, user_id, limit, cursor)
+        results = (await self.db.execute(query, params)).fetchall()
+        return [audit_row_to_dict(result) for result in results]
@@ -0,0 +1,15 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from .department_repository import ALL_DEPARTMENTS_QUERY, department_row_to_dict
+
+
+class AsyncDepartmentRepository:
+    """Read-only department queries on an AsyncSession; mirrors DepartmentRepository"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_all_departments(self) -> List[dict]:
+        """Get all departments"""
+        results = (await self.db.execute(ALL_DEPARTMENTS_QUERY)).fetchall()
+        return [department_row_to_dict(result) for result in results]
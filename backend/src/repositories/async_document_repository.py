@@ -0,0 +1,66 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Dict, Any, Tuple
+from datetime import datetime
+from . import document_queries
+
+
+class AsyncDocumentRepository:
+    """Read-only document queries on an AsyncSession; mirrors DocumentRepository"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_documents_with_details(self, search: Optional[str] = None,
+                                         tag_filter: Optional[str] = None,
+                                         limit: int = 100, offset: int = 0,
+                                         cursor: Optional[Tuple[datetime, str, Optional[float]]] = None,
+                                         sort: str = "newest",
+                                         acl: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Get documents with creator and department details, see DocumentRepository"""
+        query, params, relevance = document_queries.documents_listing_query(
+            search, tag_filter, limit, offset, cursor, sort, acl
+        )
+        results = (await self.db.execute(query, params)).fetchall()
+        return [document_queries.listing_row_to_dict(result, relevance) for result in results]
+
+    async def document_exists(self, document_id: str) -> bool:
+        """Whether the document exists, by primary key only"""
+        return await self.can_read_document(document_id, None)
+
+    async def can_read_document(self, document_id: str, acl: Optional[Dict[str, Any]]) -> bool:
+        """Whether the document exists and the principal may read it"""
+        query, params = document_queries.readable_query(document_id, acl)
+        return (await self.db.execute(query, params)).fetchone() is not None
+
+    async def get_document_with_details(self, document_id: str) -> Optional[Dict[str, Any]]:
+        """Get single document with all details"""
+        result = (await self.db.execute(
+            document_queries.DOCUMENT_DETAILS_QUERY, {"document_id": document_id}
+        )).fetchone()
+        if not result:
+            return None
+        return document_queries.document_row_to_dict(result)
+
+    async def get_document_versions(self, document_id: str) -> List[Dict[str, Any]]:
+        """Get all versions of a document"""
+        results = (await self.db.execute(
+            document_queries.DOCUMENT_VERSIONS_QUERY, {"document_id": document_id}
+        )).fetchall()
+        return [document_queries.version_row_to_dict(result) for result in results]
+
+    async def get_document_version_for_download(self, document_id: str,
+                                                version_id: Optional[str] = None,
+                                                acl: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Get document version for download, if the principal may read the document"""
+        query, params = document_queries.download_query(document_id, version_id, acl)
+        result = (await self.db.execute(query, params)).fetchone()
+        if result:
+            return document_queries.download_row_to_dict(result)
+        return None
+
+    async def get_document_tags(self, document_id: str) -> List[str]:
+        """Get tags for a document"""
+        results = (await self.db.execute(
+            document_queries.DOCUMENT_TAGS_QUERY, {"document_id": document_id}
+        )).fetchall()
+        return [result[0] for result in results]
@@ -0,0 +1,21 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Any
+from .permission_repository import PRINCIPAL_QUERY, GRANTED_DOCUMENTS_QUERY, grant_context
+
+
+class AsyncPermissionRepository:
+    """Read-only grant queries on an AsyncSession; mirrors PermissionRepository"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_grant_context(self, user_id: str, max_inline: int) -> Dict[str, Any]:
+        """Get a user's role, department and granted documents, see grant_context"""
+        principal = (await self.db.execute(PRINCIPAL_QUERY, {"user_id": user_id})).fetchone()
+        granted = None
+        if principal:
+            granted = (await self.db.execute(GRANTED_DOCUMENTS_QUERY, {
+                "user_id": user_id, "role_id": principal[0], "department_id": principal[1],
+                "limit": max_inline + 1
+            })).fetchall()
+        return grant_context(user_id, principal, granted, max_inline)
@@ -0,0 +1,15 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from .role_repository import ALL_ROLES_QUERY, role_row_to_dict
+
+
+class AsyncRoleRepository:
+    """Read-only role queries on an AsyncSession; mirrors RoleRepository"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_all_roles(self) -> List[dict]:
+        """Get all roles"""
+        results = (await self.db.execute(ALL_ROLES_QUERY)).fetchall()
+        return [role_row_to_dict(result) for result in results]
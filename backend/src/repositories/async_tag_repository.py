@@ -0,0 +1,15 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+from .tag_repository import ALL_TAGS_QUERY
+
+
+class AsyncTagRepository:
+    """Read-only tag queries on an AsyncSession; mirrors TagRepository"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_all_tags(self) -> List[dict]:
+        """Get all tags"""
+        results = (await self.db.execute(ALL_TAGS_QUERY)).fetchall()
+        return [{"tag_id": str(result[0]), "name": result[1]} for result in results]  # Convert UUID to string
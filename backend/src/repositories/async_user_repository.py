@@ -0,0 +1,24 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from .user_repository import user_details_query, user_details_row_to_dict
+
+
+class AsyncUserRepository:
+    """Read-only user queries on an AsyncSession; mirrors UserRepository"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_user_with_details(self, email: str) -> Optional[dict]:
+        """Get user with department and role details"""
+        return await self._get_user_with_details("u.email = :email", {"email": email})
+
+    async def get_user_with_details_by_id(self, user_id: str) -> Optional[dict]:
+        """Get user with department and role details by ID"""
+        return await self._get_user_with_details("u.user_id = :user_id", {"user_id": user_id})
+
+    async def _get_user_with_details(self, condition: str, params: dict) -> Optional[dict]:
+        result = (await self.db.execute(user_details_query(condition), params)).fetchone()
+        if result:
+            return user_details_row_to_dict(result)
+        return None
@@ -0,0 +1,309 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from sqlalchemy.sql.elements import TextClause
+from typing import List, Optional, Dict, Any, Tuple, Sequence
+from datetime import date, datetime
+import json
+import re
+
+# Monthly partitions of document_audit are named document_audit_yYYYYmMM
+PARTITION_NAME = re.compile(r"^document_audit_y(\d{4})m(\d{2})$")
+
+# Serializes partition DDL across API workers and maintenance runs
+PARTITION_LOCK_KEY = "document_audit_partitions"
+
+# Catches events whose month has no partition yet
+DEFAULT_PARTITION = "document_audit_default"
+
+AUDIT_COLUMNS = ("audit_id, document_id, user_id, action, old_values, new_values, "
+                 "timestamp, ip_address, user_agent")
+
+PARTITIONS_QUERY = text("""
+    SELECT c.relname
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = CAST('document_audit' AS regclass)
+""")
+
+
+def add_months(month: date, months: int) -> date:
+    """First day of the month ``months`` after (or before) the month of ``month``"""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"document_audit_y{month.year:04d}m{month.month:02d}"
+
+
+def partition_month(name: str) -> Optional[date]:
+    """Month covered by a partition, or None for the default partition"""
+    match = PARTITION_NAME.match(name)
+    return date(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+def audit_trail_query(since: datetime, until: datetime, document_id: Optional[str] = None,
+                      user_id: Optional[str] = None, limit: int = 100,
+                      cursor: Optional[Tuple[datetime, str]] = None) -> Tuple[TextClause, Dict[str, Any]]:
+    """Events in ``[since, until)`` for a document and/or user, newest first.
+
+    The time window is a plain range on the partition key, so only the partitions
+    overlapping it are scanned. ``cursor`` is ``(timestamp, audit_id)`` of the last
+    event of the previous page.
+    """
+    conditions = ["a.timestamp >= :since", "a.timestamp < :until"]
+    params = {"since": since, "until": until, "limit": limit}
+
+    if document_id:
+        conditions.append("a.document_id = CAST(:document_id AS uuid)")
+        params["document_id"] = document_id
+    if user_id:
+        conditions.append("a.user_id = CAST(:user_id AS uuid)")
+        params["user_id"] = user_id
+    if cursor:
+        conditions.append("(a.timestamp, a.audit_id) < (:cursor_timestamp, CAST(:cursor_audit_id AS uuid))")
+        params["cursor_timestamp"], params["cursor_audit_id"] = cursor
+
+    query = f"""
+        SELECT a.audit_id, a.document_id, a.user_id,
+               CONCAT(u.first_name, ' ', u.last_name) as user_name,
+               a.action, a.old_values, a.new_values, a.timestamp, a.ip_address, a.user_agent
+        FROM document_audit a
+        LEFT JOIN users u ON u.user_id = a.user_id
+        WHERE {" AND ".join(conditions)}
+        ORDER BY a.timestamp DESC, a.audit_id DESC
+        LIMIT :limit
+    """
+    return text(query), params
+
+
+def audit_row_to_dict(result: Sequence[Any]) -> Dict[str, Any]:
+    def from_json(value):
+        # psycopg2 decodes JSONB, asyncpg hands it over as text
+        return json.loads(value) if isinstance(value, str) else value
+
+    return {
+        "audit_id": str(result[0]),  # Convert UUID to string
+        "document_id": str(result[1]),
+        "user_id": str(result[2]),
+        "user_name": result[3] if result[3] and result[3].strip() else "Unknown",
+        "action": result[4],
+        "old_values": from_json(result[5]),
+        "new_values": from_json(result[6]),
+        "timestamp": result[7],
+        "ip_address": str(result[8]) if result[8] else None,
+        "user_agent": result[9]
+    }
+
+
+class AuditRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def insert_events(self, events: List[Dict[str, Any]]) -> int:
+        """Write a batch of audit events with a single multi-row INSERT"""
+        if not events:
+            return 0
+
+        def to_json(value):
+            return json.dumps(value, default=str) if value is not None else None
+
+        try:
+            self.db.execute(
+                text("""
+                    INSERT INTO document_audit
+                        (document_id, user_id, action, old_values, new_values,
+                         timestamp, ip_address, user_agent)
+                    SELECT * FROM unnest(
+                        CAST(:document_ids AS uuid[]), CAST(:user_ids AS uuid[]),
+                        CAST(:actions AS text[]), CAST(:old_values AS jsonb[]),
+                        CAST(:new_values AS jsonb[]), CAST(:timestamps AS timestamp[]),
+                        CAST(:ip_addresses AS inet[]), CAST(:user_agents AS text[])
+                    )
+                """),
+                {
+                    "document_ids": [event["document_id"] for event in events],
+                    "user_ids": [event["user_id"] for event in events],
+                    "actions": [event["action"] for event in events],
+                    "old_values": [to_json(event.get("old_values")) for event in events],
+                    "new_values": [to_json(event.get("new_values")) for event in events],
+                    "timestamps": [event["timestamp"] for event in events],
+                    "ip_addresses": [event.get("ip_address") for event in events],
+                    "user_agents": [event.get("user_agent") for event in events]
+                }
+            )
+            self.db.commit()
+            return len(events)
+        except Exception:
+            self.db.rollback()
+            raise
+
+    def get_partition_months(self) -> List[date]:
+        """Months that have a partition, oldest first"""
+        results = self.db.execute(PARTITIONS_QUERY).fetchall()
+        return sorted(month for month in (partition_month(result[0]) for result in results) if month)
+
+    def _lock_partitions(self, wait: bool) -> bool:
+        if wait:
+            self.db.execute(text("SELECT pg_advisory_xact_lock(hashtext(:key))"), {"key": PARTITION_LOCK_KEY})
+            return True
+        return self.db.execute(
+            text("SELECT pg_try_advisory_xact_lock(hashtext(:key))"), {"key": PARTITION_LOCK_KEY}
+        ).scalar()
+
+    def _create_partition(self, month: date) -> int:
+        """Create a month's partition, first moving that month's rows out of the default one.
+
+        Postgres refuses to create a partition while the default partition holds rows
+        that belong in it, so the default is detached for the move and attached again.
+        Returns the number of rows moved.
+        """
+        name = partition_name(month)
+        bounds = {"start": month, "end": add_months(month, 1)}
+        # Names and bounds come from dates, never from user input
+        create = (f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF document_audit "
+                  f"FOR VALUES FROM ('{month.isoformat()}') TO ('{bounds['end'].isoformat()}')")
+        stranded = self.db.execute(text(f"""
+            SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE timestamp >= :start AND timestamp < :end)
+        """), bounds).scalar()
+        if not stranded:
+            self.db.execute(text(create))
+            return 0
+
+        self.db.execute(text(f"ALTER TABLE document_audit DETACH PARTITION {DEFAULT_PARTITION}"))
+        self.db.execute(text(create))
+        moved = self.db.execute(text(f"""
+            WITH moved AS (
+                DELETE FROM {DEFAULT_PARTITION} WHERE timestamp >= :start AND timestamp < :end
+                RETURNING {AUDIT_COLUMNS}
+            )
+            INSERT INTO {name} ({AUDIT_COLUMNS}) SELECT {AUDIT_COLUMNS} FROM moved
+        """), bounds).rowcount
+        self.db.execute(text(f"ALTER TABLE document_audit ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+        return moved
+
+    def maintain_partitions(self, months_ahead: int, retention_months: int,
+                            today: Optional[date] = None, wait: bool = False) -> Optional[Dict[str, Any]]:
+        """Create partitions through ``months_ahead`` months from now and drop expired ones.
+
+        Partitions for months older than ``retention_months`` (0 keeps everything) are
+        dropped whole, which is instant and leaves no bloat, unlike DELETE; expired rows
+        in the default partition are deleted. A month whose partition cannot be created
+        is listed under ``failed`` and the rest of the round goes ahead. Returns None
+        without doing anything if another process holds the partition lock and ``wait``
+        is False.
+        """
+        current = (today or datetime.utcnow().date()).replace(day=1)
+        try:
+            if not self._lock_partitions(wait):
+                self.db.rollback()
+                return None
+
+            existing = set(self.get_partition_months())
+            created, failed, moved = [], [], 0
+            for offset in range(months_ahead + 1):
+                month = add_months(current, offset)
+                if month in existing:
+                    continue
+                savepoint = self.db.begin_nested()
+                try:
+                    moved += self._create_partition(month)
+                    savepoint.commit()
+                    created.append(partition_name(month))
+                except Exception as e:
+                    savepoint.rollback()
+                    failed.append(f"{partition_name(month)}: {e}")
+
+            dropped, trimmed = [], 0
+            if retention_months > 0:
+                cutoff = add_months(current, -retention_months)
+                for month in sorted(existing):
+                    if month < cutoff:
+                        self.db.execute(text(f"DROP TABLE {partition_name(month)}"))
+                        dropped.append(partition_name(month))
+                trimmed = self.db.execute(
+                    text(f"DELETE FROM {DEFAULT_PARTITION} WHERE timestamp < :cutoff"), {"cutoff": cutoff}
+                ).rowcount
+
+            self.db.commit()
+            return {"created": created, "dropped": dropped, "failed": failed,
+                    "moved": moved, "trimmed": trimmed}
+        except Exception:
+            self.db.rollback()
+            raise
+
+    def is_partitioned(self) -> bool:
+        """Whether document_audit is already a partitioned table"""
+        return self.db.execute(
+            text("SELECT relkind = 'p' FROM pg_class WHERE oid = CAST('document_audit' AS regclass)")
+        ).scalar()
+
+    def partition_existing_table(self, months_ahead: int) -> int:
+        """Convert a plain document_audit table into the monthly partitioned layout.
+
+        Runs in one transaction: the old table is renamed, the partitioned one created
+        with a partition for every month that has rows, rows are copied over and the
+        old table dropped. Returns the number of rows moved.
+        """
+        try:
+            self._lock_partitions(wait=True)
+            self.db.execute(text("ALTER TABLE document_audit RENAME TO document_audit_unpartitioned"))
+            self.db.execute(text(
+                "ALTER TABLE document_audit_unpartitioned RENAME CONSTRAINT document_audit_pkey "
+                "TO document_audit_unpartitioned_pkey"
+            ))
+            self.db.execute(text("DROP INDEX IF EXISTS idx_document_audit_document_id"))
+            self.db.execute(text("DROP INDEX IF EXISTS idx_document_audit_timestamp"))
+
+            self.db.execute(text("""
+                CREATE TABLE document_audit (
+                    audit_id UUID NOT NULL DEFAULT uuid_generate_v4(),
+                    document_id UUID NOT NULL,
+                    user_id UUID NOT NULL REFERENCES users(user_id),
+                    action VARCHAR(50) NOT NULL,
+                    old_values JSONB,
+                    new_values JSONB,
+                    timestamp TIMESTAMP NOT NULL DEFAULT NOW(),
+                    ip_address INET,
+                    user_agent TEXT,
+                    PRIMARY KEY (audit_id, timestamp)
+                ) PARTITION BY RANGE (timestamp)
+            """))
+            self.db.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF document_audit DEFAULT"))
+
+            current = datetime.utcnow().date().replace(day=1)
+            months = {add_months(current, offset) for offset in range(months_ahead + 1)}
+            months.update(
+                result[0].date() for result in self.db.execute(text("""
+                    SELECT DISTINCT date_trunc('month', timestamp)
+                    FROM document_audit_unpartitioned
+                    WHERE timestamp IS NOT NULL
+                """)).fetchall()
+            )
+            for month in sorted(months):
+                self._create_partition(month)
+
+            moved = self.db.execute(text("""
+                INSERT INTO document_audit
+                    (audit_id, document_id, user_id, action, old_values, new_values,
+                     timestamp, ip_address, user_agent)
+                SELECT audit_id, document_id, user_id, action, old_values, new_values,
+                       COALESCE(timestamp, NOW()), ip_address, user_agent
+                FROM document_audit_unpartitioned
+            """)).rowcount
+            self.db.execute(text("DROP TABLE document_audit_unpartitioned"))
+
+            self.db.execute(text(
+                "CREATE INDEX idx_document_audit_document_id ON document_audit(document_id, timestamp)"
+            ))
+            self.db.execute(text(
+                "CREATE INDEX idx_document_audit_user_id ON document_audit(user_id, timestamp)"
+            ))
+            self.db.execute(text(
+                "CREATE INDEX idx_document_audit_timestamp ON document_audit USING BRIN (timestamp)"
+            ))
+            self.db.commit()
+            return moved
+        except Exception:
+            self.db.rollback()
+            raise
@@ -0,0 +1,90 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from typing import Optional, Dict, Any
+
+
+class AuthSessionRepository:
+    """Refresh-token sessions, looked up by the SHA-256 of the token through unique indexes"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create_session(self, session_id: str, user_id: str, token_hash: str, ttl_days: int) -> None:
+        """Start a session for a newly issued refresh token"""
+        self.db.execute(
+            text("""INSERT INTO auth_sessions (session_id, user_id, token_hash, expires_at)
+                    VALUES (:session_id, :user_id, :token_hash, NOW() + make_interval(days => :ttl_days))"""),
+            {"session_id": session_id, "user_id": user_id, "token_hash": token_hash, "ttl_days": ttl_days}
+        )
+        self.db.commit()
+
+    def rotate_session(self, token_hash: str, new_token_hash: str, ttl_days: int) -> Optional[Dict[str, Any]]:
+        """Swap a live refresh token for a new one in a single statement.
+        
+        Returns the session and user IDs, or None if the token is unknown, revoked or expired.
+        """
+        result = self.db.execute(
+            text("""
+                UPDATE auth_sessions
+                SET previous_token_hash = token_hash,
+                    token_hash = :new_token_hash,
+                    last_used_at = NOW(),
+                    expires_at = NOW() + make_interval(days => :ttl_days)
+                WHERE token_hash = :token_hash AND revoked_at IS NULL AND expires_at > NOW()
+                RETURNING session_id, user_id
+            """),
+            {"token_hash": token_hash, "new_token_hash": new_token_hash, "ttl_days": ttl_days}
+        ).fetchone()
+        self.db.commit()
+        if not result:
+            return None
+        return {"session_id": str(result[0]), "user_id": str(result[1])}  # Convert UUID to string
+
+    def revoke_reused_session(self, token_hash: str, grace_seconds: int = 0) -> bool:
+        """Revoke the session a rotated-out token belonged to; its reuse suggests it leaked.
+        
+        Reuse within ``grace_seconds`` of the rotation is left alone, as concurrent
+        refreshes from several tabs of the same browser look exactly like that.
+        """
+        result = self.db.execute(
+            text("""UPDATE auth_sessions SET revoked_at = NOW()
+                    WHERE previous_token_hash = :token_hash AND revoked_at IS NULL
+                      AND last_used_at <= NOW() - make_interval(secs => :grace_seconds)"""),
+            {"token_hash": token_hash, "grace_seconds": grace_seconds}
+        )
+        self.db.commit()
+        return result.rowcount > 0
+
+    def revoke_session(self, token_hash: str) -> bool:
+        """Revoke the session of a refresh token"""
+        result = self.db.execute(
+            text("UPDATE auth_sessions SET revoked_at = NOW() WHERE token_hash = :token_hash AND revoked_at IS NULL"),
+            {"token_hash": token_hash}
+        )
+        self.db.commit()
+        return result.rowcount > 0
+
+    def revoke_session_by_id(self, session_id: str) -> None:
+        """Revoke a session"""
+        self.db.execute(
+            text("UPDATE auth_sessions SET revoked_at = NOW() WHERE session_id = :session_id AND revoked_at IS NULL"),
+            {"session_id": session_id}
+        )
+        self.db.commit()
+
+    def revoke_user_sessions(self, user_id: str) -> int:
+        """Revoke every live session of a user"""
+        result = self.db.execute(
+            text("UPDATE auth_sessions SET revoked_at = NOW() WHERE user_id = :user_id AND revoked_at IS NULL"),
+            {"user_id": user_id}
+        )
+        self.db.commit()
+        return result.rowcount
+
+    def delete_stale_sessions(self) -> int:
+        """Delete expired and revoked sessions"""
+        result = self.db.execute(
+            text("DELETE FROM auth_sessions WHERE expires_at <= NOW() OR revoked_at IS NOT NULL")
+        )
+        self.db.commit()
+        return result.rowcount
@@ -0,0 +1,100 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from datetime import datetime
+from typing import Optional
+
+class ContentRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def has_content(self, checksum: str) -> bool:
+        """Check whether text has already been extracted successfully for a file checksum"""
+        result = self.db.execute(
+            text("SELECT 1 FROM document_contents WHERE checksum = :checksum AND status IN ('extracted', 'truncated')"),
+            {"checksum": checksum}
+        ).fetchone()
+        return result is not None
+
+    def save_content(self, checksum: str, content: Optional[str], status: str) -> None:
+        """Store the outcome of extracting a file checksum.
+        
+        An earlier 'failed' or 'unsupported' outcome is replaced; a successful one is kept.
+        """
+        self.db.execute(
+            text("""INSERT INTO document_contents (checksum, content, status)
+                    VALUES (:checksum, :content, :status)
+                    ON CONFLICT (checksum) DO UPDATE
+                    SET content = EXCLUDED.content, status = EXCLUDED.status, extracted_at = NOW()
+                    WHERE document_contents.status NOT IN ('extracted', 'truncated')"""),
+            {"checksum": checksum, "content": content, "status": status}
+        )
+        self.db.commit()
+
+    def get_database_time(self) -> datetime:
+        return self.db.execute(text("SELECT NOW()")).scalar()
+
+    def refresh_document_content_vector(self, document_id: str) -> None:
+        """Copy the current version's content vector into the document's search index"""
+        self.db.execute(
+            text("""
+                UPDATE documents d
+                SET content_vector = dc.content_vector
+                FROM document_versions dv
+                LEFT JOIN document_contents dc ON dc.checksum = dv.checksum
+                WHERE d.document_id = :document_id
+                  AND dv.document_id = d.document_id
+                  AND dv.is_current = true
+            """),
+            {"document_id": document_id}
+        )
+        self.db.commit()
+
+    def refresh_content_vectors_for_checksum(self, checksum: str) -> None:
+        """Refresh the search index of every document whose current version is this file"""
+        self.db.execute(
+            text("""
+                UPDATE documents d
+                SET content_vector = dc.content_vector
+                FROM document_versions dv
+                JOIN document_contents dc ON dc.checksum = dv.checksum
+                WHERE dv.checksum = :checksum
+                  AND dv.document_id = d.document_id
+                  AND dv.is_current = true
+            """),
+            {"checksum": checksum}
+        )
+        self.db.commit()
+
+    def get_versions_missing_content(self, limit: int = 1000,
+                                     retry_before: Optional[datetime] = None) -> list:
+        """Get current versions whose file has not been through extraction yet.
+        
+        With ``retry_before``, versions whose extraction failed or was unsupported at a
+        time before it are included too.
+        """
+        results = self.db.execute(
+            text("""
+                SELECT dv.document_id, dv.checksum, dv.file_path, dv.file_type
+                FROM document_versions dv
+                WHERE dv.is_current = true
+                  AND dv.checksum IS NOT NULL AND dv.checksum <> ''
+                  AND NOT EXISTS (
+                      SELECT 1 FROM document_contents dc
+                      WHERE dc.checksum = dv.checksum
+                        AND (dc.status IN ('extracted', 'truncated')
+                             OR CAST(:retry_before AS timestamp) IS NULL
+                             OR dc.extracted_at >= CAST(:retry_before AS timestamp))
+                  )
+                LIMIT :limit
+            """),
+            {"limit": limit, "retry_before": retry_before}
+        ).fetchall()
+        return [
+            {
+                "document_id": str(result[0]),
+                "checksum": result[1],
+                "file_path": result[2],
+                "file_type": result[3]
+            }
+            for result in results
+        ]
@@ -3,6 +3,16 @@ from sqlalchemy import text
 from typing import List
 from ..models.department import Department
 
+ALL_DEPARTMENTS_QUERY = text("SELECT department_id, name, code, description FROM departments ORDER BY name")
+
+
+def department_row_to_dict(result) -> dict:
+    return {
+        "department_id": str(result[0]),  # Convert UUID to string
+        "name": result[1],
+        "code": result[2],
+        "description": result[3]
+    }
 
 class DepartmentRepository:
     def __init__(self, db: Session):
@@ -10,17 +20,8 @@ class DepartmentRepository:
 
     def get_all_departments(self) -> List[dict]:
         """Get all departments"""
-        query = text("SELECT department_id, name, code, description FROM departments ORDER BY name")
-        results = self.db.execute(query).fetchall()
-        return [
-            {
-                "department_id": str(result[0]), 
-                "name": result[1],
-                "code": result[2],
-                "description": result[3]
-            } 
-            for result in results
-        ]  # Convert UUID to string
+        results = self.db.execute(ALL_DEPARTMENTS_QUERY).fetchall()
+        return [department_row_to_dict(result) for result in results]
 
     def get_department_by_id(self, department_id: str) -> Department:
         """Get department by ID"""
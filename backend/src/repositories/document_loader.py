@@ -0,0 +1,124 @@
+"""Request-scoped identity maps over document reads.
+
+A loader remembers every document, version history and tag list it has fetched, so
+a request that looks the same document up several times (a 404 check, the audit
+event, the service doing the work) queries each at most once. Services create one
+loader per instance, i.e. per request, and ``forget`` a document after writing it;
+loaders are never shared between requests, so they cannot serve stale rows.
+"""
+from typing import Any, Dict, List, Optional
+from .document_repository import DocumentRepository
+from .async_document_repository import AsyncDocumentRepository
+import uuid
+
+
+def _is_document_id(document_id: str) -> bool:
+    # Malformed IDs cannot match a row; answering locally keeps them from erroring in Postgres
+    try:
+        uuid.UUID(str(document_id))
+        return True
+    except ValueError:
+        return False
+
+
+def _known_missing(exists: Dict[str, bool], document_id: str) -> bool:
+    return exists.get(document_id) is False or not _is_document_id(document_id)
+
+
+class DocumentLoader:
+    """Per-request cache of DocumentRepository reads, keyed by document ID"""
+
+    def __init__(self, document_repo: DocumentRepository):
+        self.document_repo = document_repo
+        self._exists: Dict[str, bool] = {}
+        self._documents: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._versions: Dict[str, List[Dict[str, Any]]] = {}
+        self._tags: Dict[str, List[str]] = {}
+
+    def exists(self, document_id: str) -> bool:
+        """Whether the document exists; a primary key probe unless it was already loaded"""
+        if document_id not in self._exists:
+            self._exists[document_id] = (
+                _is_document_id(document_id) and self.document_repo.document_exists(document_id)
+            )
+        return self._exists[document_id]
+
+    def document(self, document_id: str) -> Optional[Dict[str, Any]]:
+        """The document row with creator and department, or None if it does not exist"""
+        if document_id not in self._documents:
+            document = None
+            if not _known_missing(self._exists, document_id):
+                document = self.document_repo.get_document_with_details(document_id)
+            self._documents[document_id] = document
+            self._exists[document_id] = document is not None
+        return self._documents[document_id]
+
+    def versions(self, document_id: str) -> List[Dict[str, Any]]:
+        """The document's versions, newest first"""
+        if document_id not in self._versions:
+            self._versions[document_id] = (
+                [] if _known_missing(self._exists, document_id)
+                else self.document_repo.get_document_versions(document_id)
+            )
+        return self._versions[document_id]
+
+    def tags(self, document_id: str) -> List[str]:
+        """The document's tag names"""
+        if document_id not in self._tags:
+            self._tags[document_id] = (
+                [] if _known_missing(self._exists, document_id)
+                else self.document_repo.get_document_tags(document_id)
+            )
+        return self._tags[document_id]
+
+    def forget(self, document_id: str) -> None:
+        """Drop everything loaded for a document, after it was written"""
+        for entries in (self._exists, self._documents, self._versions, self._tags):
+            entries.pop(document_id, None)
+
+
+class AsyncDocumentLoader:
+    """Per-request cache of AsyncDocumentRepository reads; a read-only mirror of DocumentLoader"""
+
+    def __init__(self, document_repo: AsyncDocumentRepository):
+        self.document_repo = document_repo
+        self._exists: Dict[str, bool] = {}
+        self._documents: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._versions: Dict[str, List[Dict[str, Any]]] = {}
+        self._tags: Dict[str, List[str]] = {}
+
+    async def exists(self, document_id: str) -> bool:
+        """Whether the document exists; a primary key probe unless it was already loaded"""
+        if document_id not in self._exists:
+            self._exists[document_id] = (
+                _is_document_id(document_id) and await self.document_repo.document_exists(document_id)
+            )
+        return self._exists[document_id]
+
+    async def document(self, document_id: str) -> Optional[Dict[str, Any]]:
+        """The document row with creator and department, or None if it does not exist"""
+        if document_id not in self._documents:
+            document = None
+            if not _known_missing(self._exists, document_id):
+                document = await self.document_repo.get_document_with_details(document_id)
+            self._documents[document_id] = document
+            self._exists[document_id] = document is not None
+        return self._documents[document_id]
+
+    async def versions(self, document_id: str) -> List[Dict[str, Any]]:
+        """The document's versions, newest first"""
+        if document_id not in self._versions:
+            self._versions[document_id] = (
+                [] if _known_missing(self._exists, document_id)
+                else await self.document_repo.get_document_versions(document_id)
+            )
+        return self._versions[document_id]
+
+    async def tags(self, document_id: str) -> List[str]:
+        """The document's tag names"""
+        if document_id not in self._tags:
+            self._tags[document_id] = (
+                [] if _known_missing(self._exists, document_id)
+                else await self.document_repo.get_document_tags(document_id)
+            )
+        return self._tags[document_id]
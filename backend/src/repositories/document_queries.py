@@ -0,0 +1,296 @@
+"""SQL and row mapping for document reads, shared by the sync and async repositories"""
+from sqlalchemy import text
+from sqlalchemy.sql.elements import TextClause
+from typing import List, Optional, Dict, Any, Tuple, Sequence
+from datetime import datetime
+
+
+def parse_tag_filter(tag_filter: Optional[str]) -> List[str]:
+    """Split a comma-separated tag filter into tag names"""
+    if not tag_filter:
+        return []
+    return [tag.strip() for tag in tag_filter.split(',') if tag.strip()]
+
+
+def acl_condition(alias: str, acl: Optional[Dict[str, Any]]) -> Tuple[Optional[str], Dict[str, Any]]:
+    """WHERE condition restricting rows of ``alias`` (documents or document_summary) to readable ones.
+
+    ``acl`` is a principal's grant context (see core.acl); None or an administrator's
+    context means no restriction. Unrestricted documents and the principal's own are
+    always readable. Grants are matched against ``acl["document_ids"]`` when the context
+    carries them, otherwise with semi-joins on the indexed permission tables.
+    """
+    if not acl or acl["is_admin"]:
+        return None, {}
+
+    params = {"acl_user_id": acl["user_id"]}
+    readable = [
+        f"NOT {alias}.is_restricted",
+        f"{alias}.created_by = CAST(:acl_user_id AS uuid)"
+    ]
+    if acl["document_ids"] is not None:
+        if acl["document_ids"]:
+            readable.append(f"{alias}.document_id = ANY(CAST(:acl_document_ids AS uuid[]))")
+            params["acl_document_ids"] = list(acl["document_ids"])
+    else:
+        readable.append(f"""EXISTS (
+            SELECT 1 FROM document_permissions p
+            WHERE p.document_id = {alias}.document_id AND p.is_active
+              AND (p.user_id = CAST(:acl_user_id AS uuid)
+                   OR p.role_id = CAST(:acl_role_id AS uuid)
+                   OR p.department_id = CAST(:acl_department_id AS uuid))
+        )""")
+        readable.append(f"""EXISTS (
+            SELECT 1 FROM user_document_permissions up
+            WHERE up.document_id = {alias}.document_id AND up.user_id = CAST(:acl_user_id AS uuid)
+        )""")
+        params["acl_role_id"] = acl["role_id"]
+        params["acl_department_id"] = acl["department_id"]
+
+    return "(" + " OR ".join(readable) + ")", params
+
+
+def filter_conditions(search: Optional[str], tag_filter: Optional[str],
+                      acl: Optional[Dict[str, Any]] = None) -> Tuple[List[str], Dict[str, Any]]:
+    """WHERE conditions (on alias ``d``) and parameters for the export's search, tag filter and ACL"""
+    conditions = []
+    params = {}
+
+    access, access_params = acl_condition("d", acl)
+    if access:
+        conditions.append(access)
+        params.update(access_params)
+
+    if search:
+        conditions.append("d.search_vector @@ websearch_to_tsquery('english', :search)")
+        params["search"] = search
+
+    tag_names = parse_tag_filter(tag_filter)
+    if tag_names:
+        # Semi-join so a document matching several tags is returned once
+        conditions.append("""
+            EXISTS (
+                SELECT 1
+                FROM document_tags dt
+                JOIN tags t ON dt.tag_id = t.tag_id
+                WHERE dt.document_id = d.document_id
+                  AND t.name = ANY(CAST(:tag_names AS text[]))
+            )
+        """)
+        params["tag_names"] = tag_names
+
+    return conditions, params
+
+
+def documents_listing_query(search: Optional[str], tag_filter: Optional[str], limit: int, offset: int,
+                            cursor: Optional[Tuple[datetime, str, Optional[float]]],
+                            sort: str, acl: Optional[Dict[str, Any]] = None) -> Tuple[TextClause, Dict[str, Any], bool]:
+    """Build the listing query; returns the statement, its parameters and whether it ranks by relevance.
+    
+    Reads only the trigger-maintained ``document_summary`` read model, so a page is one
+    indexed single-table scan with the tag names already on each row. ``acl`` limits the
+    page to documents the principal may read, see acl_condition.
+    """
+    relevance = bool(search) and sort == "relevance"
+    rank_expr = "ts_rank(s.search_vector, websearch_to_tsquery('english', :search))" if search else "0"
+
+    base_query = f"""
+        SELECT
+            s.document_id, s.title, s.description, s.created_by, s.created_at,
+            s.creator_name, s.department_name,
+            s.version_id, s.version_number, s.file_name, s.file_type, s.file_size,
+            s.uploaded_at, s.version_id IS NOT NULL as is_current,
+            {rank_expr} as search_rank,
+            s.tag_names
+        FROM document_summary s
+    """
+
+    conditions = []
+    params = {}
+
+    access, access_params = acl_condition("s", acl)
+    if access:
+        conditions.append(access)
+        params.update(access_params)
+
+    if search:
+        conditions.append("s.search_vector @@ websearch_to_tsquery('english', :search)")
+        params["search"] = search
+
+    tag_names = parse_tag_filter(tag_filter)
+    if tag_names:
+        # Array overlap, answered by the GIN index on tag_names
+        conditions.append("s.tag_names && CAST(:tag_names AS text[])")
+        params["tag_names"] = tag_names
+
+    if cursor:
+        cursor_created_at, cursor_document_id, cursor_rank = cursor
+        if relevance:
+            conditions.append(f"""({rank_expr}, s.created_at, s.document_id)
+                < (CAST(:cursor_rank AS real), :cursor_created_at, CAST(:cursor_document_id AS uuid))""")
+            params["cursor_rank"] = cursor_rank or 0.0
+        else:
+            conditions.append("(s.created_at, s.document_id) < (:cursor_created_at, CAST(:cursor_document_id AS uuid))")
+        params["cursor_created_at"] = cursor_created_at
+        params["cursor_document_id"] = cursor_document_id
+        offset = 0
+
+    if conditions:
+        base_query += " WHERE " + " AND ".join(conditions)
+
+    order_by = "s.created_at DESC, s.document_id DESC"
+    if relevance:
+        order_by = "search_rank DESC, " + order_by
+    base_query += f" ORDER BY {order_by} LIMIT :limit OFFSET :offset"
+    params.update({"limit": limit, "offset": offset})
+
+    return text(base_query), params, relevance
+
+
+def listing_row_to_dict(result: Sequence[Any], relevance: bool) -> Dict[str, Any]:
+    doc_dict = {
+        "document_id": str(result[0]),  # Convert UUID to string
+        "title": result[1],
+        "description": result[2],
+        "created_by": str(result[3]),  # Convert UUID to string
+        "created_at": result[4],
+        "creator_name": result[5],
+        "department_name": result[6],
+        "current_version": None,
+        "tags": list(result[15] or [])
+    }
+    if relevance:
+        doc_dict["search_rank"] = result[14]  # Needed to build the next cursor
+
+    if result[7]:  # version_id exists
+        doc_dict["current_version"] = {
+            "version_id": str(result[7]),  # Convert UUID to string
+            "version_number": result[8],
+            "file_name": result[9],
+            "file_type": result[10],
+            "file_size": result[11],
+            "uploaded_at": result[12],
+            "is_current": result[13]
+        }
+    return doc_dict
+
+
+TAGS_FOR_DOCUMENTS_QUERY = text("""
+    SELECT dt.document_id, t.name
+    FROM document_tags dt
+    JOIN tags t ON t.tag_id = dt.tag_id
+    WHERE dt.document_id = ANY(CAST(:document_ids AS uuid[]))
+    ORDER BY dt.document_id, t.name
+""")
+
+
+def group_tags(document_ids: List[str], results: Sequence[Sequence[Any]]) -> Dict[str, List[str]]:
+    tags_by_document = {document_id: [] for document_id in document_ids}
+    for result in results:
+        tags_by_document.setdefault(str(result[0]), []).append(result[1])
+    return tags_by_document
+
+
+DOCUMENT_DETAILS_QUERY = text("""
+    SELECT
+        d.document_id, d.title, d.description, d.created_by, d.created_at,
+        u.first_name || ' ' || u.last_name as creator_name,
+        dept.name as department_name
+    FROM documents d
+    JOIN users u ON d.created_by = u.user_id
+    JOIN departments dept ON u.department_id = dept.department_id
+    WHERE d.document_id = :document_id
+""")
+
+
+def document_row_to_dict(result: Sequence[Any]) -> Dict[str, Any]:
+    return {
+        "document_id": str(result[0]),  # Convert UUID to string
+        "title": result[1],
+        "description": result[2],
+        "created_by": str(result[3]),  # Convert UUID to string
+        "created_at": result[4],
+        "creator_name": result[5],
+        "department_name": result[6]
+    }
+
+
+DOCUMENT_TAGS_QUERY = text("""
+    SELECT t.name
+    FROM tags t
+    JOIN document_tags dt ON t.tag_id = dt.tag_id
+    WHERE dt.document_id = :document_id
+    ORDER BY t.name
+""")
+
+
+DOCUMENT_VERSIONS_QUERY = text("""
+    SELECT dv.version_id, dv.version_number, dv.file_name, dv.file_type, dv.file_size,
+           dv.uploaded_at, dv.is_current, dv.file_path, dv.uploaded_by, dv.checksum,
+           CONCAT(u.first_name, ' ', u.last_name) as uploader_name
+    FROM document_versions dv
+    LEFT JOIN users u ON dv.uploaded_by = u.user_id
+    WHERE dv.document_id = :document_id
+    ORDER BY dv.version_number DESC
+""")
+
+
+def version_row_to_dict(result: Sequence[Any]) -> Dict[str, Any]:
+    return {
+        "version_id": str(result[0]),  # Convert UUID to string
+        "version_number": result[1],
+        "file_name": result[2],
+        "file_type": result[3],
+        "file_size": result[4],
+        "uploaded_at": result[5],
+        "is_current": result[6],
+        "file_path": result[7],
+        "uploaded_by": str(result[8]) if result[8] else None,  # Convert UUID to string
+        "checksum": result[9] if result[9] else "",  # Handle missing checksum
+        "uploader_name": result[10] if result[10] else "Unknown"
+    }
+
+
+def download_query(document_id: str, version_id: Optional[str] = None,
+                   acl: Optional[Dict[str, Any]] = None) -> Tuple[TextClause, Dict[str, Any]]:
+    """Query for a specific version, or the current one, of a document the principal may read"""
+    access, params = acl_condition("d", acl)
+    access = f" AND {access}" if access else ""
+    params["document_id"] = document_id
+
+    if version_id:
+        params["version_id"] = version_id
+        return text(f"""
+            SELECT dv.version_id, dv.file_name, dv.file_path, dv.file_type,
+                   dv.file_size, dv.checksum, dv.uploaded_at
+            FROM documents d
+            JOIN document_versions dv ON dv.document_id = d.document_id
+            WHERE dv.version_id = :version_id AND d.document_id = :document_id{access}
+        """), params
+    return text(f"""
+        SELECT dv.version_id, dv.file_name, dv.file_path, dv.file_type,
+               dv.file_size, dv.checksum, dv.uploaded_at
+        FROM documents d
+        JOIN document_versions dv ON dv.version_id = d.current_version_id
+        WHERE d.document_id = :document_id{access}
+    """), params
+
+
+def readable_query(document_id: str, acl: Optional[Dict[str, Any]]) -> Tuple[TextClause, Dict[str, Any]]:
+    """Query returning a row if the document exists and the principal may read it"""
+    access, params = acl_condition("d", acl)
+    access = f" AND {access}" if access else ""
+    params["document_id"] = document_id
+    return text(f"SELECT 1 FROM documents d WHERE d.document_id = :document_id{access}"), params
+
+
+def download_row_to_dict(result: Sequence[Any]) -> Dict[str, Any]:
+    return {
+        "version_id": str(result[0]),  # Convert UUID to string
+        "file_name": result[1],
+        "file_path": result[2],
+        "file_type": result[3],
+        "file_size": result[4],
+        "checksum": result[5],
+        "uploaded_at": result[6]
+    }
@@ -1,8 +1,10 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import text, desc
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple, Callable
+from datetime import datetime
 from ..models.document import Document, DocumentVersion
 from ..models.tag import Tag, DocumentTag
+from . import document_queries
 from pathlib import Path
 import uuid
 
@@ -19,298 +21,582 @@ class DocumentRepository:
         self.db.refresh(db_document)
         return db_document
 
-    def create_document_version(self, version_data: dict) -> DocumentVersion:
-        """Create a new document version"""
-        db_version = DocumentVersion(**version_data)
-        self.db.add(db_version)
-        self.db.commit()
+    def create_document_version(self, version_data: dict,
+                                store_blob: Optional[Callable[[], Any]] = None) -> DocumentVersion:
+        """Create a new document version and count its reference to the stored blob.
+        
+        ``store_blob`` moves the file into the blob store. It is called once the reference
+        is recorded (which locks the blob row against a concurrent release) and before
+        the transaction commits, so a failed move leaves no version behind.
+        """
+        try:
+            db_version = DocumentVersion(**version_data)
+            self.db.add(db_version)
+            if version_data.get("is_current"):
+                self.db.flush()  # The pointer below references the new row
+                self.db.execute(
+                    text("UPDATE documents SET current_version_id = :version_id WHERE document_id = :document_id"),
+                    {"version_id": version_data["version_id"], "document_id": version_data["document_id"]}
+                )
+            if version_data.get("checksum"):
+                self._add_blob_reference(version_data["checksum"], version_data["file_path"],
+                                         version_data["file_size"])
+            self.db.flush()
+            if store_blob:
+                store_blob()
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
         self.db.refresh(db_version)
         return db_version
 
+    def bulk_create_documents(self, documents: List[dict], versions: List[dict],
+                              document_tags: List[Tuple[str, str]], added_by: str,
+                              store_blobs: Optional[Callable[[], Any]] = None) -> None:
+        """Insert documents, their first versions, blob references and tags in one transaction.
+        
+        Each table is written with a single multi-row insert; nothing is committed if any
+        row fails. ``store_blobs`` moves the files into the blob store before the commit
+        (see create_document_version).
+        """
+        try:
+            self.db.execute(
+                text("""
+                    INSERT INTO documents (document_id, title, description, created_by)
+                    SELECT * FROM unnest(
+                        CAST(:document_ids AS uuid[]), CAST(:titles AS text[]),
+                        CAST(:descriptions AS text[]), CAST(:created_by AS uuid[])
+                    )
+                """),
+                {
+                    "document_ids": [d["document_id"] for d in documents],
+                    "titles": [d["title"] for d in documents],
+                    "descriptions": [d["description"] for d in documents],
+                    "created_by": [d["created_by"] for d in documents]
+                }
+            )
+            
+            self.db.execute(
+                text("""
+                    INSERT INTO document_versions (
+                        version_id, document_id, version_number, file_name, file_path,
+                        file_type, file_size, checksum, uploaded_by, is_current
+                    )
+                    SELECT version_id, document_id, 1, file_name, file_path,
+                           file_type, file_size, checksum, uploaded_by, TRUE
+                    FROM unnest(
+                        CAST(:version_ids AS uuid[]), CAST(:document_ids AS uuid[]),
+                        CAST(:file_names AS text[]), CAST(:file_paths AS text[]),
+                        CAST(:file_types AS text[]), CAST(:file_sizes AS bigint[]),
+                        CAST(:checksums AS text[]), CAST(:uploaded_by AS uuid[])
+                    ) AS v(version_id, document_id, file_name, file_path,
+                           file_type, file_size, checksum, uploaded_by)
+                """),
+                {
+                    "version_ids": [v["version_id"] for v in versions],
+                    "document_ids": [v["document_id"] for v in versions],
+                    "file_names": [v["file_name"] for v in versions],
+                    "file_paths": [v["file_path"] for v in versions],
+                    "file_types": [v["file_type"] for v in versions],
+                    "file_sizes": [v["file_size"] for v in versions],
+                    "checksums": [v["checksum"] for v in versions],
+                    "uploaded_by": [v["uploaded_by"] for v in versions]
+                }
+            )
+            
+            self.db.execute(
+                text("""
+                    UPDATE documents d SET current_version_id = v.version_id
+                    FROM unnest(CAST(:document_ids AS uuid[]), CAST(:version_ids AS uuid[]))
+                        AS v(document_id, version_id)
+                    WHERE d.document_id = v.document_id
+                """),
+                {
+                    "document_ids": [v["document_id"] for v in versions],
+                    "version_ids": [v["version_id"] for v in versions]
+                }
+            )
+            
+            # One reference per version, folded per checksum so each blob row is hit once
+            self.db.execute(
+                text("""
+                    INSERT INTO blobs (checksum, file_path, file_size, ref_count)
+                    SELECT checksum, MIN(file_path), MAX(file_size), COUNT(*)
+                    FROM unnest(
+                        CAST(:checksums AS text[]), CAST(:file_paths AS text[]),
+                        CAST(:file_sizes AS bigint[])
+                    ) AS v(checksum, file_path, file_size)
+                    GROUP BY checksum
+                    ON CONFLICT (checksum) DO UPDATE SET ref_count = blobs.ref_count + EXCLUDED.ref_count
+                """),
+                {
+                    "checksums": [v["checksum"] for v in versions],
+                    "file_paths": [v["file_path"] for v in versions],
+                    "file_sizes": [v["file_size"] for v in versions]
+                }
+            )
+            
+            if document_tags:
+                self.db.execute(
+                    text("""
+                        INSERT INTO document_tags (document_id, tag_id, added_by)
+                        SELECT document_id, tag_id, CAST(:added_by AS uuid)
+                        FROM unnest(CAST(:document_ids AS uuid[]), CAST(:tag_ids AS uuid[]))
+                            AS t(document_id, tag_id)
+                        ON CONFLICT DO NOTHING
+                    """),
+                    {
+                        "document_ids": [document_id for document_id, _ in document_tags],
+                        "tag_ids": [tag_id for _, tag_id in document_tags],
+                        "added_by": added_by
+                    }
+                )
+            
+            if store_blobs:
+                store_blobs()
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
     def get_document_by_id(self, document_id: str) -> Optional[Document]:
         """Get document by ID"""
         return self.db.query(Document).filter(Document.document_id == document_id).first()
 
+    def _filter_conditions(self, search: Optional[str], tag_filter: Optional[str],
+                           acl: Optional[Dict[str, Any]] = None) -> Tuple[List[str], Dict[str, Any]]:
+        """WHERE conditions (on alias ``d``) and parameters for the export's search, tag filter and ACL"""
+        return document_queries.filter_conditions(search, tag_filter, acl)
+
     def get_documents_with_details(self, search: Optional[str] = None, 
                                  tag_filter: Optional[str] = None,
-                                 limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
-        """Get documents with creator and department details"""
-        base_query = """
-            SELECT DISTINCT
-                d.document_id, d.title, d.description, d.created_by, d.created_at,
-                u.first_name || ' ' || u.last_name as creator_name,
-                dept.name as department_name,
-                dv.version_id, dv.version_number, dv.file_name, dv.file_type, dv.file_size,
-                dv.uploaded_at, dv.is_current
-            FROM documents d
-            JOIN users u ON d.created_by = u.user_id
-            JOIN departments dept ON u.department_id = dept.department_id
-            LEFT JOIN document_versions dv ON d.document_id = dv.document_id AND dv.is_current = true
-        """
-        
-        conditions = []
-        params = {}
+                                 limit: int = 100, offset: int = 0,
+                                 cursor: Optional[Tuple[datetime, str, Optional[float]]] = None,
+                                 sort: str = "newest",
+                                 acl: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Get documents with creator and department details.
         
-        if search:
-            conditions.append("(d.title ILIKE :search OR d.description ILIKE :search)")
-            params["search"] = f"%{search}%"
-        
-        if tag_filter:
-            # Parse comma-separated tags
-            tag_names = [tag.strip() for tag in tag_filter.split(',') if tag.strip()]
-            if tag_names:
-                base_query += """
-                    JOIN document_tags dt ON d.document_id = dt.document_id
-                    JOIN tags t ON dt.tag_id = t.tag_id
-                """
-                # Create placeholders for each tag
-                tag_placeholders = ', '.join([f':tag_{i}' for i in range(len(tag_names))])
-                conditions.append(f"t.name IN ({tag_placeholders})")
-                # Add each tag to params
-                for i, tag_name in enumerate(tag_names):
-                    params[f"tag_{i}"] = tag_name
+        Served from the ``document_summary`` read model. ``search`` is parsed with
+        websearch_to_tsquery and matched against its GIN-indexed ``search_vector``. With ``sort="relevance"`` matches are ordered by ts_rank.
+        When ``cursor`` is given as ``(created_at, document_id, rank)`` of the last row of the
+        previous page, keyset pagination is used and ``offset`` is ignored. ``acl`` (a
+        principal's grant context) filters out documents the principal may not read.
+        """
+        query, params, relevance = document_queries.documents_listing_query(
+            search, tag_filter, limit, offset, cursor, sort, acl
+        )
+        results = self.db.execute(query, params).fetchall()
+        return [document_queries.listing_row_to_dict(result, relevance) for result in results]
+
+    def get_versions_for_export(self, search: Optional[str] = None,
+                                tag_filter: Optional[str] = None,
+                                document_ids: Optional[List[str]] = None,
+                                version_ids: Optional[List[str]] = None,
+                                limit: int = 10000,
+                                acl: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Get the stored files to export.
         
-        if conditions:
-            base_query += " WHERE " + " AND ".join(conditions)
+        Explicit ``document_ids`` select current versions and ``version_ids`` select specific
+        versions; without either every matching document's current version is exported.
+        ``search`` and ``tag_filter`` narrow the result with the listing's semantics.
+        """
+        conditions, params = self._filter_conditions(search, tag_filter, acl)
         
-        base_query += " ORDER BY d.created_at DESC LIMIT :limit OFFSET :offset"
-        params.update({"limit": limit, "offset": offset})
+        if document_ids or version_ids:
+            conditions.append("""(
+                (dv.is_current = true AND d.document_id = ANY(CAST(:document_ids AS uuid[])))
+                OR dv.version_id = ANY(CAST(:version_ids AS uuid[]))
+            )""")
+            params["document_ids"] = list(document_ids or [])
+            params["version_ids"] = list(version_ids or [])
+        else:
+            conditions.append("dv.is_current = true")
         
-        results = self.db.execute(text(base_query), params).fetchall()
+        query = f"""
+            SELECT d.document_id, d.title, dv.version_id, dv.version_number, dv.file_name,
+                   dv.file_path, dv.file_type, dv.file_size, dv.uploaded_at
+            FROM documents d
+            JOIN document_versions dv ON d.document_id = dv.document_id
+            WHERE {" AND ".join(conditions)}
+            ORDER BY d.created_at DESC, d.document_id DESC, dv.version_number
+            LIMIT :limit
+        """
+        params["limit"] = limit
         
-        documents = []
-        for result in results:
-            doc_dict = {
+        results = self.db.execute(text(query), params).fetchall()
+        return [
+            {
                 "document_id": str(result[0]),  # Convert UUID to string
                 "title": result[1],
-                "description": result[2],
-                "created_by": str(result[3]),  # Convert UUID to string
-                "created_at": result[4],
-                "creator_name": result[5],
-                "department_name": result[6],
-                "current_version": None,
-                "tags": []
+                "version_id": str(result[2]),
+                "version_number": result[3],
+                "file_name": result[4],
+                "file_path": result[5],
+                "file_type": result[6],
+                "file_size": result[7],
+                "uploaded_at": result[8]
             }
-            
-            if result[7]:  # version_id exists
-                doc_dict["current_version"] = {
-                    "version_id": str(result[7]),  # Convert UUID to string
-                    "version_number": result[8],
-                    "file_name": result[9],
-                    "file_type": result[10],
-                    "file_size": result[11],
-                    "uploaded_at": result[12],
-                    "is_current": result[13]
-                }
-            
-            documents.append(doc_dict)
-        
-        # Populate tags for each document
-        for document in documents:
-            document["tags"] = self.get_document_tags(document["document_id"])
-        
-        return documents
+            for result in results
+        ]
+
+    def document_exists(self, document_id: str) -> bool:
+        """Whether the document exists, by primary key only"""
+        query, params = document_queries.readable_query(document_id, None)
+        return self.db.execute(query, params).fetchone() is not None
+
+    def can_read_document(self, document_id: str, acl: Optional[Dict[str, Any]]) -> bool:
+        """Whether the document exists and the principal may read it"""
+        query, params = document_queries.readable_query(document_id, acl)
+        return self.db.execute(query, params).fetchone() is not None
 
     def get_document_with_details(self, document_id: str) -> Optional[Dict[str, Any]]:
         """Get single document with all details"""
-        query = text("""
-            SELECT 
-                d.document_id, d.title, d.description, d.created_by, d.created_at,
-                u.first_name || ' ' || u.last_name as creator_name,
-                dept.name as department_name
-            FROM documents d
-            JOIN users u ON d.created_by = u.user_id
-            JOIN departments dept ON u.department_id = dept.department_id
-            WHERE d.document_id = :document_id
-        """)
-        
-        result = self.db.execute(query, {"document_id": document_id}).fetchone()
+        result = self.db.execute(document_queries.DOCUMENT_DETAILS_QUERY, {"document_id": document_id}).fetchone()
         if not result:
             return None
-        
-        return {
-            "document_id": str(result[0]),  # Convert UUID to string
-            "title": result[1],
-            "description": result[2],
-            "created_by": str(result[3]),  # Convert UUID to string
-            "created_at": result[4],
-            "creator_name": result[5],
-            "department_name": result[6]
-        }
+        return document_queries.document_row_to_dict(result)
 
     def get_document_versions(self, document_id: str) -> List[Dict[str, Any]]:
         """Get all versions of a document"""
-        query = text("""
-            SELECT dv.version_id, dv.version_number, dv.file_name, dv.file_type, dv.file_size, 
-                   dv.uploaded_at, dv.is_current, dv.file_path, dv.uploaded_by, dv.checksum,
-                   CONCAT(u.first_name, ' ', u.last_name) as uploader_name
-            FROM document_versions dv
-            LEFT JOIN users u ON dv.uploaded_by = u.user_id
-            WHERE dv.document_id = :document_id
-            ORDER BY dv.version_number DESC
-        """)
-        
-        results = self.db.execute(query, {"document_id": document_id}).fetchall()
-        return [
-            {
-                "version_id": str(result[0]),  # Convert UUID to string
-                "version_number": result[1],
-                "file_name": result[2],
-                "file_type": result[3],
-                "file_size": result[4],
-                "uploaded_at": result[5],
-                "is_current": result[6],
-                "file_path": result[7],
-                "uploaded_by": str(result[8]) if result[8] else None,  # Convert UUID to string
-                "checksum": result[9] if result[9] else "",  # Handle missing checksum
-                "uploader_name": result[10] if result[10] else "Unknown"
-            }
-            for result in results
-        ]
+        results = self.db.execute(document_queries.DOCUMENT_VERSIONS_QUERY, {"document_id": document_id}).fetchall()
+        return [document_queries.version_row_to_dict(result) for result in results]
 
-    def get_document_version_for_download(self, document_id: str, version_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
-        """Get document version for download"""
-        if version_id:
-            query = text("""
-                SELECT dv.version_id, dv.file_name, dv.file_path, dv.file_type
-                FROM document_versions dv
-                WHERE dv.version_id = :version_id AND dv.document_id = :document_id
-            """)
-            result = self.db.execute(query, {
-                "version_id": version_id,
-                "document_id": document_id
-            }).fetchone()
-        else:
-            query = text("""
-                SELECT dv.version_id, dv.file_name, dv.file_path, dv.file_type
-                FROM document_versions dv
-                WHERE dv.document_id = :document_id AND dv.is_current = true
-            """)
-            result = self.db.execute(query, {"document_id": document_id}).fetchone()
-        
+    def get_document_version_for_download(self, document_id: str, version_id: Optional[str] = None,
+                                          acl: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Get document version for download, if the principal may read the document"""
+        query, params = document_queries.download_query(document_id, version_id, acl)
+        result = self.db.execute(query, params).fetchone()
         if result:
-            return {
-                "version_id": result[0],
-                "file_name": result[1],
-                "file_path": result[2],
-                "file_type": result[3]
-            }
+            return document_queries.download_row_to_dict(result)
         return None
 
     def set_current_version(self, document_id: str, version_id: str) -> bool:
-        """Set a specific version as current"""
+        """Make a version current, keeping ``documents.current_version_id`` in step.
+        
+        The document row is locked first so concurrent switches serialize; the partial
+        unique index on ``document_versions(document_id) WHERE is_current`` rejects anything
+        that would leave two current versions.
+        """
         try:
-            # First, set all versions to not current
-            self.db.execute(
-                text("UPDATE document_versions SET is_current = false WHERE document_id = :document_id"),
+            locked = self.db.execute(
+                text("SELECT 1 FROM documents WHERE document_id = :document_id FOR UPDATE"),
                 {"document_id": document_id}
+            ).fetchone()
+            if not locked:
+                self.db.rollback()
+                return False
+            
+            # Clear the old current version before marking the new one (the index is not deferrable)
+            self.db.execute(
+                text("""UPDATE document_versions SET is_current = false
+                        WHERE document_id = :document_id AND is_current
+                          AND version_id IS DISTINCT FROM CAST(:version_id AS uuid)"""),
+                {"document_id": document_id, "version_id": version_id}
             )
             
-            # Then set the specified version as current (only if version_id is provided)
             if version_id:
                 result = self.db.execute(
                     text("UPDATE document_versions SET is_current = true WHERE version_id = :version_id AND document_id = :document_id"),
                     {"version_id": version_id, "document_id": document_id}
                 )
-                self.db.commit()
-                return result.rowcount > 0
-            else:
-                # If no version_id provided, just commit the changes (all set to false)
-                self.db.commit()
-                return True
+                if result.rowcount == 0:
+                    self.db.rollback()  # Unknown version: keep the old current one
+                    return False
+            
+            self.db.execute(
+                text("UPDATE documents SET current_version_id = :version_id, updated_at = NOW() WHERE document_id = :document_id"),
+                {"version_id": version_id or None, "document_id": document_id}
+            )
+            self.db.commit()
+            return True
         except Exception:
             self.db.rollback()
             return False
 
-    def ensure_single_current_version(self, document_id: str) -> bool:
-        """Ensure only one version is marked as current for a document"""
+    def repair_current_versions(self) -> Dict[str, int]:
+        """Restore exactly one current version per document and re-sync the pointers.
+        
+        Documents with several current versions keep the highest-numbered one; documents
+        with none get their latest version. Set-based, so it is safe to run on a live table.
+        """
         try:
-            # Find all current versions for this document
-            current_versions = self.db.execute(
-                text("SELECT version_id FROM document_versions WHERE document_id = :document_id AND is_current = true ORDER BY version_number DESC"),
-                {"document_id": document_id}
-            ).fetchall()
+            demoted = self.db.execute(text("""
+                UPDATE document_versions dv SET is_current = false
+                FROM (
+                    SELECT version_id,
+                           row_number() OVER (PARTITION BY document_id ORDER BY version_number DESC) AS rank
+                    FROM document_versions
+                    WHERE is_current
+                ) ranked
+                WHERE dv.version_id = ranked.version_id AND ranked.rank > 1
+            """)).rowcount
             
-            if len(current_versions) > 1:
-                # Set all to false first
-                self.db.execute(
-                    text("UPDATE document_versions SET is_current = false WHERE document_id = :document_id"),
-                    {"document_id": document_id}
-                )
-                # Set only the latest one as current
-                self.db.execute(
-                    text("UPDATE document_versions SET is_current = true WHERE version_id = :version_id"),
-                    {"version_id": current_versions[0][0]}
-                )
-                self.db.commit()
-                return True
-            elif len(current_versions) == 0:
-                # If no current version, set the latest one as current
-                latest_version = self.db.execute(
-                    text("SELECT version_id FROM document_versions WHERE document_id = :document_id ORDER BY version_number DESC LIMIT 1"),
-                    {"document_id": document_id}
-                ).fetchone()
-                if latest_version:
-                    self.db.execute(
-                        text("UPDATE document_versions SET is_current = true WHERE version_id = :version_id"),
-                        {"version_id": latest_version[0]}
+            promoted = self.db.execute(text("""
+                UPDATE document_versions dv SET is_current = true
+                FROM (
+                    SELECT DISTINCT ON (v.document_id) v.version_id
+                    FROM document_versions v
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM document_versions c
+                        WHERE c.document_id = v.document_id AND c.is_current
                     )
-                    self.db.commit()
-                return True
+                    ORDER BY v.document_id, v.version_number DESC
+                ) latest
+                WHERE dv.version_id = latest.version_id
+            """)).rowcount
+            
+            repointed = self.db.execute(text("""
+                UPDATE documents d SET current_version_id = dv.version_id
+                FROM document_versions dv
+                WHERE dv.document_id = d.document_id AND dv.is_current
+                  AND d.current_version_id IS DISTINCT FROM dv.version_id
+            """)).rowcount
+            repointed += self.db.execute(text("""
+                UPDATE documents d SET current_version_id = NULL
+                WHERE d.current_version_id IS NOT NULL
+                  AND NOT EXISTS (
+                      SELECT 1 FROM document_versions dv
+                      WHERE dv.document_id = d.document_id AND dv.is_current
+                  )
+            """)).rowcount
             
-            return True  # Already consistent
+            self.db.commit()
+            return {"demoted": demoted, "promoted": promoted, "repointed": repointed}
         except Exception:
             self.db.rollback()
-            return False
+            raise
 
-    def cleanup_current_versions(self) -> bool:
-        """Fix any documents that have multiple current versions"""
+    def refresh_document_summary(self, document_ids: List[str]) -> None:
+        """Recompute the document_summary rows of the given documents"""
         try:
-            # Get all documents that have multiple current versions
-            duplicate_docs = self.db.execute(
-                text("""
-                    SELECT document_id 
-                    FROM document_versions 
-                    WHERE is_current = true 
-                    GROUP BY document_id 
-                    HAVING COUNT(*) > 1
-                """)
-            ).fetchall()
-            
-            # Fix each document
-            for doc in duplicate_docs:
-                self.ensure_single_current_version(doc[0])
-            
-            return True
+            self.db.execute(
+                text("SELECT refresh_document_summary(CAST(:document_ids AS uuid[]))"),
+                {"document_ids": list(document_ids)}
+            )
+            self.db.commit()
         except Exception:
-            return False
+            self.db.rollback()
+            raise
 
-    def update_document(self, document_id: str, update_data: dict) -> bool:
-        """Update document details"""
+    def rebuild_document_summary(self, batch_size: int = 5000) -> int:
+        """Recompute every document_summary row, one committed batch of documents at a time"""
+        rebuilt = 0
+        last_document_id = None
+        while True:
+            results = self.db.execute(text("""
+                SELECT document_id FROM documents
+                WHERE CAST(:last_document_id AS uuid) IS NULL
+                   OR document_id > CAST(:last_document_id AS uuid)
+                ORDER BY document_id
+                LIMIT :batch_size
+            """), {"last_document_id": last_document_id, "batch_size": batch_size}).fetchall()
+            if not results:
+                return rebuilt
+
+            document_ids = [str(result[0]) for result in results]
+            self.refresh_document_summary(document_ids)
+            rebuilt += len(document_ids)
+            last_document_id = document_ids[-1]
+
+    def check_document_summary(self, limit: int = 100) -> Dict[str, Any]:
+        """Compare document_summary with the rows computed from the normalized tables.
+
+        Returns how many documents are missing a summary row or have a stale one, and
+        up to ``limit`` of their IDs. Orphaned rows cannot exist (the FK cascades).
+        """
+        results = self.db.execute(text("""
+            SELECT src.document_id, s.document_id IS NULL AS missing
+            FROM document_summary_source src
+            LEFT JOIN document_summary s ON s.document_id = src.document_id
+            WHERE s.document_id IS NULL OR ROW(src.*) IS DISTINCT FROM ROW(s.*)
+        """)).fetchall()
+        missing = sum(1 for result in results if result[1])
+        return {
+            "missing": missing,
+            "stale": len(results) - missing,
+            "document_ids": [str(result[0]) for result in results[:limit]]
+        }
+
+    def update_document_with_version(self, document_id: str, title: str, description: Optional[str],
+                                     tag_ids: Dict[str, str], user_id: str,
+                                     new_file: Optional[Dict[str, Any]] = None,
+                                     store_blob: Optional[Callable[[], Any]] = None) -> Optional[Dict[str, Any]]:
+        """Apply an edit in one transaction and return the updated document.
+        
+        Updates title and description, adds a new current version (``new_file`` holds
+        file_name, file_path, file_type, file_size and checksum; without it the current
+        file is carried over), counts its blob reference, moves the current-version
+        pointer and replaces the tag set with ``tag_ids`` (name -> ID, see
+        TagRepository.get_or_create_tag_ids). Four statements, one commit; the response is
+        built from their RETURNING rows. ``store_blob`` moves ``new_file`` into the blob
+        store before the commit (see create_document_version). Returns None if the
+        document does not exist and raises ValueError if there is no file to carry over.
+        """
         try:
-            result = self.db.execute(
-                text("UPDATE documents SET title = :title, description = :description WHERE document_id = :document_id"),
+            # Locks the document row, so concurrent edits of one document run one after another
+            document = self.db.execute(
+                text("""
+                    UPDATE documents d
+                    SET title = :title, description = :description, updated_at = NOW()
+                    FROM users u
+                    JOIN departments dept ON u.department_id = dept.department_id
+                    WHERE d.document_id = :document_id AND u.user_id = d.created_by
+                    RETURNING d.document_id, d.title, d.description, d.created_by, d.created_at,
+                              u.first_name || ' ' || u.last_name, dept.name
+                """),
+                {"title": title, "description": description, "document_id": document_id}
+            ).fetchone()
+            if not document:
+                self.db.rollback()
+                return None
+            
+            # Demote the current version (the unique index is not deferrable, so this must
+            # precede the insert) and read what a metadata-only edit carries over
+            previous = self.db.execute(
+                text("""
+                    WITH demoted AS (
+                        UPDATE document_versions SET is_current = false
+                        WHERE document_id = :document_id AND is_current
+                        RETURNING file_name, file_path, file_type, file_size, checksum
+                    )
+                    SELECT (SELECT COALESCE(MAX(version_number), 0) FROM document_versions
+                            WHERE document_id = :document_id),
+                           demoted.file_name, demoted.file_path, demoted.file_type,
+                           demoted.file_size, demoted.checksum
+                    FROM (SELECT 1) AS one LEFT JOIN demoted ON true
+                """),
+                {"document_id": document_id}
+            ).fetchone()
+            
+            if new_file is None:
+                if previous[1] is None:
+                    raise ValueError("Document has no current version to carry over")
+                new_file = {
+                    "file_name": previous[1],
+                    "file_path": previous[2],
+                    "file_type": previous[3],
+                    "file_size": previous[4],
+                    "checksum": previous[5] or ""
+                }
+            
+            version = self.db.execute(
+                text("""
+                    WITH new_version AS (
+                        INSERT INTO document_versions (
+                            version_id, document_id, version_number, file_name, file_path,
+                            file_type, file_size, checksum, uploaded_by, is_current
+                        )
+                        VALUES (uuid_generate_v4(), :document_id, :version_number, :file_name, :file_path,
+                                :file_type, :file_size, :checksum, :user_id, true)
+                        RETURNING *
+                    ),
+                    pointer AS (
+                        UPDATE documents SET current_version_id = (SELECT version_id FROM new_version)
+                        WHERE document_id = :document_id
+                    ),
+                    blob AS (
+                        INSERT INTO blobs (checksum, file_path, file_size, ref_count)
+                        SELECT checksum, file_path, file_size, 1 FROM new_version WHERE checksum <> ''
+                        ON CONFLICT (checksum) DO UPDATE SET ref_count = blobs.ref_count + 1
+                    )
+                    SELECT nv.version_id, nv.version_number, nv.file_name, nv.file_type, nv.file_size,
+                           nv.uploaded_at, nv.is_current, nv.file_path, nv.uploaded_by, nv.checksum,
+                           CONCAT(u.first_name, ' ', u.last_name)
+                    FROM new_version nv
+                    LEFT JOIN users u ON u.user_id = nv.uploaded_by
+                """),
                 {
-                    "title": update_data.get("title"),
-                    "description": update_data.get("description"),
-                    "document_id": document_id
+                    "document_id": document_id,
+                    "version_number": previous[0] + 1,
+                    "user_id": user_id,
+                    **{key: new_file[key] for key in ("file_name", "file_path", "file_type", "file_size", "checksum")}
                 }
+            ).fetchone()
+            
+            # Replace the tag set; tags that stay keep their original added_by
+            self.db.execute(
+                text("""
+                    WITH wanted AS (
+                        SELECT unnest(CAST(:tag_ids AS uuid[])) AS tag_id
+                    ),
+                    removed AS (
+                        DELETE FROM document_tags
+                        WHERE document_id = :document_id
+                          AND tag_id NOT IN (SELECT tag_id FROM wanted)
+                    )
+                    INSERT INTO document_tags (document_id, tag_id, added_by)
+                    SELECT CAST(:document_id AS uuid), tag_id, CAST(:user_id AS uuid) FROM wanted
+                    ON CONFLICT DO NOTHING
+                """),
+                {"tag_ids": list(tag_ids.values()), "document_id": document_id, "user_id": user_id}
             )
+            
+            if store_blob:
+                store_blob()
             self.db.commit()
-            return result.rowcount > 0
         except Exception:
             self.db.rollback()
-            return False
+            raise
+        
+        result = document_queries.document_row_to_dict(document)
+        result["current_version"] = document_queries.version_row_to_dict(version)
+        result["tags"] = sorted(tag_ids)
+        return result
+
+    def _add_blob_reference(self, checksum: str, file_path: str, file_size: int) -> None:
+        """Count one more reference to a blob (caller commits)"""
+        self.db.execute(
+            text("""INSERT INTO blobs (checksum, file_path, file_size, ref_count)
+                    VALUES (:checksum, :file_path, :file_size, 1)
+                    ON CONFLICT (checksum) DO UPDATE SET ref_count = blobs.ref_count + 1"""),
+            {"checksum": checksum, "file_path": file_path, "file_size": file_size}
+        )
+
+    def _release_blob_references(self, document_id: str) -> List[str]:
+        """Drop a document's blob references and delete blobs nobody references any more.
+        
+        Returns the file paths of the deleted blobs. The rows stay locked until the caller
+        commits, so files should be unlinked before committing.
+        """
+        unreferenced = self.db.execute(
+            text("""
+                WITH refs AS (
+                    SELECT checksum, COUNT(*) AS ref_count
+                    FROM document_versions
+                    WHERE document_id = :document_id AND checksum IS NOT NULL
+                    GROUP BY checksum
+                )
+                UPDATE blobs b
+                SET ref_count = b.ref_count - refs.ref_count
+                FROM refs
+                WHERE b.checksum = refs.checksum
+                RETURNING b.checksum, b.ref_count
+            """),
+            {"document_id": document_id}
+        ).fetchall()
+        
+        released = [result[0] for result in unreferenced if result[1] <= 0]
+        if not released:
+            return []
+        
+        results = self.db.execute(
+            text("DELETE FROM blobs WHERE checksum = ANY(:checksums) RETURNING file_path"),
+            {"checksums": released}
+        ).fetchall()
+        return [result[0] for result in results]
 
-    def delete_document(self, document_id: str) -> bool:
-        """Delete document and all its versions"""
+    def delete_document(self, document_id: str,
+                        release_blob: Optional[Callable[[str], None]] = None) -> bool:
+        """Delete document and all its versions.
+        
+        ``release_blob`` is called with the path of every blob whose last reference
+        went away, before the transaction commits.
+        """
         try:
-            # Delete document audit entries first
-            self.db.execute(
-                text("DELETE FROM document_audit WHERE document_id = :document_id"),
-                {"document_id": document_id}
-            )
+            released_blobs = self._release_blob_references(document_id)
             
+            # Audit entries are kept: the trail must outlive the document
             # Delete document permissions
             self.db.execute(
                 text("DELETE FROM document_permissions WHERE document_id = :document_id"),
@@ -341,41 +627,44 @@ class DocumentRepository:
                 {"document_id": document_id}
             )
             
+            if release_blob:
+                for file_path in released_blobs:
+                    release_blob(file_path)
+            
             self.db.commit()
             return result.rowcount > 0
-        except Exception as e:
+        except Exception:
             self.db.rollback()
-            print(f"Error deleting document: {e}")  # Add logging for debugging
-            return False
+            raise
 
     def add_document_tags(self, document_id: str, tag_ids: List[str], added_by: str) -> None:
-        """Add tags to a document"""
-        for tag_id in tag_ids:
-            self.db.execute(
-                text("""INSERT INTO document_tags (document_id, tag_id, added_by) 
-                        VALUES (:document_id, :tag_id, :added_by) 
-                        ON CONFLICT DO NOTHING"""),
-                {
-                    "document_id": document_id, 
-                    "tag_id": tag_id,
-                    "added_by": added_by
-                }
-            )
+        """Add tags to a document with a single multi-row insert"""
+        if not tag_ids:
+            return
+        self.db.execute(
+            text("""INSERT INTO document_tags (document_id, tag_id, added_by)
+                    SELECT CAST(:document_id AS uuid), tag_id, CAST(:added_by AS uuid)
+                    FROM unnest(CAST(:tag_ids AS uuid[])) AS tag_id
+                    ON CONFLICT DO NOTHING"""),
+            {"document_id": document_id, "tag_ids": [str(tag_id) for tag_id in tag_ids], "added_by": added_by}
+        )
         self.db.commit()
 
     def get_document_tags(self, document_id: str) -> List[str]:
         """Get tags for a document"""
-        query = text("""
-            SELECT t.name
-            FROM tags t
-            JOIN document_tags dt ON t.tag_id = dt.tag_id
-            WHERE dt.document_id = :document_id
-            ORDER BY t.name
-        """)
-        
-        results = self.db.execute(query, {"document_id": document_id}).fetchall()
+        results = self.db.execute(document_queries.DOCUMENT_TAGS_QUERY, {"document_id": document_id}).fetchall()
         return [result[0] for result in results]
 
+    def get_tags_for_documents(self, document_ids: List[str]) -> Dict[str, List[str]]:
+        """Get tags for many documents in a single query, keyed by document ID"""
+        if not document_ids:
+            return {}
+        
+        results = self.db.execute(
+            document_queries.TAGS_FOR_DOCUMENTS_QUERY, {"document_ids": list(document_ids)}
+        ).fetchall()
+        return document_queries.group_tags(document_ids, results)
+
     def remove_all_document_tags(self, document_id: str) -> bool:
         """Remove all tags from a document"""
         try:
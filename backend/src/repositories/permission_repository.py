@@ -0,0 +1,156 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from typing import List, Optional, Dict, Any, Sequence
+
+PRINCIPAL_QUERY = text("""
+    SELECT u.role_id, u.department_id, r.name as role_name
+    FROM users u
+    JOIN roles r ON u.role_id = r.role_id
+    WHERE u.user_id = CAST(:user_id AS uuid)
+""")
+
+# Documents granted to a user directly, through their role or through their department
+GRANTED_DOCUMENTS_QUERY = text("""
+    SELECT document_id FROM document_permissions
+    WHERE is_active
+      AND (user_id = CAST(:user_id AS uuid)
+           OR role_id = CAST(:role_id AS uuid)
+           OR department_id = CAST(:department_id AS uuid))
+    UNION
+    SELECT document_id FROM user_document_permissions
+    WHERE user_id = CAST(:user_id AS uuid)
+    LIMIT :limit
+""")
+
+
+def grant_context(user_id: str, principal: Optional[Sequence[Any]],
+                  granted: Optional[Sequence[Sequence[Any]]], max_inline: int) -> Dict[str, Any]:
+    """Build a principal's grant context from PRINCIPAL_QUERY and GRANTED_DOCUMENTS_QUERY rows.
+
+    ``document_ids`` lists the granted documents when there are at most ``max_inline`` of
+    them, and is None when queries have to check grants with semi-joins instead.
+    """
+    context = {
+        "user_id": user_id,
+        "role_id": str(principal[0]) if principal else None,
+        "department_id": str(principal[1]) if principal else None,
+        "role_name": principal[2] if principal else None,
+        "document_ids": []
+    }
+    if granted is not None:
+        context["document_ids"] = None if len(granted) > max_inline else [str(row[0]) for row in granted]
+    return context
+
+
+def permission_row_to_dict(result: Sequence[Any]) -> Dict[str, Any]:
+    return {
+        "permission_id": str(result[0]),  # Convert UUID to string
+        "document_id": str(result[1]),
+        "user_id": str(result[2]) if result[2] else None,
+        "role_id": str(result[3]) if result[3] else None,
+        "department_id": str(result[4]) if result[4] else None,
+        "principal_name": result[5],
+        "permission_type": result[6],
+        "granted_by": str(result[7]),
+        "granted_at": result[8]
+    }
+
+
+PERMISSION_COLUMNS = """
+    p.permission_id, p.document_id, p.user_id, p.role_id, p.department_id,
+    COALESCE(NULLIF(CONCAT(u.first_name, ' ', u.last_name), ' '), r.name, dept.name) as principal_name,
+    p.permission_type, p.granted_by, p.granted_at
+"""
+
+PERMISSION_JOINS = """
+    LEFT JOIN users u ON u.user_id = p.user_id
+    LEFT JOIN roles r ON r.role_id = p.role_id
+    LEFT JOIN departments dept ON dept.department_id = p.department_id
+"""
+
+
+class PermissionRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_grant_context(self, user_id: str, max_inline: int) -> Dict[str, Any]:
+        """Get a user's role, department and granted documents, see grant_context"""
+        principal = self.db.execute(PRINCIPAL_QUERY, {"user_id": user_id}).fetchone()
+        granted = None
+        if principal:
+            granted = self.db.execute(GRANTED_DOCUMENTS_QUERY, {
+                "user_id": user_id, "role_id": principal[0], "department_id": principal[1],
+                "limit": max_inline + 1
+            }).fetchall()
+        return grant_context(user_id, principal, granted, max_inline)
+
+    def get_document_permissions(self, document_id: str) -> List[Dict[str, Any]]:
+        """Get a document's active grants, with the name of each grantee"""
+        results = self.db.execute(
+            text(f"""
+                SELECT {PERMISSION_COLUMNS}
+                FROM document_permissions p
+                {PERMISSION_JOINS}
+                WHERE p.document_id = :document_id AND p.is_active
+                ORDER BY p.granted_at
+            """),
+            {"document_id": document_id}
+        ).fetchall()
+        return [permission_row_to_dict(result) for result in results]
+
+    def create_permission(self, document_id: str, permission_type: str, granted_by: str,
+                          user_id: Optional[str] = None, role_id: Optional[str] = None,
+                          department_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Grant a user, role or department access to a document.
+
+        Returns None if the same active grant already exists.
+        """
+        try:
+            result = self.db.execute(
+                text(f"""
+                    WITH created AS (
+                        INSERT INTO document_permissions
+                            (document_id, user_id, role_id, department_id, permission_type, granted_by)
+                        SELECT CAST(:document_id AS uuid), CAST(:user_id AS uuid), CAST(:role_id AS uuid),
+                               CAST(:department_id AS uuid), :permission_type, CAST(:granted_by AS uuid)
+                        WHERE NOT EXISTS (
+                            SELECT 1 FROM document_permissions
+                            WHERE document_id = CAST(:document_id AS uuid) AND is_active
+                              AND permission_type = :permission_type
+                              AND user_id IS NOT DISTINCT FROM CAST(:user_id AS uuid)
+                              AND role_id IS NOT DISTINCT FROM CAST(:role_id AS uuid)
+                              AND department_id IS NOT DISTINCT FROM CAST(:department_id AS uuid)
+                        )
+                        RETURNING *
+                    )
+                    SELECT {PERMISSION_COLUMNS}
+                    FROM created p
+                    {PERMISSION_JOINS}
+                """),
+                {
+                    "document_id": document_id, "user_id": user_id, "role_id": role_id,
+                    "department_id": department_id, "permission_type": permission_type,
+                    "granted_by": granted_by
+                }
+            ).fetchone()
+            self.db.commit()
+            return permission_row_to_dict(result) if result else None
+        except Exception:
+            self.db.rollback()
+            raise
+
+    def revoke_permission(self, document_id: str, permission_id: str) -> bool:
+        """Deactivate a grant; the row is kept as a record of past access"""
+        try:
+            result = self.db.execute(
+                text("""
+                    UPDATE document_permissions SET is_active = false
+                    WHERE permission_id = :permission_id AND document_id = :document_id AND is_active
+                """),
+                {"permission_id": permission_id, "document_id": document_id}
+            )
+            self.db.commit()
+            return result.rowcount > 0
+        except Exception:
+            self.db.rollback()
+            raise
@@ -3,6 +3,15 @@ from sqlalchemy import text
 from typing import List
 from ..models.role import Role
 
+ALL_ROLES_QUERY = text("SELECT role_id, name, description FROM roles ORDER BY name")
+
+
+def role_row_to_dict(result) -> dict:
+    return {
+        "role_id": str(result[0]),  # Convert UUID to string
+        "name": result[1],
+        "description": result[2]
+    }
 
 class RoleRepository:
     def __init__(self, db: Session):
@@ -10,16 +19,8 @@ class RoleRepository:
 
     def get_all_roles(self) -> List[dict]:
         """Get all roles"""
-        query = text("SELECT role_id, name, description FROM roles ORDER BY name")
-        results = self.db.execute(query).fetchall()
-        return [
-            {
-                "role_id": str(result[0]), 
-                "name": result[1],
-                "description": result[2]
-            } 
-            for result in results
-        ]  # Convert UUID to string
+        results = self.db.execute(ALL_ROLES_QUERY).fetchall()
+        return [role_row_to_dict(result) for result in results]
 
     def get_role_by_id(self, role_id: str) -> Role:
         """Get role by ID"""
@@ -1,9 +1,18 @@
 from sqlalchemy.orm import Session
 from sqlalchemy import text
-from typing import List, Optional
+from typing import List, Optional, Dict
 from ..models.tag import Tag
+from ..core.config import settings
+from ..core.cache import TTLCache
 import uuid
 
+ALL_TAGS_QUERY = text("SELECT tag_id, name FROM tags ORDER BY name")
+
+# Tag name -> tag_id. The app never renames tags, but the database supports it (the
+# document_summary_tags_rename trigger); after a rename or delete in SQL every worker keeps
+# the old name for up to TAG_CACHE_TTL_SECONDS, so the TTL is kept short.
+tag_id_cache: TTLCache[str] = TTLCache(maxsize=settings.TAG_CACHE_SIZE, ttl=settings.TAG_CACHE_TTL_SECONDS)
+
 
 class TagRepository:
     def __init__(self, db: Session):
@@ -11,8 +20,7 @@ class TagRepository:
 
     def get_all_tags(self) -> List[dict]:
         """Get all tags"""
-        query = text("SELECT tag_id, name FROM tags ORDER BY name")
-        results = self.db.execute(query).fetchall()
+        results = self.db.execute(ALL_TAGS_QUERY).fetchall()
         return [{"tag_id": str(result[0]), "name": result[1]} for result in results]  # Convert UUID to string
 
     def get_tag_by_name(self, name: str) -> Optional[Tag]:
@@ -25,19 +33,43 @@ class TagRepository:
         self.db.add(tag)
         self.db.commit()
         self.db.refresh(tag)
+        tag_id_cache.set(name, str(tag.tag_id))
         return tag
 
-    def get_or_create_tag(self, name: str) -> Tag:
-        """Get existing tag or create new one"""
-        tag = self.get_tag_by_name(name)
-        if not tag:
-            tag = self.create_tag(name)
-        return tag
-
-    def get_tags_by_names(self, tag_names: List[str]) -> List[Tag]:
-        """Get tags by list of names, create missing ones"""
-        tags = []
-        for name in tag_names:
-            tag = self.get_or_create_tag(name)
-            tags.append(tag)
-        return tags
+    def get_or_create_tag_ids(self, tag_names: List[str]) -> Dict[str, str]:
+        """Map tag names to IDs, creating all missing tags in one statement.
+        
+        Cached names cost nothing; the rest take one upsert, plus one lookup for names that
+        already existed. New tags are only flushed: they commit or roll back with the
+        caller's transaction, so they are cached on a later lookup, not here.
+        """
+        names = sorted(set(tag_names))
+        tag_ids = {}
+        for name in names:
+            tag_id = tag_id_cache.get(name)
+            if tag_id:
+                tag_ids[name] = tag_id
+        missing = [name for name in names if name not in tag_ids]
+        if not missing:
+            return tag_ids
+        
+        created = self.db.execute(
+            text("""INSERT INTO tags (tag_id, name)
+                    SELECT uuid_generate_v4(), name FROM unnest(CAST(:names AS text[])) AS name
+                    ON CONFLICT (name) DO NOTHING
+                    RETURNING name, tag_id"""),
+            {"names": missing}
+        ).fetchall()
+        tag_ids.update({result[0]: str(result[1]) for result in created})  # Convert UUID to string
+        self.db.flush()
+        
+        existing = [name for name in missing if name not in tag_ids]
+        if existing:
+            results = self.db.execute(
+                text("SELECT name, tag_id FROM tags WHERE name = ANY(CAST(:names AS text[]))"),
+                {"names": existing}
+            ).fetchall()
+            for result in results:
+                tag_ids[result[0]] = str(result[1])
+                tag_id_cache.set(result[0], str(result[1]))
+        return tag_ids
@@ -0,0 +1,85 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import text
+from typing import List, Optional, Dict, Any
+
+
+class UploadSessionRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create_session(self, session_data: dict) -> Dict[str, Any]:
+        """Create a new resumable upload session that expires after ``ttl_hours``"""
+        self.db.execute(
+            text("""
+                INSERT INTO upload_sessions (
+                    session_id, user_id, document_id, title, description, tags,
+                    file_name, file_type, total_size, chunk_size, received_bytes, expires_at
+                ) VALUES (
+                    :session_id, :user_id, :document_id, :title, :description, :tags,
+                    :file_name, :file_type, :total_size, :chunk_size, 0,
+                    NOW() + make_interval(hours => :ttl_hours)
+                )
+            """),
+            session_data
+        )
+        self.db.commit()
+        return self.get_session(session_data["session_id"], session_data["user_id"])
+
+    def get_session(self, session_id: str, user_id: str,
+                    for_update: bool = False) -> Optional[Dict[str, Any]]:
+        """Get an unexpired session owned by the user, optionally locking it"""
+        query = """
+            SELECT session_id, user_id, document_id, title, description, tags,
+                   file_name, file_type, total_size, chunk_size, received_bytes,
+                   created_at, expires_at
+            FROM upload_sessions
+            WHERE session_id = :session_id AND user_id = :user_id AND expires_at > NOW()
+        """
+        if for_update:
+            query += " FOR UPDATE"
+        result = self.db.execute(
+            text(query), {"session_id": session_id, "user_id": user_id}
+        ).fetchone()
+        if not result:
+            return None
+        
+        return {
+            "session_id": str(result[0]),  # Convert UUID to string
+            "user_id": str(result[1]),
+            "document_id": str(result[2]) if result[2] else None,
+            "title": result[3],
+            "description": result[4],
+            "tags": [tag for tag in (result[5] or "").split(",") if tag],
+            "file_name": result[6],
+            "file_type": result[7],
+            "total_size": result[8],
+            "chunk_size": result[9],
+            "received_bytes": result[10],
+            "created_at": result[11],
+            "expires_at": result[12]
+        }
+
+    def set_received_bytes(self, session_id: str, received_bytes: int) -> None:
+        """Record how many contiguous bytes have been written"""
+        self.db.execute(
+            text("UPDATE upload_sessions SET received_bytes = :received_bytes WHERE session_id = :session_id"),
+            {"session_id": session_id, "received_bytes": received_bytes}
+        )
+        self.db.commit()
+
+    def delete_session(self, session_id: str) -> bool:
+        """Delete an upload session"""
+        result = self.db.execute(
+            text("DELETE FROM upload_sessions WHERE session_id = :session_id"),
+            {"session_id": session_id}
+        )
+        self.db.commit()
+        return result.rowcount > 0
+
+    def delete_expired_sessions(self) -> List[str]:
+        """Delete expired sessions and return their IDs"""
+        results = self.db.execute(
+            text("DELETE FROM upload_sessions WHERE expires_at <= NOW() RETURNING session_id")
+        ).fetchall()
+        self.db.commit()
+        return [str(result[0]) for result in results]
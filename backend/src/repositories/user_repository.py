@@ -6,6 +6,32 @@ from ..models.department import Department
 from ..models.role import Role
 
 
+def user_details_query(condition: str):
+    """User with department and role names, shared with AsyncUserRepository"""
+    return text(f"""
+        SELECT 
+            u.user_id, u.email, u.first_name, u.last_name, u.is_active, u.created_at,
+            d.name as department_name, r.name as role_name
+        FROM users u
+        JOIN departments d ON u.department_id = d.department_id
+        JOIN roles r ON u.role_id = r.role_id
+        WHERE {condition}
+    """)
+
+
+def user_details_row_to_dict(result) -> dict:
+    return {
+        "user_id": str(result[0]),  # Convert UUID to string
+        "email": result[1],
+        "first_name": result[2],
+        "last_name": result[3],
+        "is_active": result[4],
+        "created_at": result[5],
+        "department_name": result[6],
+        "role_name": result[7]
+    }
+
+
 class UserRepository:
     def __init__(self, db: Session):
         self.db = db
@@ -28,10 +54,24 @@ class UserRepository:
 
     def get_user_with_details(self, email: str) -> Optional[dict]:
         """Get user with department and role details"""
+        return self._get_user_with_details("u.email = :email", {"email": email})
+
+    def get_user_with_details_by_id(self, user_id: str) -> Optional[dict]:
+        """Get user with department and role details by ID"""
+        return self._get_user_with_details("u.user_id = :user_id", {"user_id": user_id})
+
+    def _get_user_with_details(self, condition: str, params: dict) -> Optional[dict]:
+        result = self.db.execute(user_details_query(condition), params).fetchone()
+        if result:
+            return user_details_row_to_dict(result)
+        return None
+
+    def get_user_for_login(self, email: str) -> Optional[dict]:
+        """Get user details and password hash in a single query"""
         query = text("""
             SELECT 
                 u.user_id, u.email, u.first_name, u.last_name, u.is_active, u.created_at,
-                d.name as department_name, r.name as role_name
+                d.name as department_name, r.name as role_name, u.password_hash
             FROM users u
             JOIN departments d ON u.department_id = d.department_id
             JOIN roles r ON u.role_id = r.role_id
@@ -47,10 +87,30 @@ class UserRepository:
                 "is_active": result[4],
                 "created_at": result[5],
                 "department_name": result[6],
-                "role_name": result[7]
+                "role_name": result[7],
+                "password_hash": result[8]
             }
         return None
 
+    def update_user_status(self, email: str, is_active: bool) -> bool:
+        """Activate or deactivate a user"""
+        result = self.db.execute(
+            text("UPDATE users SET is_active = :is_active, updated_at = NOW() WHERE email = :email"),
+            {"email": email, "is_active": is_active}
+        )
+        self.db.commit()
+        return result.rowcount > 0
+
+    def update_user_assignment(self, email: str, department_id: str, role_id: str) -> bool:
+        """Change a user's department and role"""
+        result = self.db.execute(
+            text("""UPDATE users SET department_id = :department_id, role_id = :role_id, updated_at = NOW()
+                    WHERE email = :email"""),
+            {"email": email, "department_id": department_id, "role_id": role_id}
+        )
+        self.db.commit()
+        return result.rowcount > 0
+
     def authenticate_user(self, email: str, password: str) -> Optional[User]:
         """Authenticate user by email and password"""
         user = self.get_user_by_email(email)
@@ -29,6 +29,13 @@ class UserResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class UserStatusUpdate(BaseModel):
+    is_active: bool
+
+class UserAssignmentUpdate(BaseModel):
+    department_id: str
+    role_id: str
+
 # Document schemas
 class DocumentCreate(BaseModel):
     title: str
@@ -49,6 +56,45 @@ class DocumentResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class UploadSessionCreate(BaseModel):
+    file_name: str
+    file_type: Optional[str] = None
+    total_size: int
+    chunk_size: Optional[int] = None
+    title: Optional[str] = None
+    description: Optional[str] = None
+    tags: List[str] = []
+    document_id: Optional[str] = None  # Set to upload a new version of an existing document
+
+class UploadSessionResponse(BaseModel):
+    session_id: str
+    document_id: Optional[str]
+    file_name: str
+    total_size: int
+    chunk_size: int
+    received_bytes: int
+    next_chunk: int
+    expires_at: datetime
+
+class BulkIngestItem(BaseModel):
+    index: int
+    file_name: str
+    status: str  # "created" or "failed"
+    document_id: Optional[str] = None
+    error: Optional[str] = None
+
+class BulkIngestResponse(BaseModel):
+    total: int
+    created: int
+    failed: int
+    items: List[BulkIngestItem]
+
+class ExportRequest(BaseModel):
+    search: Optional[str] = None
+    tags: Optional[str] = None  # Comma-separated, same as the listing's filter
+    document_ids: List[str] = []  # Current version of each
+    version_ids: List[str] = []
+
 class DocumentSearch(BaseModel):
     query: Optional[str] = None
     tags: Optional[List[str]] = []
@@ -69,12 +115,48 @@ class DocumentVersionResponse(BaseModel):
     class Config:
         from_attributes = True
 
+# Audit schemas
+class AuditEventResponse(BaseModel):
+    audit_id: str
+    document_id: str
+    user_id: str
+    user_name: str
+    action: str
+    old_values: Optional[dict] = None
+    new_values: Optional[dict] = None
+    timestamp: datetime
+    ip_address: Optional[str] = None
+    user_agent: Optional[str] = None
+
+# Permission schemas
+class PermissionGrantRequest(BaseModel):
+    # Exactly one grantee
+    user_id: Optional[str] = None
+    role_id: Optional[str] = None
+    department_id: Optional[str] = None
+    permission_type: str = "read"  # "read", "write" or "admin"
+
+class PermissionResponse(BaseModel):
+    permission_id: str
+    document_id: str
+    user_id: Optional[str] = None
+    role_id: Optional[str] = None
+    department_id: Optional[str] = None
+    principal_name: Optional[str] = None
+    permission_type: str
+    granted_by: str
+    granted_at: datetime
+
 # Auth schemas
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
     user: UserResponse
 
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
 class TokenData(BaseModel):
     email: Optional[str] = None
 
@@ -1,13 +1,32 @@
-from .user_service import UserService
-from .document_service import DocumentService
-from .tag_service import TagService
-from .department_service import DepartmentService
-from .role_service import RoleService
+from .user_service import UserService, AsyncUserService
+from .document_service import DocumentService, AsyncDocumentService
+from .tag_service import TagService, AsyncTagService
+from .department_service import DepartmentService, AsyncDepartmentService
+from .role_service import RoleService, AsyncRoleService
+from .content_extraction_service import ContentExtractionService
+from .upload_service import UploadService
+from .bulk_ingest_service import BulkIngestService
+from .export_service import ExportService
+from .audit_service import AuditLogger, AsyncAuditService, record_audit_event
+from .permission_service import PermissionService
 
 __all__ = [
     "UserService",
     "DocumentService",
     "TagService", 
     "DepartmentService",
-    "RoleService"
+    "RoleService",
+    "ContentExtractionService",
+    "UploadService",
+    "BulkIngestService",
+    "ExportService",
+    "AuditLogger",
+    "AsyncAuditService",
+    "record_audit_event",
+    "PermissionService",
+    "AsyncUserService",
+    "AsyncDocumentService",
+    "AsyncTagService",
+    "AsyncDepartmentService",
+    "AsyncRoleService"
 ]
@@ -0,0 +1,305 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..repositories.audit_repository import AuditRepository
+from ..repositories.async_audit_repository import AsyncAuditRepository
+from ..core.config import settings
+from fastapi.concurrency import run_in_threadpool
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, Any, List, Tuple
+import asyncio
+import base64
+import ipaddress
+import json
+import queue
+import threading
+import time
+import uuid
+
+# Page size bounds for audit trail queries
+MAX_AUDIT_PAGE_SIZE = 1000
+DEFAULT_AUDIT_WINDOW_DAYS = 30
+
+# Wakes the flusher so shutdown does not wait out the flush interval
+_WAKE = object()
+
+
+class AuditLogger:
+    """Buffers audit events in memory and writes them in batches from one background thread.
+
+    ``record`` never blocks: when the queue is full the event is dropped and counted, so
+    request latency does not depend on the database. Each worker process has its own
+    logger; the thread is started on first use, which is after gunicorn forks.
+    """
+
+    def __init__(self, queue_size: int, batch_size: int, flush_interval: float):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._reported_drops = 0
+        self.recorded = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def start(self) -> None:
+        """Start the flusher thread if it is not running in this process"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="audit-flusher", daemon=True)
+            self._thread.start()
+
+    def record(self, event: Dict[str, Any]) -> bool:
+        """Queue an event for writing; returns False if it was dropped"""
+        if self._thread is None or not self._thread.is_alive():
+            if self._stopping.is_set():
+                return self._count_drop()
+            self.start()
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            return self._count_drop()
+        with self._lock:
+            self.recorded += 1
+        return True
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Write everything still queued, then stop the flusher"""
+        self._stopping.set()
+        try:
+            self._queue.put_nowait(_WAKE)
+        except queue.Full:
+            pass  # The flusher is busy and will see the stop flag after this batch
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+            if thread.is_alive():
+                print(f"⚠️ Audit flusher did not finish within {timeout}s; "
+                      f"{self._queue.qsize()} event(s) lost")
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": settings.AUDIT_ENABLED,
+                "queued": self._queue.qsize(),
+                "recorded": self.recorded,
+                "written": self.written,
+                "dropped": self.dropped,
+                "failed": self.failed
+            }
+
+    def _count_drop(self) -> bool:
+        with self._lock:
+            self.dropped += 1
+        return False
+
+    def _next_batch(self) -> List[Dict[str, Any]]:
+        # Wait for a first event, then collect until the batch is full or the interval ends
+        batch = []
+        deadline = None
+        while len(batch) < self.batch_size:
+            if self._stopping.is_set():
+                timeout = 0
+            elif deadline is None:
+                timeout = self.flush_interval
+            else:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+            try:
+                event = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if event is _WAKE:
+                continue
+            batch.append(event)
+            if deadline is None:
+                deadline = time.monotonic() + self.flush_interval
+        return batch
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        from ..core.database import SessionLocal
+
+        # One retry covers a connection dropped by the pool; the INSERT is all-or-nothing
+        for attempt in range(2):
+            db = SessionLocal()
+            try:
+                AuditRepository(db).insert_events(batch)
+                with self._lock:
+                    self.written += len(batch)
+                return
+            except Exception as e:
+                if attempt:
+                    print(f"⚠️ Failed to write {len(batch)} audit event(s): {e}")
+                    with self._lock:
+                        self.failed += len(batch)
+            finally:
+                db.close()
+
+    def _report_drops(self) -> None:
+        with self._lock:
+            dropped = self.dropped - self._reported_drops
+            self._reported_drops = self.dropped
+        if dropped:
+            print(f"⚠️ Audit queue full: dropped {dropped} event(s)")
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if batch:
+                self._write(batch)
+            self._report_drops()
+            if self._stopping.is_set() and self._queue.empty():
+                return
+
+
+audit_logger = AuditLogger(
+    queue_size=settings.AUDIT_QUEUE_SIZE,
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_INTERVAL_SECONDS
+)
+
+
+def _client_address(request) -> Optional[str]:
+    # Only real IP addresses fit the inet column (test clients report a hostname)
+    if request is None or not request.client:
+        return None
+    try:
+        return str(ipaddress.ip_address(request.client.host))
+    except ValueError:
+        return None
+
+
+def record_audit_event(action: str, document_id: str, user_id: str, request=None,
+                       old_values: Optional[Dict[str, Any]] = None,
+                       new_values: Optional[Dict[str, Any]] = None) -> bool:
+    """Queue an audit event ('view', 'download', 'create', 'update', 'delete') without blocking.
+
+    ``request`` supplies the client address and user agent. Returns False when auditing
+    is disabled or the event was dropped because the queue is full.
+    """
+    if not settings.AUDIT_ENABLED:
+        return False
+    return audit_logger.record({
+        "document_id": str(document_id),
+        "user_id": str(user_id),
+        "action": action,
+        "old_values": old_values,
+        "new_values": new_values,
+        "timestamp": datetime.utcnow(),
+        "ip_address": _client_address(request),
+        "user_agent": request.headers.get("user-agent") if request is not None else None
+    })
+
+
+def start_audit_logger() -> None:
+    """Start this process's audit flusher"""
+    if settings.AUDIT_ENABLED:
+        audit_logger.start()
+
+
+def shutdown_audit_logger(timeout: float = 10.0) -> None:
+    """Flush queued audit events and stop the flusher"""
+    audit_logger.stop(timeout)
+
+
+async def run_partition_maintenance() -> None:
+    """Create upcoming audit partitions and drop expired ones, now and then periodically.
+
+    Every worker runs this; the partition lock lets one of them do the work per round.
+    """
+    from ..core.database import SessionLocal
+
+    def maintain() -> Optional[Dict[str, Any]]:
+        db = SessionLocal()
+        try:
+            return AuditRepository(db).maintain_partitions(
+                settings.AUDIT_PARTITION_MONTHS_AHEAD, settings.AUDIT_RETENTION_MONTHS
+            )
+        finally:
+            db.close()
+
+    while True:
+        try:
+            changes = await run_in_threadpool(maintain)
+            if changes and changes["created"]:
+                print(f"🗂️ Created audit partition(s): {', '.join(changes['created'])}")
+            if changes and changes["moved"]:
+                print(f"🗂️ Moved {changes['moved']} audit event(s) out of the default partition")
+            if changes and changes["dropped"]:
+                print(f"🧹 Dropped expired audit partition(s): {', '.join(changes['dropped'])}")
+            if changes and changes["trimmed"]:
+                print(f"🧹 Deleted {changes['trimmed']} expired audit event(s) from the default partition")
+            for failure in (changes or {}).get("failed", []):
+                print(f"⚠️ Could not create audit partition {failure}")
+        except Exception as e:
+            print(f"⚠️ Audit partition maintenance failed: {e}")
+        await asyncio.sleep(settings.AUDIT_PARTITION_CHECK_SECONDS)
+
+
+def encode_audit_cursor(event: Dict[str, Any]) -> str:
+    """Encode the keyset position of an audit event as an opaque cursor"""
+    payload = json.dumps([event["timestamp"].isoformat(), event["audit_id"]])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_audit_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Decode a cursor produced by encode_audit_cursor, raising ValueError if malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        timestamp, audit_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(timestamp), str(uuid.UUID(audit_id))
+    except (TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    # Audit timestamps are stored as naive UTC
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+class AsyncAuditService:
+    """Audit trail reads for async route handlers"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.audit_repo = AsyncAuditRepository(db)
+
+    async def get_audit_trail(self, document_id: Optional[str] = None, user_id: Optional[str] = None,
+                              since: Optional[datetime] = None, until: Optional[datetime] = None,
+                              limit: int = 100, cursor: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get a document's or user's audit events in ``[since, until)``, newest first.
+
+        The window defaults to the last 30 days and may span at most AUDIT_QUERY_MAX_DAYS,
+        which bounds how many monthly partitions a query touches.
+        """
+        if not document_id and not user_id:
+            raise ValueError("Specify a document_id or user_id")
+        for value in (document_id, user_id):
+            if value:
+                uuid.UUID(value)  # Raises ValueError for malformed IDs
+        if not 1 <= limit <= MAX_AUDIT_PAGE_SIZE:
+            raise ValueError(f"limit must be between 1 and {MAX_AUDIT_PAGE_SIZE}")
+
+        until = _as_utc(until) or datetime.utcnow()
+        since = _as_utc(since) or until - timedelta(days=DEFAULT_AUDIT_WINDOW_DAYS)
+        if since >= until:
+            raise ValueError("since must be before until")
+        if until - since > timedelta(days=settings.AUDIT_QUERY_MAX_DAYS):
+            raise ValueError(f"The time window may span at most {settings.AUDIT_QUERY_MAX_DAYS} days")
+
+        return await self.audit_repo.get_audit_trail(
+            since, until, document_id=document_id, user_id=user_id, limit=limit,
+            cursor=decode_audit_cursor(cursor) if cursor else None
+        )
+
+    def get_next_cursor(self, events: List[Dict[str, Any]], limit: int) -> Optional[str]:
+        """Build the cursor for the page after ``events``, or None on the last page"""
+        if not events or len(events) < limit:
+            return None
+        return encode_audit_cursor(events[-1])
@@ -0,0 +1,192 @@
+from sqlalchemy.orm import Session
+from ..repositories.document_repository import DocumentRepository
+from ..repositories.tag_repository import TagRepository
+from .content_extraction_service import schedule_extraction
+from ..core.config import settings
+from ..core.storage import BlobStore, StoredFile
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path, PurePosixPath
+from typing import BinaryIO, Callable, List, Optional, Dict, Any, NamedTuple, Union
+import json
+import mimetypes
+import uuid
+import zipfile
+
+MANIFEST_NAME = "manifest.json"
+
+
+class BulkItem(NamedTuple):
+    file_name: str
+    file_type: Optional[str]
+    title: str
+    description: Optional[str]
+    tags: List[str]
+    open: Callable[[], BinaryIO]
+
+
+def _parse_tags(value: Union[str, List[str], None]) -> List[str]:
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(",")
+    return [tag.strip() for tag in value if tag and tag.strip()]
+
+
+def parse_manifest(raw: Union[str, bytes, None]) -> Dict[str, Dict[str, Any]]:
+    """Parse a manifest, a JSON list of entries keyed by ``file_name``.
+
+    Each entry may set ``title``, ``description`` and ``tags`` (a list or a
+    comma-separated string). Raises ValueError if malformed.
+    """
+    if not raw:
+        return {}
+    try:
+        entries = json.loads(raw)
+    except ValueError as e:
+        raise ValueError(f"Invalid manifest: {e}") from e
+    if not isinstance(entries, list) or not all(
+        isinstance(entry, dict) and entry.get("file_name") for entry in entries
+    ):
+        raise ValueError("Invalid manifest: expected a list of objects with a file_name")
+    return {entry["file_name"]: entry for entry in entries}
+
+
+def _build_item(file_name: str, file_type: Optional[str], entry: Dict[str, Any],
+                common_tags: List[str], opener: Callable[[], BinaryIO]) -> BulkItem:
+    tags = list(dict.fromkeys(common_tags + _parse_tags(entry.get("tags"))))
+    return BulkItem(
+        file_name=PurePosixPath(file_name).name,
+        file_type=file_type or mimetypes.guess_type(file_name)[0],
+        title=entry.get("title") or PurePosixPath(file_name).stem,
+        description=entry.get("description"),
+        tags=tags,
+        open=opener
+    )
+
+
+class BulkIngestService:
+    """Ingests many files at once: parallel streaming into the blob store, batched inserts"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.document_repo = DocumentRepository(db)
+        self.tag_repo = TagRepository(db)
+        self.blob_store = BlobStore(Path(settings.UPLOAD_DIR))
+
+    def items_from_files(self, files: List[UploadFile], manifest: Dict[str, Dict[str, Any]],
+                         common_tags: List[str]) -> List[BulkItem]:
+        """Describe the files of a multi-file form"""
+        return [
+            _build_item(file.filename, file.content_type, manifest.get(file.filename, {}),
+                        common_tags, lambda file=file: file.file)
+            for file in files
+        ]
+
+    def items_from_archive(self, archive: zipfile.ZipFile, manifest: Dict[str, Dict[str, Any]],
+                           common_tags: List[str]) -> List[BulkItem]:
+        """Describe the entries of a ZIP archive; with a manifest only listed entries are ingested"""
+        if not manifest and MANIFEST_NAME in archive.namelist():
+            manifest = parse_manifest(archive.read(MANIFEST_NAME))
+
+        items = []
+        for info in archive.infolist():
+            if info.is_dir() or info.filename == MANIFEST_NAME:
+                continue
+            if manifest and info.filename not in manifest:
+                continue
+            items.append(_build_item(info.filename, None, manifest.get(info.filename, {}),
+                                     common_tags, lambda info=info: archive.open(info)))
+        return items
+
+    async def ingest(self, items: List[BulkItem], current_user_id: str) -> Dict[str, Any]:
+        """Create one document per item and report the outcome of each"""
+        if len(items) > settings.BULK_INGEST_MAX_FILES:
+            raise ValueError(f"At most {settings.BULK_INGEST_MAX_FILES} files can be ingested at once")
+
+        report: List[Dict[str, Any]] = [
+            {"index": index, "file_name": item.file_name, "status": "failed",
+             "document_id": None, "error": None}
+            for index, item in enumerate(items)
+        ]
+
+        # Stream every file to staging in parallel; per-file failures are reported, not raised
+        staged = await run_in_threadpool(self._stage_files, items)
+        for entry, result in zip(report, staged):
+            if isinstance(result, Exception):
+                entry["error"] = str(result)
+
+        ready = [index for index, result in enumerate(staged) if isinstance(result, StoredFile)]
+        tag_ids = self.tag_repo.get_or_create_tag_ids(
+            [tag for index in ready for tag in items[index].tags]
+        )
+        # Batches commit or roll back on their own, so the new tags must not depend on the first
+        self.db.commit()
+
+        batch_size = max(1, settings.BULK_INGEST_BATCH_SIZE)
+        for start in range(0, len(ready), batch_size):
+            batch = ready[start:start + batch_size]
+            await self._write_batch(batch, items, staged, tag_ids, report, current_user_id)
+
+        created = sum(1 for entry in report if entry["status"] == "created")
+        return {"total": len(items), "created": created, "failed": len(items) - created, "items": report}
+
+    def _stage_files(self, items: List[BulkItem]) -> List[Union[StoredFile, Exception]]:
+        def stage(item: BulkItem) -> Union[StoredFile, Exception]:
+            try:
+                source = item.open()
+                try:
+                    return self.blob_store.ingest(source, settings.MAX_FILE_SIZE)
+                finally:
+                    source.close()
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=max(1, settings.BULK_INGEST_WORKERS),
+                                thread_name_prefix="bulk-ingest") as executor:
+            return list(executor.map(stage, items))
+
+    async def _write_batch(self, batch: List[int], items: List[BulkItem],
+                           staged: List[Union[StoredFile, Exception]], tag_ids: Dict[str, str],
+                           report: List[Dict[str, Any]], current_user_id: str) -> None:
+        documents, versions, document_tags = [], [], []
+        for index in batch:
+            item, stored_file = items[index], staged[index]
+            document_id = str(uuid.uuid4())
+            documents.append({
+                "document_id": document_id,
+                "title": item.title,
+                "description": item.description,
+                "created_by": current_user_id
+            })
+            versions.append({
+                "version_id": str(uuid.uuid4()),
+                "document_id": document_id,
+                "file_name": item.file_name,
+                "file_path": str(self.blob_store.blob_path(stored_file.checksum)),
+                "file_type": item.file_type,
+                "file_size": stored_file.size,
+                "checksum": stored_file.checksum,
+                "uploaded_by": current_user_id
+            })
+            document_tags.extend((document_id, tag_ids[tag]) for tag in item.tags)
+            report[index]["document_id"] = document_id
+
+        try:
+            # The files are moved into the store before the batch commits
+            self.document_repo.bulk_create_documents(
+                documents, versions, document_tags, current_user_id,
+                store_blobs=lambda: [self.blob_store.commit(staged[index]) for index in batch]
+            )
+        except Exception as e:
+            for index in batch:
+                self.blob_store.discard(staged[index])
+                report[index].update(document_id=None, error=f"Failed to create document: {e}")
+            return
+
+        for index, version in zip(batch, versions):
+            report[index]["status"] = "created"
+            # Overflow beyond the extraction queue is left for `maintenance extract-content`
+            schedule_extraction(version["document_id"], version["checksum"],
+                                version["file_path"], version["file_type"])
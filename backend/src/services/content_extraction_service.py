@@ -0,0 +1,212 @@
+from sqlalchemy.orm import Session
+from ..repositories.content_repository import ContentRepository
+from ..core.config import settings
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional, Tuple
+from xml.etree import ElementTree
+import threading
+import zipfile
+
+# OOXML namespaces for the parts we read text from
+WORD_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+SHEET_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+
+DOCX_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+XLSX_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# Extraction runs on a small dedicated pool so it never competes with request handling
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_pending = threading.BoundedSemaphore(settings.EXTRACTION_QUEUE_SIZE)
+
+
+class _TextBuffer:
+    """Collects extracted text and stops once max_chars is reached"""
+
+    def __init__(self, max_chars: int):
+        self.max_chars = max_chars
+        self.parts = []
+        self.length = 0
+
+    @property
+    def full(self) -> bool:
+        return self.length >= self.max_chars
+
+    def add(self, value: Optional[str]) -> None:
+        if not value or self.full:
+            return
+        # Postgres text cannot hold NUL characters; binary-ish files and PDFs contain them
+        value = value.replace("\x00", "")[:self.max_chars - self.length]
+        self.parts.append(value)
+        self.length += len(value)
+
+    def result(self) -> Tuple[str, str]:
+        return "".join(self.parts), "truncated" if self.full else "extracted"
+
+
+def _extract_plain_text(file_path: Path, buffer: _TextBuffer) -> None:
+    # Never read more than the worst case of 4 bytes per character
+    with open(file_path, "rb") as f:
+        data = f.read(buffer.max_chars * 4)
+    buffer.add(data.decode("utf-8", errors="replace"))
+
+
+def _extract_ooxml(file_path: Path, part_name: str, text_tag: str, break_tag: str,
+                   buffer: _TextBuffer) -> None:
+    # Stream-parse the XML part so large documents are never loaded in full
+    with zipfile.ZipFile(file_path) as archive:
+        if part_name not in archive.namelist():
+            return
+        with archive.open(part_name) as part:
+            for _, element in ElementTree.iterparse(part, events=("end",)):
+                if element.tag == text_tag:
+                    buffer.add(element.text)
+                elif element.tag == break_tag:
+                    buffer.add("\n")
+                    element.clear()
+                if buffer.full:
+                    return
+
+
+def _extract_pdf(file_path: Path, buffer: _TextBuffer) -> bool:
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        return False  # Optional dependency; PDFs are left unindexed without it
+
+    reader = PdfReader(str(file_path))
+    for page in reader.pages[:settings.EXTRACTION_MAX_PAGES]:
+        buffer.add(page.extract_text())
+        buffer.add("\n")
+        if buffer.full:
+            break
+    return True
+
+
+def extract_text(file_path: Path, file_type: Optional[str],
+                 max_chars: Optional[int] = None) -> Tuple[Optional[str], str]:
+    """Extract plain text from a stored file.
+
+    Returns ``(text, status)`` where status is one of 'extracted', 'truncated',
+    'unsupported' or 'failed'. Output is capped at ``max_chars`` characters.
+    """
+    buffer = _TextBuffer(max_chars or settings.EXTRACTION_MAX_CHARS)
+    try:
+        if file_type == "text/plain":
+            _extract_plain_text(file_path, buffer)
+        elif file_type == DOCX_TYPE:
+            _extract_ooxml(file_path, "word/document.xml", f"{WORD_NS}t", f"{WORD_NS}p", buffer)
+        elif file_type == XLSX_TYPE:
+            _extract_ooxml(file_path, "xl/sharedStrings.xml", f"{SHEET_NS}t", f"{SHEET_NS}si", buffer)
+        elif file_type == "application/pdf":
+            if not _extract_pdf(file_path, buffer):
+                return None, "unsupported"
+        else:
+            return None, "unsupported"
+    except Exception as e:
+        print(f"⚠️ Text extraction failed for {file_path}: {e}")
+        return None, "failed"
+
+    return buffer.result()
+
+
+class ContentExtractionService:
+    def __init__(self, db: Session):
+        self.db = db
+        self.content_repo = ContentRepository(db)
+
+    def index_version(self, document_id: str, checksum: str,
+                      file_path: str, file_type: Optional[str]) -> None:
+        """Extract text for a version and feed it into the search index.
+        
+        Each checksum is extracted successfully at most once; a failed or unsupported
+        earlier attempt (a transient I/O error, a PDF seen without pypdf) is retried.
+        """
+        if self.content_repo.has_content(checksum):
+            self.content_repo.refresh_document_content_vector(document_id)
+            return
+        content, status = extract_text(Path(file_path), file_type)
+        self.content_repo.save_content(checksum, content, status)
+        # Other documents may be on the same file
+        self.content_repo.refresh_content_vectors_for_checksum(checksum)
+
+    def index_missing(self, batch_size: int = 100, retry_failed: bool = False) -> int:
+        """Extract text for every current version that has not been indexed yet.
+        
+        With ``retry_failed``, versions whose earlier extraction failed or was
+        unsupported are retried once each.
+        """
+        retry_before = self.content_repo.get_database_time() if retry_failed else None
+        indexed = 0
+        # Files whose failure could not even be recorded; they would come back every batch
+        unrecorded = set()
+        while True:
+            versions = [
+                version for version in self.content_repo.get_versions_missing_content(
+                    limit=batch_size, retry_before=retry_before
+                )
+                if version["checksum"] not in unrecorded
+            ]
+            if not versions:
+                return indexed
+            for version in versions:
+                try:
+                    self.index_version(**version)
+                    indexed += 1
+                except Exception as e:
+                    # One bad version must not stop the versions behind it from being indexed
+                    self.db.rollback()
+                    print(f"⚠️ Content indexing failed for document {version['document_id']}: {e}")
+                    try:
+                        self.content_repo.save_content(version["checksum"], None, "failed")
+                    except Exception:
+                        self.db.rollback()
+                        unrecorded.add(version["checksum"])
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.EXTRACTION_WORKERS,
+                thread_name_prefix="content-extraction"
+            )
+        return _executor
+
+
+def _run_extraction(document_id: str, checksum: str, file_path: str,
+                    file_type: Optional[str]) -> None:
+    from ..core.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        ContentExtractionService(db).index_version(document_id, checksum, file_path, file_type)
+    except Exception as e:
+        print(f"⚠️ Content indexing failed for document {document_id}: {e}")
+    finally:
+        db.close()
+        _pending.release()
+
+
+def schedule_extraction(document_id: str, checksum: Optional[str], file_path: str,
+                        file_type: Optional[str]) -> bool:
+    """Queue text extraction for a new version without blocking the caller.
+
+    Returns False when the queue is full; such versions are picked up later by
+    ``python -m src.maintenance extract-content``.
+    """
+    if not checksum or not _pending.acquire(blocking=False):
+        return False
+    _get_executor().submit(_run_extraction, document_id, checksum, file_path, file_type)
+    return True
+
+
+def shutdown_extraction_workers() -> None:
+    """Stop the extraction pool, dropping work that has not started yet"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
@@ -1,5 +1,7 @@
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..repositories.department_repository import DepartmentRepository
+from ..repositories.async_department_repository import AsyncDepartmentRepository
 from typing import List
 
 
@@ -11,3 +13,13 @@ class DepartmentService:
     def get_all_departments(self) -> List[dict]:
         """Get all departments"""
         return self.department_repo.get_all_departments()
+
+
+class AsyncDepartmentService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.department_repo = AsyncDepartmentRepository(db)
+
+    async def get_all_departments(self) -> List[dict]:
+        """Get all departments"""
+        return await self.department_repo.get_all_departments()
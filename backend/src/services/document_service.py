@@ -1,209 +1,288 @@
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from ..repositories.document_repository import DocumentRepository
+from ..repositories.async_document_repository import AsyncDocumentRepository
+from ..repositories.document_loader import DocumentLoader, AsyncDocumentLoader
 from ..repositories.tag_repository import TagRepository
+from ..repositories.content_repository import ContentRepository
+from .content_extraction_service import schedule_extraction
+from ..core.config import settings
+from ..core.storage import BlobStore, StoredFile, FileTooLargeError
 from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
+from datetime import datetime
 import uuid
-import shutil
 import os
-import hashlib
+import base64
+import json
+
+# Listing sort orders; "relevance" only applies when a search term is given
+SORT_OPTIONS = ("newest", "relevance")
+
+
+def encode_cursor(document: Dict[str, Any]) -> str:
+    """Encode the keyset position of a listing row as an opaque cursor"""
+    position = [document["created_at"].isoformat(), document["document_id"]]
+    if "search_rank" in document:
+        position.append(document["search_rank"])
+    payload = json.dumps(position)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str, Optional[float]]:
+    """Decode a cursor produced by encode_cursor, raising ValueError if malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, document_id, *rank = json.loads(base64.urlsafe_b64decode(padded))
+        return (
+            datetime.fromisoformat(created_at),
+            str(uuid.UUID(document_id)),
+            float(rank[0]) if rank else None
+        )
+    except (TypeError, ValueError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def next_cursor(documents: List[Dict[str, Any]], limit: int) -> Optional[str]:
+    """Build the cursor for the page after ``documents``, or None on the last page"""
+    if not documents or len(documents) < limit:
+        return None
+    return encode_cursor(documents[-1])
 
 
 class DocumentService:
     def __init__(self, db: Session):
         self.db = db
         self.document_repo = DocumentRepository(db)
+        # One service per request, so lookups are shared by the whole request
+        self.loader = DocumentLoader(self.document_repo)
         self.tag_repo = TagRepository(db)
-        self.upload_dir = Path("uploads")
-        self.upload_dir.mkdir(exist_ok=True)
-        
-        # Clean up any duplicate current versions on initialization
-        self.document_repo.cleanup_current_versions()
+        self.content_repo = ContentRepository(db)
+        self.blob_store = BlobStore(Path(settings.UPLOAD_DIR))
 
-    def create_document(self, title: str, description: Optional[str], 
+    async def create_document(self, title: str, description: Optional[str], 
                        tags: List[str], file: UploadFile, 
                        current_user_id: str) -> dict:
         """Create a new document with file upload"""
-        # Create document
+        # Stream the file first so an oversized upload leaves no document behind
+        stored_file = await self._save_uploaded_file(file)
+        return await self.create_document_from_stored_file(
+            title, description, tags, stored_file, file.filename, file.content_type, current_user_id
+        )
+
+    async def create_document_from_stored_file(self, title: str, description: Optional[str],
+                                               tags: List[str], stored_file: StoredFile,
+                                               file_name: str, file_type: Optional[str],
+                                               current_user_id: str) -> dict:
+        """Create a new document from a file already staged in the blob store"""
+        # The inserts and the blob move are blocking, so they run off the event loop
+        return await run_in_threadpool(
+            self._create_document_from_stored_file, title, description, tags, stored_file,
+            file_name, file_type, current_user_id
+        )
+
+    def _create_document_from_stored_file(self, title: str, description: Optional[str],
+                                          tags: List[str], stored_file: StoredFile,
+                                          file_name: str, file_type: Optional[str],
+                                          current_user_id: str) -> dict:
         document_id = str(uuid.uuid4())
-        document_data = {
-            "document_id": document_id,
-            "title": title,
-            "description": description,
-            "created_by": current_user_id
-        }
-        
-        db_document = self.document_repo.create_document(document_data)
-        
-        # Handle file upload
-        file_path = self._save_uploaded_file(file, document_id)
-        
-        # Calculate file checksum
-        file_checksum = self._calculate_file_hash(file_path)
+        blob_path = self.blob_store.blob_path(stored_file.checksum)
         
-        # Create first version
-        version_data = {
-            "version_id": str(uuid.uuid4()),
-            "document_id": document_id,
-            "version_number": 1,
-            "file_name": file.filename,
-            "file_path": str(file_path),
-            "file_type": file.content_type,
-            "file_size": file.size if hasattr(file, 'size') else 0,
-            "checksum": file_checksum,
-            "uploaded_by": current_user_id,
-            "is_current": True
-        }
-        
-        self.document_repo.create_document_version(version_data)
+        db_document = None
+        try:
+            # Create document
+            document_data = {
+                "document_id": document_id,
+                "title": title,
+                "description": description,
+                "created_by": current_user_id
+            }
+            
+            db_document = self.document_repo.create_document(document_data)
+            
+            # Create first version, pointing at the content-addressed blob
+            version_data = {
+                "version_id": str(uuid.uuid4()),
+                "document_id": document_id,
+                "version_number": 1,
+                "file_name": file_name,
+                "file_path": str(blob_path),
+                "file_type": file_type,
+                "file_size": stored_file.size,
+                "checksum": stored_file.checksum,
+                "uploaded_by": current_user_id,
+                "is_current": True
+            }
+            
+            # The file is moved into the store before the version commits
+            self.document_repo.create_document_version(
+                version_data, store_blob=lambda: self.blob_store.commit(stored_file)
+            )
+        except Exception:
+            self.blob_store.discard(stored_file)
+            if db_document is not None:
+                # No version was recorded, so there are no blob references to release
+                self.document_repo.delete_document(document_id)
+            raise
         
         # Handle tags
         if tags:
-            tag_objects = self.tag_repo.get_tags_by_names(tags)
-            tag_ids = [tag.tag_id for tag in tag_objects]
-            self.document_repo.add_document_tags(document_id, tag_ids, current_user_id)
+            tag_ids = self.tag_repo.get_or_create_tag_ids(tags)
+            self.document_repo.add_document_tags(document_id, list(tag_ids.values()), current_user_id)
+        
+        # Index the file body off the request path
+        schedule_extraction(document_id, stored_file.checksum, str(blob_path), file_type)
         
         return self.get_document_details(document_id)
 
     def get_documents(self, search: Optional[str] = None, 
                      tag_filter: Optional[str] = None,
-                     limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
-        """Get documents with search and filter"""
-        documents = self.document_repo.get_documents_with_details(
-            search=search, tag_filter=tag_filter, limit=limit, offset=offset
-        )
+                     limit: int = 100, offset: int = 0,
+                     cursor: Optional[str] = None,
+                     sort: str = "newest",
+                     acl: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Get documents with search and filter, by offset or by an opaque cursor"""
+        if sort not in SORT_OPTIONS:
+            raise ValueError(f"Invalid sort '{sort}', expected one of: {', '.join(SORT_OPTIONS)}")
         
-        # Add tags to each document
-        for doc in documents:
-            doc["tags"] = self.document_repo.get_document_tags(doc["document_id"])
-        
-        return documents
+        # Tags come with each row of the summary table
+        return self.document_repo.get_documents_with_details(
+            search=search, tag_filter=tag_filter, limit=limit, offset=offset,
+            cursor=decode_cursor(cursor) if cursor else None, sort=sort, acl=acl
+        )
+
+    def get_next_cursor(self, documents: List[Dict[str, Any]], limit: int) -> Optional[str]:
+        """Build the cursor for the page after ``documents``, or None on the last page"""
+        return next_cursor(documents, limit)
+
+    def document_exists(self, document_id: str, acl: Optional[Dict[str, Any]] = None) -> bool:
+        """Whether the document exists and is readable under ``acl``, without loading it"""
+        if acl and not acl["is_admin"]:
+            try:
+                uuid.UUID(document_id)
+            except ValueError:
+                return False
+            return self.document_repo.can_read_document(document_id, acl)
+        return self.loader.exists(document_id)
 
     def get_document_details(self, document_id: str) -> Optional[Dict[str, Any]]:
         """Get detailed document information"""
-        document = self.document_repo.get_document_with_details(document_id)
+        document = self.get_document_with_tags(document_id)
         if not document:
             return None
         
         # Get current version
-        versions = self.document_repo.get_document_versions(document_id)
-        current_version = next((v for v in versions if v["is_current"]), None)
-        
-        # Get tags
-        tags = self.document_repo.get_document_tags(document_id)
-        
-        document["current_version"] = current_version
-        document["tags"] = tags
-        
+        versions = self.loader.versions(document_id)
+        document["current_version"] = next((v for v in versions if v["is_current"]), None)
         return document
 
+    def get_document_with_tags(self, document_id: str) -> Optional[Dict[str, Any]]:
+        """Get document information and tags, without the version history"""
+        document = self.loader.document(document_id)
+        if not document:
+            return None
+        return {**document, "tags": self.loader.tags(document_id)}
+
     def get_document_versions(self, document_id: str) -> List[Dict[str, Any]]:
         """Get all versions of a document"""
-        return self.document_repo.get_document_versions(document_id)
+        return self.loader.versions(document_id)
 
     def set_current_version(self, document_id: str, version_id: str) -> bool:
         """Set a specific version as current"""
-        return self.document_repo.set_current_version(document_id, version_id)
+        success = self.document_repo.set_current_version(document_id, version_id)
+        self.loader.forget(document_id)
+        if success:
+            # Search should reflect the body of the version that is now current
+            self.content_repo.refresh_document_content_vector(document_id)
+        return success
 
-    def update_document(self, document_id: str, title: str, 
+    async def update_document(self, document_id: str, title: str, 
                        description: Optional[str], tags: List[str], existing_tags: List[str],
                        current_user_id: str, file: Optional[UploadFile] = None) -> Optional[Dict[str, Any]]:
         """Update document details and create new version for any change"""
-        # Update basic info
-        update_data = {"title": title, "description": description}
-        success = self.document_repo.update_document(document_id, update_data)
-        
-        if not success:
-            return None
-        
-        # Get current version info for creating new version
-        versions = self.document_repo.get_document_versions(document_id)
-        current_version = next((v for v in versions if v["is_current"]), None)
-        
-        # Get next version number
-        next_version = max([v["version_number"] for v in versions], default=0) + 1
+        # Stream any new file before touching the database
+        stored_file = await self._save_uploaded_file(file) if file else None
+        return await self.update_document_from_stored_file(
+            document_id, title, description, tags, existing_tags, current_user_id,
+            stored_file=stored_file,
+            file_name=file.filename if file else None,
+            file_type=file.content_type if file else None
+        )
+
+    async def update_document_from_stored_file(self, document_id: str, title: str,
+                                               description: Optional[str], tags: List[str],
+                                               existing_tags: List[str], current_user_id: str,
+                                               stored_file: Optional[StoredFile] = None,
+                                               file_name: Optional[str] = None,
+                                               file_type: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Update a document, adding a file already staged in the blob store as the new version.
         
-        # Create new version (for any change - file or metadata)
-        if file:
-            # New file uploaded
-            file_path = self._save_uploaded_file(file, document_id)
-            file_checksum = self._calculate_file_hash(file_path)
-            
-            version_data = {
-                "version_id": str(uuid.uuid4()),
-                "document_id": document_id,
-                "version_number": next_version,
-                "file_name": file.filename,
-                "file_path": str(file_path),
-                "file_type": file.content_type,
-                "file_size": file.size if hasattr(file, 'size') else 0,
-                "checksum": file_checksum,
-                "uploaded_by": current_user_id,
-                "is_current": False  # Initially set to false
+        Every change creates a new version; without a file the current one is carried over.
+        Returns None if the document does not exist.
+        """
+        # The update, the tag upserts and the blob move are blocking, so they run off the event loop
+        return await run_in_threadpool(
+            self._update_document_from_stored_file, document_id, title, description, tags,
+            existing_tags, current_user_id, stored_file, file_name, file_type
+        )
+
+    def _update_document_from_stored_file(self, document_id: str, title: str,
+                                          description: Optional[str], tags: List[str],
+                                          existing_tags: List[str], current_user_id: str,
+                                          stored_file: Optional[StoredFile],
+                                          file_name: Optional[str],
+                                          file_type: Optional[str]) -> Optional[Dict[str, Any]]:
+        new_file = None
+        if stored_file:
+            new_file = {
+                "file_name": file_name,
+                "file_path": str(self.blob_store.blob_path(stored_file.checksum)),
+                "file_type": file_type,
+                "file_size": stored_file.size,
+                "checksum": stored_file.checksum
             }
-        else:
-            # No new file, but metadata changed - create version with same file
-            if current_version:
-                version_data = {
-                    "version_id": str(uuid.uuid4()),
-                    "document_id": document_id,
-                    "version_number": next_version,
-                    "file_name": current_version["file_name"],
-                    "file_path": current_version["file_path"],
-                    "file_type": current_version["file_type"],
-                    "file_size": current_version["file_size"],
-                    "checksum": current_version.get("checksum", ""),  # Handle missing checksum
-                    "uploaded_by": current_user_id,
-                    "is_current": False  # Initially set to false
-                }
-            else:
-                return None  # Can't create version without current version data
-        
-        # Create the new version
-        new_version = self.document_repo.create_document_version(version_data)
         
-        # Set this version as current (this will automatically set others to false)
-        self.document_repo.set_current_version(document_id, version_data["version_id"])
+        # Existing tags (after removals) plus the new ones replace the document's tag set
+        document = None
+        try:
+            tag_ids = self.tag_repo.get_or_create_tag_ids(existing_tags + tags)
+            document = self.document_repo.update_document_with_version(
+                document_id, title, description, tag_ids, current_user_id, new_file,
+                store_blob=(lambda: self.blob_store.commit(stored_file)) if stored_file else None
+            )
+        finally:
+            self.loader.forget(document_id)
+            if stored_file and not document:
+                self.blob_store.discard(stored_file)
         
-        # Ensure consistency
-        self.document_repo.ensure_single_current_version(document_id)
-        
-        # Handle tags - replace all tags with existing_tags + new tags
-        all_tags = existing_tags + tags  # Combine existing (after removals) and new tags
-        if all_tags:
-            # Remove all existing document tags first
-            self.document_repo.remove_all_document_tags(document_id)
-            
-            # Add the new combined tag set
-            tag_objects = self.tag_repo.get_tags_by_names(all_tags)
-            tag_ids = [tag.tag_id for tag in tag_objects]
-            self.document_repo.add_document_tags(document_id, tag_ids, current_user_id)
-        elif existing_tags == [] and tags == []:
-            # If both lists are empty, remove all tags
-            self.document_repo.remove_all_document_tags(document_id)
+        if not document:
+            return None
         
-        # Get updated document details
-        document_details = self.get_document_details(document_id)
+        if stored_file:
+            # Index the new file body off the request path
+            schedule_extraction(document_id, stored_file.checksum, new_file["file_path"], file_type)
         
         # Include the new version number in the response
-        if document_details and document_details.get("current_version"):
-            document_details["version_number"] = document_details["current_version"]["version_number"]
-        
-        return document_details
+        document["version_number"] = document["current_version"]["version_number"]
+        return document
 
     def delete_document(self, document_id: str) -> bool:
         """Delete document and clean up files"""
-        # Get document versions to clean up files
-        versions = self.document_repo.get_document_versions(document_id)
+        # Get document versions to clean up files stored before the blob store existed
+        versions = self.loader.versions(document_id)
         
-        # Delete the document from database
-        success = self.document_repo.delete_document(document_id)
+        # Blobs are unlinked only once their last reference is gone
+        success = self.document_repo.delete_document(document_id, release_blob=self.blob_store.release)
+        self.loader.forget(document_id)
         
         if success:
-            # Clean up files
+            # Clean up legacy per-document files
             for version in versions:
+                if self.blob_store.is_blob_path(version["file_path"]):
+                    continue
                 file_path = Path(version["file_path"])
                 if file_path.exists():
                     try:
@@ -214,31 +293,86 @@ class DocumentService:
         return success
 
     def get_document_for_download(self, document_id: str, 
-                                version_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+                                version_id: Optional[str] = None,
+                                acl: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
         """Get document version for download"""
-        return self.document_repo.get_document_version_for_download(document_id, version_id)
+        return self.document_repo.get_document_version_for_download(document_id, version_id, acl)
 
-    def _save_uploaded_file(self, file: UploadFile, document_id: str) -> Path:
-        """Save uploaded file to disk"""
-        # Create document-specific directory
-        doc_dir = self.upload_dir / document_id
-        doc_dir.mkdir(exist_ok=True)
-        
-        # Generate unique filename
-        file_extension = Path(file.filename).suffix
-        unique_filename = f"{uuid.uuid4()}{file_extension}"
-        file_path = doc_dir / unique_filename
+    async def _save_uploaded_file(self, file: UploadFile) -> StoredFile:
+        """Stream an uploaded file into the blob store's staging area in a worker thread"""
+        max_size = settings.MAX_FILE_SIZE
+        if file.size is not None and file.size > max_size:
+            raise FileTooLargeError(max_size)
         
-        # Save file
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        return file_path
-
-    def _calculate_file_hash(self, file_path: Path) -> str:
-        """Calculate MD5 hash of file"""
-        hash_md5 = hashlib.md5()
-        with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_md5.update(chunk)
-        return hash_md5.hexdigest()
+        await file.seek(0)
+        return await run_in_threadpool(self.blob_store.ingest, file.file, max_size)
+
+
+class AsyncDocumentService:
+    """Document reads for async route handlers; writes go through DocumentService"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.document_repo = AsyncDocumentRepository(db)
+        self.loader = AsyncDocumentLoader(self.document_repo)
+
+    async def get_documents(self, search: Optional[str] = None,
+                            tag_filter: Optional[str] = None,
+                            limit: int = 100, offset: int = 0,
+                            cursor: Optional[str] = None,
+                            sort: str = "newest",
+                            acl: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Get documents with search and filter, by offset or by an opaque cursor"""
+        if sort not in SORT_OPTIONS:
+            raise ValueError(f"Invalid sort '{sort}', expected one of: {', '.join(SORT_OPTIONS)}")
+
+        return await self.document_repo.get_documents_with_details(
+            search=search, tag_filter=tag_filter, limit=limit, offset=offset,
+            cursor=decode_cursor(cursor) if cursor else None, sort=sort, acl=acl
+        )
+
+    def get_next_cursor(self, documents: List[Dict[str, Any]], limit: int) -> Optional[str]:
+        """Build the cursor for the page after ``documents``, or None on the last page"""
+        return next_cursor(documents, limit)
+
+    async def _is_readable(self, document_id: str, acl: Optional[Dict[str, Any]]) -> bool:
+        # Restricted principals need the ACL probe; it also answers whether the document exists
+        if not acl or acl["is_admin"]:
+            return True
+        try:
+            uuid.UUID(document_id)
+        except ValueError:
+            return False
+        return await self.document_repo.can_read_document(document_id, acl)
+
+    async def document_exists(self, document_id: str, acl: Optional[Dict[str, Any]] = None) -> bool:
+        """Whether the document exists and is readable under ``acl``, without loading it"""
+        if acl and not acl["is_admin"]:
+            return await self._is_readable(document_id, acl)
+        return await self.loader.exists(document_id)
+
+    async def get_document_details(self, document_id: str,
+                                   acl: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Get detailed document information, or None if missing or not readable under ``acl``"""
+        if not await self._is_readable(document_id, acl):
+            return None
+        document = await self.loader.document(document_id)
+        if not document:
+            return None
+
+        versions = await self.loader.versions(document_id)
+        return {
+            **document,
+            "current_version": next((v for v in versions if v["is_current"]), None),
+            "tags": await self.loader.tags(document_id)
+        }
+
+    async def get_document_versions(self, document_id: str) -> List[Dict[str, Any]]:
+        """Get all versions of a document"""
+        return await self.loader.versions(document_id)
+
+    async def get_document_for_download(self, document_id: str,
+                                        version_id: Optional[str] = None,
+                                        acl: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Get document version for download"""
+        return await self.document_repo.get_document_version_for_download(document_id, version_id, acl)
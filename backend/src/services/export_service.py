@@ -0,0 +1,141 @@
+from sqlalchemy.orm import Session
+from ..repositories.document_repository import DocumentRepository
+from ..core.config import settings
+from ..core.storage import CHUNK_SIZE
+from datetime import datetime
+from pathlib import Path, PurePosixPath
+from typing import Callable, Dict, Any, Iterator, List, Optional
+import io
+import mimetypes
+import uuid
+import zipfile
+
+# Formats that are already compressed; deflating them again costs CPU for nothing
+COMPRESSED_TYPES = {
+    "application/pdf",
+    "application/zip",
+    "application/gzip",
+    "application/x-7z-compressed",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+    "image/jpeg",
+    "image/png",
+    "image/gif",
+    "image/webp",
+}
+
+
+class _ZipStream(io.RawIOBase):
+    """Write-only, unseekable sink that hands out whatever zipfile has written so far"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _compress_type(file_type: Optional[str], file_name: str) -> int:
+    file_type = file_type or mimetypes.guess_type(file_name)[0] or ""
+    if file_type in COMPRESSED_TYPES or file_type.startswith(("video/", "audio/")):
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+
+def _safe_name(value: Optional[str], fallback: str) -> str:
+    value = (value or "").replace("/", "_").replace("\\", "_").strip().strip(".")
+    return value or fallback
+
+
+def _archive_names(entries: List[Dict[str, Any]]) -> List[str]:
+    """Unique archive paths: <title>/<file name>, with a v<N>/ level for multi-version documents"""
+    versions_per_document: Dict[str, int] = {}
+    for entry in entries:
+        versions_per_document[entry["document_id"]] = versions_per_document.get(entry["document_id"], 0) + 1
+
+    names, used = [], set()
+    for entry in entries:
+        folder = _safe_name(entry["title"], entry["document_id"])
+        if versions_per_document[entry["document_id"]] > 1:
+            folder += f"/v{entry['version_number']}"
+        path = PurePosixPath(folder) / _safe_name(entry["file_name"], "file")
+
+        candidate, counter = path, 2
+        while str(candidate) in used:
+            candidate = path.with_name(f"{path.stem} ({counter}){path.suffix}")
+            counter += 1
+        used.add(str(candidate))
+        names.append(str(candidate))
+    return names
+
+
+def stream_zip(entries: List[Dict[str, Any]],
+               on_exported: Optional[Callable[[Dict[str, Any]], Any]] = None) -> Iterator[bytes]:
+    """Yield a ZIP archive of the given versions as it is built.
+
+    Nothing is buffered beyond one read chunk, so memory stays flat however large the
+    export is. Entries use data descriptors (the output is not seekable) and ZIP64 where
+    needed. Files missing from storage are listed in MISSING_FILES.txt. ``on_exported``
+    is called with each entry once its file has been sent.
+    """
+    stream = _ZipStream()
+    missing = []
+    with zipfile.ZipFile(stream, mode="w") as archive:
+        for entry, name in zip(entries, _archive_names(entries)):
+            file_path = Path(entry["file_path"])
+            if not file_path.exists():
+                missing.append(name)
+                continue
+
+            info = zipfile.ZipInfo(name, date_time=(entry["uploaded_at"] or datetime.now()).timetuple()[:6])
+            info.compress_type = _compress_type(entry["file_type"], entry["file_name"])
+            info.file_size = entry["file_size"] or 0  # Lets zipfile decide on ZIP64 up front
+            with open(file_path, "rb") as source, archive.open(info, mode="w") as target:
+                for chunk in iter(lambda: source.read(CHUNK_SIZE), b""):
+                    target.write(chunk)
+                    data = stream.drain()
+                    if data:
+                        yield data
+            yield stream.drain()
+            if on_exported:
+                on_exported(entry)
+
+        if missing:
+            archive.writestr("MISSING_FILES.txt", "\n".join(missing) + "\n")
+    yield stream.drain()
+
+
+class ExportService:
+    def __init__(self, db: Session):
+        self.db = db
+        self.document_repo = DocumentRepository(db)
+
+    def get_export_entries(self, search: Optional[str] = None, tag_filter: Optional[str] = None,
+                           document_ids: Optional[List[str]] = None,
+                           version_ids: Optional[List[str]] = None,
+                           acl: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Resolve an export request to the versions to archive, skipping documents ``acl`` cannot read"""
+        try:
+            document_ids = [str(uuid.UUID(value)) for value in document_ids or []]
+            version_ids = [str(uuid.UUID(value)) for value in version_ids or []]
+        except ValueError as e:
+            raise ValueError("Invalid document or version ID") from e
+
+        entries = self.document_repo.get_versions_for_export(
+            search=search, tag_filter=tag_filter, document_ids=document_ids,
+            version_ids=version_ids, limit=settings.EXPORT_MAX_FILES + 1, acl=acl
+        )
+        if len(entries) > settings.EXPORT_MAX_FILES:
+            raise ValueError(f"Export matches more than {settings.EXPORT_MAX_FILES} files; narrow the filter")
+        return entries
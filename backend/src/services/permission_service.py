@@ -0,0 +1,80 @@
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from ..repositories.permission_repository import PermissionRepository
+from ..repositories.document_repository import DocumentRepository
+from ..core.acl import is_admin, invalidate_grants
+from typing import List, Optional, Dict, Any
+import uuid
+
+PERMISSION_TYPES = ("read", "write", "admin")
+
+
+class PermissionService:
+    """Manage a document's grants; only administrators and the document's creator may"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.permission_repo = PermissionRepository(db)
+        self.document_repo = DocumentRepository(db)
+
+    def _check_manager(self, document_id: str, current_user: dict) -> bool:
+        # False if the document does not exist, PermissionError if the user may not manage it
+        try:
+            uuid.UUID(document_id)
+        except ValueError:
+            return False
+        document = self.document_repo.get_document_by_id(document_id)
+        if document is None:
+            return False
+        if not is_admin(current_user) and str(document.created_by) != current_user["user_id"]:
+            raise PermissionError("Only administrators and the document's creator can manage its permissions")
+        return True
+
+    def get_permissions(self, document_id: str, current_user: dict) -> Optional[List[Dict[str, Any]]]:
+        """Get a document's active grants, or None if the document does not exist"""
+        if not self._check_manager(document_id, current_user):
+            return None
+        return self.permission_repo.get_document_permissions(document_id)
+
+    def grant_permission(self, document_id: str, current_user: dict, permission_type: str,
+                         user_id: Optional[str] = None, role_id: Optional[str] = None,
+                         department_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Grant access to a document; returns None if the document does not exist.
+
+        Raises ValueError for an invalid or unknown grantee or a grant that already exists.
+        """
+        if permission_type not in PERMISSION_TYPES:
+            raise ValueError(f"Invalid permission_type '{permission_type}', expected one of: {', '.join(PERMISSION_TYPES)}")
+        grantees = [value for value in (user_id, role_id, department_id) if value]
+        if len(grantees) != 1:
+            raise ValueError("Specify exactly one of user_id, role_id or department_id")
+        try:
+            uuid.UUID(grantees[0])
+        except ValueError as e:
+            raise ValueError("Invalid grantee ID") from e
+        if not self._check_manager(document_id, current_user):
+            return None
+        try:
+            permission = self.permission_repo.create_permission(
+                document_id, permission_type, current_user["user_id"],
+                user_id=user_id, role_id=role_id, department_id=department_id
+            )
+        except IntegrityError as e:
+            raise ValueError("Unknown user, role or department") from e
+        if permission is None:
+            raise ValueError("This permission is already granted")
+        invalidate_grants()
+        return permission
+
+    def revoke_permission(self, document_id: str, permission_id: str, current_user: dict) -> bool:
+        """Revoke a grant; returns False if the document or grant does not exist"""
+        if not self._check_manager(document_id, current_user):
+            return False
+        try:
+            uuid.UUID(permission_id)
+        except ValueError:
+            return False
+        revoked = self.permission_repo.revoke_permission(document_id, permission_id)
+        if revoked:
+            invalidate_grants()
+        return revoked
@@ -1,5 +1,7 @@
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..repositories.role_repository import RoleRepository
+from ..repositories.async_role_repository import AsyncRoleRepository
 from typing import List
 
 
@@ -11,3 +13,13 @@ class RoleService:
     def get_all_roles(self) -> List[dict]:
         """Get all roles"""
         return self.role_repo.get_all_roles()
+
+
+class AsyncRoleService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.role_repo = AsyncRoleRepository(db)
+
+    async def get_all_roles(self) -> List[dict]:
+        """Get all roles"""
+        return await self.role_repo.get_all_roles()
@@ -1,5 +1,7 @@
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..repositories.tag_repository import TagRepository
+from ..repositories.async_tag_repository import AsyncTagRepository
 from typing import List
 
 
@@ -11,3 +13,13 @@ class TagService:
     def get_all_tags(self) -> List[dict]:
         """Get all available tags"""
         return self.tag_repo.get_all_tags()
+
+
+class AsyncTagService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.tag_repo = AsyncTagRepository(db)
+
+    async def get_all_tags(self) -> List[dict]:
+        """Get all available tags"""
+        return await self.tag_repo.get_all_tags()
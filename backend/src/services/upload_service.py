@@ -0,0 +1,298 @@
+from sqlalchemy.orm import Session
+from ..repositories.upload_session_repository import UploadSessionRepository
+from ..core.config import settings
+from ..core.storage import BlobStore, StoredFile, FileTooLargeError, hash_file
+from ..schemas import UploadSessionCreate
+from .document_service import DocumentService
+from fastapi.concurrency import run_in_threadpool
+from pathlib import Path
+from typing import AsyncIterable, Optional, Dict, Any, Tuple
+import asyncio
+import hashlib
+import threading
+import time
+import uuid
+
+# Running SHA-256 per session while chunks arrive in order on this worker:
+# session_id -> (hasher, bytes hashed, last touched). hashlib state cannot be
+# persisted, so this only saves the final hash pass when every chunk of a session
+# reaches the same worker; otherwise completion hashes the assembled file.
+_hashers: Dict[str, Tuple[Any, int, float]] = {}
+_hashers_lock = threading.Lock()
+
+
+class UploadSessionNotFound(LookupError):
+    """Raised when a session does not exist, has expired or belongs to another user"""
+
+
+class ChunkOffsetConflict(ValueError):
+    """Raised when a chunk does not start where the contiguous upload currently ends"""
+
+    def __init__(self, expected_offset: int):
+        super().__init__(f"Chunk does not continue the upload; expected offset {expected_offset}")
+        self.expected_offset = expected_offset
+
+
+class ChunkTooLargeError(ValueError):
+    """Raised when a chunk body is larger than the largest chunk size allowed"""
+
+    def __init__(self, max_size: int):
+        super().__init__(f"Chunk exceeds the maximum chunk size of {max_size} bytes")
+        self.max_size = max_size
+
+
+async def read_chunk(stream: AsyncIterable[bytes], content_length: Optional[str], max_size: int) -> bytes:
+    """Read a chunk body, refusing it by Content-Length and again while streaming"""
+    if content_length is not None:
+        try:
+            declared = int(content_length)
+        except ValueError:
+            raise ValueError("Invalid Content-Length header")
+        if declared > max_size:
+            raise ChunkTooLargeError(max_size)
+
+    data = bytearray()
+    async for part in stream:
+        data.extend(part)
+        if len(data) > max_size:
+            raise ChunkTooLargeError(max_size)
+    return bytes(data)
+
+
+def check_chunk(session: Dict[str, Any], chunk_number: int, length: int,
+                offset: Optional[int] = None) -> Tuple[int, int]:
+    """Validate a chunk against its session and return its start and end offsets"""
+    if chunk_number < 0:
+        raise ValueError("chunk_number must not be negative")
+    chunk_offset = chunk_number * session["chunk_size"]
+    chunk_end = chunk_offset + length
+    if offset is not None and offset != chunk_offset:
+        raise ValueError(f"Offset {offset} does not match chunk {chunk_number}")
+    if chunk_end > session["total_size"]:
+        raise ValueError("Chunk extends past the declared file size")
+    if length != session["chunk_size"] and chunk_end != session["total_size"]:
+        raise ValueError(f"Only the last chunk may be shorter than {session['chunk_size']} bytes")
+    return chunk_offset, chunk_end
+
+
+def _write_chunk(path: Path, offset: int, data: bytes) -> None:
+    with open(path, "r+b") as f:
+        f.seek(offset)
+        f.write(data)
+
+
+def _advance_hash(session_id: str, offset: int, data: bytes) -> None:
+    """Feed a chunk into the session's running hash if it continues it"""
+    with _hashers_lock:
+        state = _hashers.get(session_id)
+        if offset == 0:
+            state = (hashlib.sha256(), 0, time.time())
+        if state is None or state[1] != offset:
+            # Chunks went to another worker; the digest is computed at completion instead
+            _hashers.pop(session_id, None)
+            return
+        hasher = state[0]
+        hasher.update(data)
+        _hashers[session_id] = (hasher, offset + len(data), time.time())
+
+
+def _pop_hash(session_id: str, total_size: int) -> Optional[str]:
+    with _hashers_lock:
+        state = _hashers.pop(session_id, None)
+    if state and state[1] == total_size:
+        return state[0].hexdigest()
+    return None
+
+
+class UploadService:
+    def __init__(self, db: Session):
+        self.db = db
+        self.session_repo = UploadSessionRepository(db)
+        self.blob_store = BlobStore(Path(settings.UPLOAD_DIR))
+
+    def _session_path(self, session_id: str) -> Path:
+        return self.blob_store.tmp_dir / f"session-{session_id}.part"
+
+    def _progress(self, session: Dict[str, Any]) -> Dict[str, Any]:
+        session["next_chunk"] = session["received_bytes"] // session["chunk_size"]
+        return session
+
+    def create_session(self, session_data: UploadSessionCreate, current_user_id: str,
+                       acl: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Start a resumable upload for a new document or a new version of one readable under ``acl``"""
+        if session_data.total_size > settings.MAX_FILE_SIZE:
+            raise FileTooLargeError(settings.MAX_FILE_SIZE)
+        if session_data.total_size <= 0:
+            raise ValueError("total_size must be positive")
+        if not session_data.document_id and not session_data.title:
+            raise ValueError("A title is required when uploading a new document")
+        if session_data.document_id:
+            if not DocumentService(self.db).document_exists(session_data.document_id, acl):
+                raise UploadSessionNotFound("Document not found")
+
+        chunk_size = min(session_data.chunk_size or settings.UPLOAD_CHUNK_SIZE, settings.UPLOAD_CHUNK_SIZE)
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+
+        session_id = str(uuid.uuid4())
+        self._session_path(session_id).touch()
+
+        session = self.session_repo.create_session({
+            "session_id": session_id,
+            "user_id": current_user_id,
+            "document_id": session_data.document_id,
+            "title": session_data.title,
+            "description": session_data.description,
+            "tags": ",".join(tag.strip() for tag in session_data.tags or [] if tag.strip()),
+            "file_name": session_data.file_name,
+            "file_type": session_data.file_type,
+            "total_size": session_data.total_size,
+            "chunk_size": chunk_size,
+            "ttl_hours": settings.UPLOAD_SESSION_TTL_HOURS
+        })
+        return self._progress(session)
+
+    def get_session(self, session_id: str, current_user_id: str) -> Dict[str, Any]:
+        """Get upload progress"""
+        session = self.session_repo.get_session(session_id, current_user_id)
+        if not session:
+            raise UploadSessionNotFound("Upload session not found")
+        return self._progress(session)
+
+    async def write_chunk(self, session_id: str, current_user_id: str, chunk_number: int,
+                          data: bytes, offset: Optional[int] = None) -> Dict[str, Any]:
+        """Write one numbered chunk straight into the session file"""
+        # The row lock is taken and released on one worker thread: a retry blocked on it
+        # must never block the event loop the lock holder needs to finish
+        return await run_in_threadpool(
+            self._write_chunk_locked, session_id, current_user_id, chunk_number, data, offset
+        )
+
+    def _write_chunk_locked(self, session_id: str, current_user_id: str, chunk_number: int,
+                            data: bytes, offset: Optional[int]) -> Dict[str, Any]:
+        # Lock the session row so concurrent retries of a chunk are serialized
+        session = self.session_repo.get_session(session_id, current_user_id, for_update=True)
+        if not session:
+            self.db.rollback()
+            raise UploadSessionNotFound("Upload session not found")
+
+        try:
+            chunk_offset, chunk_end = check_chunk(session, chunk_number, len(data), offset)
+            if chunk_end <= session["received_bytes"]:
+                # Retry of a chunk we already have
+                self.db.rollback()
+                return self._progress(session)
+            if chunk_offset != session["received_bytes"]:
+                raise ChunkOffsetConflict(session["received_bytes"])
+
+            _write_chunk(self._session_path(session_id), chunk_offset, data)
+            _advance_hash(session_id, chunk_offset, data)
+        except Exception:
+            self.db.rollback()
+            raise
+
+        self.session_repo.set_received_bytes(session_id, chunk_end)
+        session["received_bytes"] = chunk_end
+        return self._progress(session)
+
+    async def complete_session(self, session_id: str, current_user_id: str) -> Optional[Dict[str, Any]]:
+        """Turn a fully received upload into a document or a new version.
+
+        The session file is moved into the blob store, never copied. If finalizing
+        fails the session is discarded and the upload has to be restarted.
+        """
+        session = await run_in_threadpool(self.get_session, session_id, current_user_id)
+        if session["received_bytes"] != session["total_size"]:
+            raise ChunkOffsetConflict(session["received_bytes"])
+
+        path = self._session_path(session_id)
+        checksum = _pop_hash(session_id, session["total_size"])
+        if checksum:
+            stored_file = StoredFile(path, session["total_size"], checksum)
+        else:
+            stored_file = await run_in_threadpool(hash_file, path)
+
+        # The session row goes first so a concurrent completion cannot reuse the file
+        if not await run_in_threadpool(self.session_repo.delete_session, session_id):
+            raise UploadSessionNotFound("Upload session not found")
+
+        document_service = DocumentService(self.db)
+        if not session["document_id"]:
+            return await document_service.create_document_from_stored_file(
+                title=session["title"],
+                description=session["description"],
+                tags=session["tags"],
+                stored_file=stored_file,
+                file_name=session["file_name"],
+                file_type=session["file_type"],
+                current_user_id=current_user_id
+            )
+
+        document = await run_in_threadpool(document_service.get_document_with_tags, session["document_id"])
+        if not document:
+            await run_in_threadpool(self.blob_store.discard, stored_file)
+            raise UploadSessionNotFound("Document not found")
+        return await document_service.update_document_from_stored_file(
+            document_id=session["document_id"],
+            title=session["title"] or document["title"],
+            description=session["description"] if session["description"] is not None else document["description"],
+            tags=[tag for tag in session["tags"] if tag not in document["tags"]],
+            existing_tags=document["tags"],
+            current_user_id=current_user_id,
+            stored_file=stored_file,
+            file_name=session["file_name"],
+            file_type=session["file_type"]
+        )
+
+    def abort_session(self, session_id: str, current_user_id: str) -> None:
+        """Cancel an upload and remove what was received"""
+        self.get_session(session_id, current_user_id)
+        self.session_repo.delete_session(session_id)
+        self._discard_session_file(session_id)
+
+    def expire_sessions(self) -> int:
+        """Delete expired sessions and their partial files"""
+        expired = self.session_repo.delete_expired_sessions()
+        for session_id in expired:
+            self._discard_session_file(session_id)
+
+        cutoff = time.time() - settings.UPLOAD_SESSION_TTL_HOURS * 3600
+        # Part files whose session row went away with its document
+        for path in self.blob_store.tmp_dir.glob("session-*.part"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink(missing_ok=True)
+            except OSError:
+                pass
+
+        # Forget running hashes this worker kept for sessions abandoned elsewhere
+        with _hashers_lock:
+            for session_id in [key for key, state in _hashers.items() if state[2] < cutoff]:
+                del _hashers[session_id]
+        return len(expired)
+
+    def _discard_session_file(self, session_id: str) -> None:
+        with _hashers_lock:
+            _hashers.pop(session_id, None)
+        self._session_path(session_id).unlink(missing_ok=True)
+
+
+async def run_session_sweeper() -> None:
+    """Periodically expire abandoned upload sessions; runs for the lifetime of the app"""
+    from ..core.database import SessionLocal
+
+    def sweep() -> int:
+        db = SessionLocal()
+        try:
+            return UploadService(db).expire_sessions()
+        finally:
+            db.close()
+
+    while True:
+        await asyncio.sleep(settings.UPLOAD_SESSION_SWEEP_SECONDS)
+        try:
+            expired = await run_in_threadpool(sweep)
+            if expired:
+                print(f"🧹 Expired {expired} abandoned upload session(s)")
+        except Exception as e:
+            print(f"⚠️ Upload session sweep failed: {e}")
@@ -1,10 +1,20 @@
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from ..repositories.user_repository import UserRepository
+from ..repositories.async_user_repository import AsyncUserRepository
 from ..repositories.department_repository import DepartmentRepository
 from ..repositories.role_repository import RoleRepository
-from ..core.auth import get_password_hash, verify_password, create_access_token
+from ..repositories.auth_session_repository import AuthSessionRepository
+from ..core.config import settings
+from ..core.auth import (
+    get_password_hash_async, verify_password_async, create_access_token, principal_claims,
+    invalidate_principal, create_refresh_token, hash_refresh_token
+)
+from ..core.acl import invalidate_grants
 from ..schemas import UserCreate, UserResponse
-from typing import Optional
+from fastapi.concurrency import run_in_threadpool
+from typing import Optional, Tuple
+from datetime import timedelta
 import uuid
 
 
@@ -14,25 +24,15 @@ class UserService:
         self.user_repo = UserRepository(db)
         self.department_repo = DepartmentRepository(db)
         self.role_repo = RoleRepository(db)
+        self.session_repo = AuthSessionRepository(db)
 
-    def register_user(self, user_data: UserCreate) -> dict:
+    async def register_user(self, user_data: UserCreate) -> dict:
         """Register a new user"""
-        # Check if user already exists
-        existing_user = self.user_repo.get_user_by_email(user_data.email)
-        if existing_user:
-            raise ValueError("Email already registered")
-        
-        # Validate department and role
-        department = self.department_repo.get_department_by_id(user_data.department_id)
-        if not department:
-            raise ValueError("Invalid department")
-        
-        role = self.role_repo.get_role_by_id(user_data.role_id)
-        if not role:
-            raise ValueError("Invalid role")
+        # Lookups and inserts run off the event loop, like the password hash
+        await run_in_threadpool(self._check_registration, user_data)
         
         # Create user
-        hashed_password = get_password_hash(user_data.password)
+        hashed_password = await get_password_hash_async(user_data.password)
         user_dict = {
             "user_id": str(uuid.uuid4()),
             "email": user_data.email,
@@ -44,66 +44,131 @@ class UserService:
             "is_active": True
         }
         
-        db_user = self.user_repo.create_user(user_dict)
-        
-        # Create access token
-        access_token = create_access_token(data={"sub": db_user.email})
+        user_details, refresh_token = await run_in_threadpool(self._create_registered_user, user_dict)
         
-        return {
-            "access_token": access_token,
-            "token_type": "bearer",
-            "user": self.user_repo.get_user_with_details(db_user.email)
-        }
+        # Create access and refresh tokens
+        return self._issue_tokens(user_details, refresh_token)
 
-    def authenticate_user(self, email: str, password: str) -> Optional[dict]:
-        """Authenticate user and return token"""
-        import time
-        
-        print(f"🔍 Starting authentication for: {email}")
+    def _check_registration(self, user_data: UserCreate) -> None:
+        # Check if user already exists
+        existing_user = self.user_repo.get_user_by_email(user_data.email)
+        if existing_user:
+            raise ValueError("Email already registered")
         
-        # Get user from database
-        db_start = time.time()
-        user = self.user_repo.get_user_by_email(email)
-        db_time = time.time() - db_start
-        print(f"🔍 Database query took: {db_time:.3f}s")
+        # Validate department and role
+        department = self.department_repo.get_department_by_id(user_data.department_id)
+        if not department:
+            raise ValueError("Invalid department")
         
+        role = self.role_repo.get_role_by_id(user_data.role_id)
+        if not role:
+            raise ValueError("Invalid role")
+
+    def _create_registered_user(self, user_dict: dict) -> Tuple[dict, str]:
+        db_user = self.user_repo.create_user(user_dict)
+        user_details = self.user_repo.get_user_with_details(db_user.email)
+        return user_details, self._start_session(user_details["user_id"])
+
+    async def authenticate_user(self, email: str, password: str) -> Optional[dict]:
+        """Authenticate user and return token"""
+        # Get user, details and password hash in one query, off the event loop
+        user = await run_in_threadpool(self.user_repo.get_user_for_login, email)
         if not user:
-            print(f"🔍 User not found: {email}")
             return None
-            
-        # Verify password (this is where bcrypt optimization should help)
-        pwd_start = time.time()
-        password_valid = verify_password(password, user.password_hash)
-        pwd_time = time.time() - pwd_start
-        print(f"🔍 Password verification took: {pwd_time:.3f}s")
-        
-        if not password_valid:
-            print(f"🔍 Invalid password for: {email}")
+
+        # Verify password on the hashing pool so the event loop keeps serving requests
+        if not await verify_password_async(password, user.pop("password_hash")):
             return None
-        
-        if not user.is_active:
-            print(f"🔍 User account deactivated: {email}")
+
+        if not user["is_active"]:
             raise ValueError("User account is deactivated")
+
+        # Create access and refresh tokens
+        refresh_token = await run_in_threadpool(self._start_session, user["user_id"])
+        return self._issue_tokens(user, refresh_token)
+
+    def refresh_session(self, refresh_token: str) -> Optional[dict]:
+        """Exchange a refresh token for new tokens without re-checking the password"""
+        new_refresh_token = create_refresh_token()
+        session = self.session_repo.rotate_session(
+            hash_refresh_token(refresh_token), hash_refresh_token(new_refresh_token),
+            settings.REFRESH_TOKEN_EXPIRE_DAYS
+        )
+        if not session:
+            # A rotated-out token coming back means it was copied; end that session
+            if self.session_repo.revoke_reused_session(hash_refresh_token(refresh_token),
+                                                       settings.REFRESH_REUSE_GRACE_SECONDS):
+                print("⚠️ Refresh token reuse detected, session revoked")
+            return None
         
-        # Create token
-        token_start = time.time()
-        access_token = create_access_token(data={"sub": user.email})
-        token_time = time.time() - token_start
-        print(f"🔍 Token creation took: {token_time:.3f}s")
-        
-        # Get user details (this might be slow due to joins)
-        details_start = time.time()
-        user_details = self.user_repo.get_user_with_details(user.email)
-        details_time = time.time() - details_start
-        print(f"🔍 User details query took: {details_time:.3f}s")
+        user = self.user_repo.get_user_with_details_by_id(session["user_id"])
+        if not user or not user["is_active"]:
+            self.session_repo.revoke_session_by_id(session["session_id"])
+            return None
         
-        print(f"🔍 Authentication successful for: {email}")
+        return self._issue_tokens(user, new_refresh_token)
+
+    def logout(self, refresh_token: str) -> bool:
+        """Revoke the session of a refresh token"""
+        return self.session_repo.revoke_session(hash_refresh_token(refresh_token))
+
+    def _start_session(self, user_id: str) -> str:
+        refresh_token = create_refresh_token()
+        self.session_repo.create_session(
+            str(uuid.uuid4()), user_id, hash_refresh_token(refresh_token),
+            settings.REFRESH_TOKEN_EXPIRE_DAYS
+        )
+        return refresh_token
+
+    def _issue_tokens(self, user: dict, refresh_token: str) -> dict:
+        expire_minutes = settings.ACCESS_TOKEN_EXPIRE_MINUTES
+        if settings.AUTH_TRUST_TOKEN_CLAIMS:
+            # Trusted claims cannot be revoked, so keep them short-lived; the refresh
+            # that renews them re-reads the user and fails once they are deactivated
+            expire_minutes = min(expire_minutes, settings.AUTH_TRUSTED_TOKEN_EXPIRE_MINUTES)
+        access_token = create_access_token(
+            data=principal_claims(user),
+            expires_delta=timedelta(minutes=expire_minutes)
+        )
         return {
             "access_token": access_token,
             "token_type": "bearer",
-            "user": user_details
+            "refresh_token": refresh_token,
+            "user": user
         }
 
     def get_current_user(self, email: str) -> Optional[dict]:
         """Get current user details"""
         return self.user_repo.get_user_with_details(email)
+
+    def set_user_active(self, email: str, is_active: bool) -> bool:
+        """Activate or deactivate a user"""
+        success = self.user_repo.update_user_status(email, is_active)
+        if success and not is_active:
+            # Deactivated users can no longer refresh; access tokens lapse on their own
+            user = self.user_repo.get_user_by_email(email)
+            self.session_repo.revoke_user_sessions(str(user.user_id))
+        invalidate_principal(email)
+        return success
+
+    def change_user_assignment(self, email: str, department_id: str, role_id: str) -> bool:
+        """Move a user to another department and/or role"""
+        if not self.department_repo.get_department_by_id(department_id):
+            raise ValueError("Invalid department")
+        if not self.role_repo.get_role_by_id(role_id):
+            raise ValueError("Invalid role")
+        success = self.user_repo.update_user_assignment(email, department_id, role_id)
+        invalidate_principal(email)
+        # Cached grant contexts carry the old role and department
+        invalidate_grants()
+        return success
+
+
+class AsyncUserService:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.user_repo = AsyncUserRepository(db)
+
+    async def get_current_user(self, email: str) -> Optional[dict]:
+        """Get current user details"""
+        return await self.user_repo.get_user_with_details(email)
@@ -0,0 +1,117 @@
+"""Shared fixtures.
+
+Most tests exercise pure logic and need nothing else. Tests using ``db`` run against
+the Postgres database in ``TEST_DATABASE_URL`` and are skipped when it is not set;
+every such test starts from a freshly created schema, so never point it at a
+database you want to keep.
+"""
+from pathlib import Path
+from typing import Dict, List, Optional
+import os
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+SCHEMA_FILE = Path(__file__).resolve().parents[2] / "database_setup.sql"
+# database_setup.sql ends with example queries that are not part of the schema
+SCHEMA_END_MARKER = "-- Display setup completion message"
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+
+def _schema_sql() -> str:
+    sql = SCHEMA_FILE.read_text()
+    return sql.split(SCHEMA_END_MARKER, 1)[0]
+
+
+@pytest.fixture(scope="session")
+def db_engine():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    engine = create_engine(TEST_DATABASE_URL)
+    yield engine
+    engine.dispose()
+
+
+def _clear_process_caches() -> None:
+    # Cached IDs would point at rows of the previous test's schema
+    from src.core.acl import grant_cache
+    from src.core.auth import principal_cache
+    from src.repositories.tag_repository import tag_id_cache
+
+    for process_cache in (tag_id_cache, principal_cache, grant_cache):
+        process_cache.clear()
+
+
+@pytest.fixture
+def db(db_engine):
+    """Session on a freshly created schema"""
+    _clear_process_caches()
+    connection = db_engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute("SET client_min_messages TO WARNING")
+        cursor.execute(_schema_sql())
+        connection.commit()
+    finally:
+        connection.close()
+
+    session = sessionmaker(bind=db_engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def admin_id(db) -> str:
+    return str(db.execute(text("SELECT user_id FROM users WHERE email = 'admin@docrepo.com'")).scalar())
+
+
+@pytest.fixture
+def create_document(db, admin_id):
+    """Create a document with one current version and the given tags; returns its ID"""
+    from src.repositories.document_repository import DocumentRepository
+    from src.repositories.tag_repository import TagRepository
+
+    def create(title: str = "Report", tags: Optional[List[str]] = None,
+               created_by: Optional[str] = None) -> str:
+        repo = DocumentRepository(db)
+        document_id = str(uuid.uuid4())
+        created_by = created_by or admin_id
+        repo.create_document({"document_id": document_id, "title": title,
+                              "description": None, "created_by": created_by})
+        checksum = uuid.uuid4().hex * 2
+        repo.create_document_version({
+            "version_id": str(uuid.uuid4()), "document_id": document_id, "version_number": 1,
+            "file_name": f"{title}.txt", "file_path": f"/tmp/blobs/{checksum}", "file_type": "text/plain",
+            "file_size": 10, "checksum": checksum, "uploaded_by": created_by, "is_current": True
+        })
+        if tags:
+            tag_ids: Dict[str, str] = TagRepository(db).get_or_create_tag_ids(tags)
+            repo.add_document_tags(document_id, list(tag_ids.values()), created_by)
+        return document_id
+
+    return create
+
+
+@pytest.fixture
+def count_statements(db_engine):
+    """Count the SQL statements sent to the database inside a ``with`` block"""
+    from contextlib import contextmanager
+    from sqlalchemy import event
+
+    @contextmanager
+    def counting():
+        statements: List[str] = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db_engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(db_engine, "before_cursor_execute", before_cursor_execute)
+
+    return counting
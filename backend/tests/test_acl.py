@@ -0,0 +1,80 @@
+import uuid
+
+from src.repositories.document_queries import acl_condition
+
+
+def context(document_ids=None, is_admin=False):
+    return {"user_id": str(uuid.uuid4()), "role_id": str(uuid.uuid4()), "department_id": str(uuid.uuid4()),
+            "is_admin": is_admin, "document_ids": document_ids}
+
+
+def test_no_context_or_admin_is_unrestricted():
+    assert acl_condition("d", None) == (None, {})
+    assert acl_condition("d", context(is_admin=True)) == (None, {})
+
+
+def test_inline_grants_are_passed_as_an_array():
+    granted = [str(uuid.uuid4()), str(uuid.uuid4())]
+    acl = context(document_ids=granted)
+
+    condition, params = acl_condition("s", acl)
+
+    assert "NOT s.is_restricted" in condition
+    assert "s.created_by = CAST(:acl_user_id AS uuid)" in condition
+    assert "s.document_id = ANY(CAST(:acl_document_ids AS uuid[]))" in condition
+    assert "EXISTS" not in condition
+    assert params == {"acl_user_id": acl["user_id"], "acl_document_ids": granted}
+
+
+def test_no_grants_only_allows_unrestricted_and_own_documents():
+    condition, params = acl_condition("d", context(document_ids=[]))
+
+    assert "ANY" not in condition and "EXISTS" not in condition
+    assert set(params) == {"acl_user_id"}
+
+
+def test_too_many_grants_use_semi_joins():
+    acl = context(document_ids=None)
+
+    condition, params = acl_condition("d", acl)
+
+    assert condition.count("EXISTS") == 2
+    assert "p.document_id = d.document_id" in condition
+    assert "up.document_id = d.document_id" in condition
+    assert params == {"acl_user_id": acl["user_id"], "acl_role_id": acl["role_id"],
+                      "acl_department_id": acl["department_id"]}
+
+
+def test_write_endpoints_hide_unreadable_documents(db, admin_id, create_document):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from sqlalchemy import text
+
+    from src.controllers.document_controller import document_router
+    from src.core.acl import get_document_acl
+    from src.core.auth import get_current_active_user
+    from src.core.database import get_db
+    from src.repositories.permission_repository import PermissionRepository
+
+    document_id = create_document("Restricted")
+    PermissionRepository(db).create_permission(document_id, "read", admin_id, user_id=admin_id)
+    stranger = {"user_id": str(uuid.uuid4()), "email": "stranger@docrepo.com", "role_name": "Employee",
+                "is_active": True}
+
+    app = FastAPI()
+    app.include_router(document_router)
+    app.dependency_overrides[get_current_active_user] = lambda: stranger
+    app.dependency_overrides[get_document_acl] = lambda: {**context(document_ids=[]), "user_id": stranger["user_id"]}
+    app.dependency_overrides[get_db] = lambda: db
+    client = TestClient(app)
+
+    version_id = str(db.execute(text("SELECT version_id FROM document_versions")).scalar())
+    responses = [
+        client.put(f"/documents/{document_id}", data={"title": "Leaked?"}),
+        client.post(f"/documents/{document_id}/tags", json={"tags": ["x"]}),
+        client.put(f"/documents/{document_id}/versions/{version_id}/set-current"),
+        client.delete(f"/documents/{document_id}"),
+    ]
+
+    assert [response.status_code for response in responses] == [404] * 4
+    assert db.execute(text("SELECT title FROM documents")).scalar() == "Restricted"
@@ -0,0 +1,90 @@
+from datetime import date, datetime
+import uuid
+
+import pytest
+from sqlalchemy import text
+
+from src.repositories.audit_repository import add_months, partition_month, partition_name
+
+
+@pytest.mark.parametrize("month, months, expected", [
+    (date(2026, 10, 17), 0, date(2026, 10, 1)),
+    (date(2026, 10, 1), 3, date(2027, 1, 1)),
+    (date(2026, 1, 31), -1, date(2025, 12, 1)),
+    (date(2026, 3, 1), -24, date(2024, 3, 1)),
+    (date(2026, 12, 1), 1, date(2027, 1, 1)),
+])
+def test_add_months(month, months, expected):
+    assert add_months(month, months) == expected
+
+
+def test_partition_names_round_trip():
+    assert partition_name(date(2026, 2, 1)) == "document_audit_y2026m02"
+    assert partition_month("document_audit_y2026m02") == date(2026, 2, 1)
+
+
+@pytest.mark.parametrize("name", ["document_audit_default", "document_audit_y2026m2", "other_y2026m02"])
+def test_other_tables_are_not_monthly_partitions(name):
+    assert partition_month(name) is None
+
+
+def _insert_event(db, admin_id, timestamp):
+    from src.repositories.audit_repository import AuditRepository
+
+    AuditRepository(db).insert_events([{
+        "document_id": str(uuid.uuid4()), "user_id": admin_id, "action": "view", "timestamp": timestamp
+    }])
+
+
+def _partitions_holding_events(db):
+    return [row[0] for row in db.execute(text("SELECT tableoid::regclass::text FROM document_audit")).fetchall()]
+
+
+def test_new_partition_takes_over_rows_from_default(db, admin_id):
+    from src.repositories.audit_repository import AuditRepository
+
+    today = datetime.utcnow().date()
+    later = add_months(today, 6)  # Beyond the partitions database_setup.sql creates
+    _insert_event(db, admin_id, datetime.combine(later, datetime.min.time()))
+    assert _partitions_holding_events(db) == ["document_audit_default"]
+
+    changes = AuditRepository(db).maintain_partitions(months_ahead=6, retention_months=0, today=today)
+
+    assert partition_name(later) in changes["created"]
+    assert (changes["moved"], changes["failed"]) == (1, [])
+    assert _partitions_holding_events(db) == [partition_name(later)]
+    # The default partition is attached again and still catches unpartitioned months
+    _insert_event(db, admin_id, datetime(2001, 1, 1))
+    assert "document_audit_default" in _partitions_holding_events(db)
+
+
+def test_retention_trims_the_default_partition(db, admin_id):
+    from src.repositories.audit_repository import AuditRepository
+
+    _insert_event(db, admin_id, datetime(2001, 1, 1))
+
+    changes = AuditRepository(db).maintain_partitions(months_ahead=0, retention_months=12)
+
+    assert changes["trimmed"] == 1
+    assert _partitions_holding_events(db) == []
+
+
+def test_failed_month_does_not_abort_the_round(db, monkeypatch):
+    from src.repositories.audit_repository import AuditRepository
+
+    today = datetime.utcnow().date()
+    broken = add_months(today, 5)
+    create_partition = AuditRepository._create_partition
+
+    def failing_create(self, month):
+        if month == broken.replace(day=1):
+            raise RuntimeError("boom")
+        return create_partition(self, month)
+
+    monkeypatch.setattr(AuditRepository, "_create_partition", failing_create)
+
+    changes = AuditRepository(db).maintain_partitions(months_ahead=6, retention_months=0, today=today)
+
+    assert changes["failed"] == [f"{partition_name(broken)}: boom"]
+    assert partition_name(add_months(today, 6)) in changes["created"]
+    assert add_months(today, 6) in AuditRepository(db).get_partition_months()
@@ -0,0 +1,34 @@
+from sqlalchemy import text
+
+from src.core.config import settings
+from src.services.user_service import UserService
+
+
+def _revoked(db, user_id: str) -> bool:
+    return db.execute(text("SELECT revoked_at IS NOT NULL FROM auth_sessions WHERE user_id = :user_id"),
+                      {"user_id": user_id}).scalar()
+
+
+def test_concurrent_refresh_within_grace_keeps_session(db, admin_id, monkeypatch):
+    monkeypatch.setattr(settings, "REFRESH_REUSE_GRACE_SECONDS", 10)
+    service = UserService(db)
+    first = service._start_session(admin_id)
+    second = service.refresh_session(first)["refresh_token"]
+
+    # Another tab presenting the token that was just rotated out
+    assert service.refresh_session(first) is None
+    assert not _revoked(db, admin_id)
+    assert service.refresh_session(second)["refresh_token"]
+
+
+def test_reused_token_after_grace_revokes_session(db, admin_id, monkeypatch):
+    monkeypatch.setattr(settings, "REFRESH_REUSE_GRACE_SECONDS", 10)
+    service = UserService(db)
+    first = service._start_session(admin_id)
+    second = service.refresh_session(first)["refresh_token"]
+    db.execute(text("UPDATE auth_sessions SET last_used_at = NOW() - INTERVAL '1 minute'"))
+    db.commit()
+
+    assert service.refresh_session(first) is None
+    assert _revoked(db, admin_id)
+    assert service.refresh_session(second) is None
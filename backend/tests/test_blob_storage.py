@@ -0,0 +1,122 @@
+import io
+import threading
+
+import pytest
+from sqlalchemy import text
+
+from src.core.storage import BlobStore
+from src.services import document_service as document_service_module
+from src.services.document_service import DocumentService
+
+
+@pytest.fixture
+def service(db, tmp_path, monkeypatch):
+    monkeypatch.setattr(document_service_module, "schedule_extraction", lambda *args: True)
+    service = DocumentService(db)
+    service.blob_store = BlobStore(tmp_path)
+    return service
+
+
+def failing_move(stored):
+    raise OSError("disk full")
+
+
+def counts(db):
+    return db.execute(text(
+        "SELECT (SELECT COUNT(*) FROM documents), (SELECT COUNT(*) FROM document_versions), "
+        "(SELECT COALESCE(SUM(ref_count), 0) FROM blobs)"
+    )).fetchone()
+
+
+async def test_created_document_points_at_a_stored_blob(db, service, admin_id):
+    stored = service.blob_store.ingest(io.BytesIO(b"hello"), max_size=100)
+
+    document = await service.create_document_from_stored_file(
+        "Greeting", None, [], stored, "hello.txt", "text/plain", admin_id
+    )
+
+    assert service.blob_store.blob_path(stored.checksum).read_bytes() == b"hello"
+    assert document["current_version"]["checksum"] == stored.checksum
+    assert tuple(counts(db)) == (1, 1, 1)
+
+
+async def test_stored_file_is_written_off_the_event_loop(service, admin_id, monkeypatch):
+    stored = service.blob_store.ingest(io.BytesIO(b"hello"), max_size=100)
+    commit = service.blob_store.commit
+    threads = []
+
+    def recording_commit(stored_file):
+        threads.append(threading.current_thread())
+        return commit(stored_file)
+
+    monkeypatch.setattr(service.blob_store, "commit", recording_commit)
+    await service.create_document_from_stored_file(
+        "Greeting", None, [], stored, "hello.txt", "text/plain", admin_id
+    )
+
+    assert threads and threads[0] is not threading.current_thread()
+
+
+async def test_failed_move_leaves_no_document_behind(db, service, admin_id, monkeypatch):
+    stored = service.blob_store.ingest(io.BytesIO(b"hello"), max_size=100)
+    monkeypatch.setattr(service.blob_store, "commit", failing_move)
+
+    with pytest.raises(OSError):
+        await service.create_document_from_stored_file(
+            "Greeting", None, [], stored, "hello.txt", "text/plain", admin_id
+        )
+
+    assert tuple(counts(db)) == (0, 0, 0)
+    assert not stored.path.exists()
+
+
+async def test_failed_move_rolls_back_the_new_version(db, service, admin_id, monkeypatch):
+    first = service.blob_store.ingest(io.BytesIO(b"v1"), max_size=100)
+    document = await service.create_document_from_stored_file(
+        "Notes", None, [], first, "notes.txt", "text/plain", admin_id
+    )
+    second = service.blob_store.ingest(io.BytesIO(b"v2"), max_size=100)
+    monkeypatch.setattr(service.blob_store, "commit", failing_move)
+
+    with pytest.raises(OSError):
+        await service.update_document_from_stored_file(
+            document["document_id"], "Notes", None, [], [], admin_id,
+            stored_file=second, file_name="notes.txt", file_type="text/plain"
+        )
+
+    assert tuple(counts(db)) == (1, 1, 1)
+    current = db.execute(text("SELECT checksum FROM document_versions WHERE is_current")).scalar()
+    assert current == first.checksum
+
+
+async def test_failed_update_rolls_back_its_new_tags(db, service, admin_id, monkeypatch):
+    from src.repositories.tag_repository import tag_id_cache
+
+    first = service.blob_store.ingest(io.BytesIO(b"v1"), max_size=100)
+    document = await service.create_document_from_stored_file(
+        "Notes", None, [], first, "notes.txt", "text/plain", admin_id
+    )
+    second = service.blob_store.ingest(io.BytesIO(b"v2"), max_size=100)
+    monkeypatch.setattr(service.blob_store, "commit", failing_move)
+
+    with pytest.raises(OSError):
+        await service.update_document_from_stored_file(
+            document["document_id"], "Notes", None, ["fresh"], [], admin_id,
+            stored_file=second, file_name="notes.txt", file_type="text/plain"
+        )
+
+    assert db.execute(text("SELECT COUNT(*) FROM tags WHERE name = 'fresh'")).scalar() == 0
+    assert tag_id_cache.get("fresh") is None
+
+
+def test_failed_delete_rolls_back_and_raises(db, create_document):
+    from src.repositories.document_repository import DocumentRepository
+
+    document_id = create_document("Keep")
+
+    def failing_release(file_path):
+        raise OSError("read-only file system")
+
+    with pytest.raises(OSError):
+        DocumentRepository(db).delete_document(document_id, release_blob=failing_release)
+    assert tuple(counts(db))[:2] == (1, 1)
@@ -0,0 +1,45 @@
+import pytest
+
+from src.services.bulk_ingest_service import parse_manifest
+
+
+def test_entries_are_keyed_by_file_name():
+    manifest = parse_manifest('[{"file_name": "a.pdf", "title": "A"}, {"file_name": "b.txt", "tags": "x, y"}]')
+
+    assert set(manifest) == {"a.pdf", "b.txt"}
+    assert manifest["a.pdf"]["title"] == "A"
+
+
+def test_bytes_are_accepted():
+    assert parse_manifest(b'[{"file_name": "a.pdf"}]') == {"a.pdf": {"file_name": "a.pdf"}}
+
+
+@pytest.mark.parametrize("raw", [None, "", b""])
+def test_missing_manifest_is_empty(raw):
+    assert parse_manifest(raw) == {}
+
+
+@pytest.mark.parametrize("raw", ["{not json", '{"file_name": "a.pdf"}', '[{"title": "no file name"}]', '["a.pdf"]'])
+def test_malformed_manifest_raises_value_error(raw):
+    with pytest.raises(ValueError, match="Invalid manifest"):
+        parse_manifest(raw)
+
+
+def test_oversized_bulk_request_is_rejected(monkeypatch):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from src.controllers.document_controller import document_router
+    from src.core.auth import get_current_active_user
+    from src.core.config import settings
+    from src.core.database import get_db
+
+    monkeypatch.setattr(settings, "BULK_INGEST_MAX_BYTES", 100)
+    app = FastAPI()
+    app.include_router(document_router)
+    app.dependency_overrides[get_current_active_user] = lambda: {"user_id": "u1", "is_active": True}
+    app.dependency_overrides[get_db] = lambda: None
+
+    response = TestClient(app).post("/documents/bulk", files={"archive": ("docs.zip", b"x" * 200)})
+
+    assert response.status_code == 413
@@ -0,0 +1,48 @@
+from src.core import cache
+from src.core.cache import TTLCache
+
+
+def test_get_returns_what_was_set():
+    store = TTLCache(maxsize=2, ttl=60)
+    store.set("a", 1)
+
+    assert store.get("a") == 1
+    assert store.get("missing") is None
+    assert "a" in store and len(store) == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    store = TTLCache(maxsize=2, ttl=60)
+    store.set("a", 1)
+    store.set("b", 2)
+    store.get("a")
+    store.set("c", 3)
+
+    assert store.get("b") is None
+    assert store.get("a") == 1 and store.get("c") == 3
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    store = TTLCache(maxsize=10, ttl=30)
+    store.set("a", 1)
+
+    now[0] += 29
+    assert store.get("a") == 1
+    now[0] += 2
+    assert store.get("a") is None
+    assert "a" not in store
+
+
+def test_invalidate_and_clear():
+    store = TTLCache(maxsize=10, ttl=60)
+    store.set("a", 1)
+    store.set("b", 2)
+
+    store.invalidate("a")
+    store.invalidate("missing")
+    assert store.get("a") is None and store.get("b") == 2
+
+    store.clear()
+    assert len(store) == 0
@@ -0,0 +1,84 @@
+from sqlalchemy import text
+
+from src.repositories.content_repository import ContentRepository
+from src.services.content_extraction_service import ContentExtractionService
+
+
+def point_at_file(db, document_id, path):
+    db.execute(text("UPDATE document_versions SET file_path = :path WHERE document_id = :document_id"),
+               {"path": str(path), "document_id": document_id})
+    db.commit()
+
+
+def content_status(db, document_id):
+    return db.execute(text("""
+        SELECT dc.status FROM document_versions dv JOIN document_contents dc ON dc.checksum = dv.checksum
+        WHERE dv.document_id = :document_id
+    """), {"document_id": document_id}).scalar()
+
+
+def test_failed_extraction_is_retried_only_when_asked(db, create_document, tmp_path):
+    document_id = create_document("Notes")
+    path = tmp_path / "notes.txt"
+    point_at_file(db, document_id, path)  # Not written yet: reading it fails
+    service = ContentExtractionService(db)
+
+    assert service.index_missing() == 1
+    assert content_status(db, document_id) == "failed"
+    assert service.index_missing() == 0
+
+    path.write_text("quarterly revenue figures")
+    assert service.index_missing(retry_failed=True) == 1
+    assert content_status(db, document_id) == "extracted"
+    assert db.execute(text("SELECT content_vector IS NOT NULL FROM documents WHERE document_id = :id"),
+                      {"id": document_id}).scalar()
+
+
+def test_retry_does_not_loop_on_files_that_keep_failing(db, create_document, tmp_path):
+    document_id = create_document("Missing")
+    point_at_file(db, document_id, tmp_path / "missing.txt")
+    service = ContentExtractionService(db)
+    service.index_missing()
+
+    assert service.index_missing(retry_failed=True) == 1
+    assert content_status(db, document_id) == "failed"
+
+
+def test_successful_extraction_is_never_overwritten(db):
+    repo = ContentRepository(db)
+    repo.save_content("a" * 64, "text", "extracted")
+    repo.save_content("a" * 64, None, "failed")
+
+    assert repo.has_content("a" * 64)
+    assert db.execute(text("SELECT status FROM document_contents")).scalar() == "extracted"
+
+
+def test_nul_characters_are_stripped(tmp_path):
+    from src.services.content_extraction_service import extract_text
+
+    path = tmp_path / "binary.txt"
+    path.write_bytes(b"quarterly\x00 revenue")
+
+    assert extract_text(path, "text/plain") == ("quarterly revenue", "extracted")
+
+
+def test_a_version_that_cannot_be_saved_does_not_stop_the_run(db, create_document, tmp_path, monkeypatch):
+    bad, good = create_document("Bad"), create_document("Good")
+    for document_id in (bad, good):
+        path = tmp_path / f"{document_id}.txt"
+        path.write_text("annual report")
+        point_at_file(db, document_id, path)
+    bad_checksum = db.execute(text("SELECT checksum FROM document_versions WHERE document_id = :id"),
+                              {"id": bad}).scalar()
+    save_content = ContentRepository.save_content
+
+    def failing_save(self, checksum, content, status):
+        if checksum == bad_checksum and status != "failed":
+            self.db.execute(text("SELECT 1 / 0"))
+        return save_content(self, checksum, content, status)
+
+    monkeypatch.setattr(ContentRepository, "save_content", failing_save)
+
+    assert ContentExtractionService(db).index_missing(batch_size=1) == 1
+    assert content_status(db, bad) == "failed"
+    assert content_status(db, good) == "extracted"
@@ -0,0 +1,45 @@
+from datetime import datetime
+import uuid
+
+import pytest
+
+from src.services.audit_service import decode_audit_cursor, encode_audit_cursor
+from src.services.document_service import decode_cursor, encode_cursor, next_cursor
+
+
+def test_listing_cursor_round_trip():
+    document = {"created_at": datetime(2026, 3, 1, 12, 30, 5, 123456), "document_id": str(uuid.uuid4())}
+
+    assert decode_cursor(encode_cursor(document)) == (document["created_at"], document["document_id"], None)
+
+
+def test_listing_cursor_keeps_search_rank():
+    document = {"created_at": datetime(2026, 3, 1), "document_id": str(uuid.uuid4()), "search_rank": 0.25}
+
+    assert decode_cursor(encode_cursor(document))[2] == 0.25
+
+
+@pytest.mark.parametrize("cursor", ["", "not-base64!", "W10", "WyJub3QgYSBkYXRlIiwgIngiXQ"])
+def test_malformed_listing_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor)
+
+
+def test_next_cursor_only_for_full_pages():
+    page = [{"created_at": datetime(2026, 1, 1), "document_id": str(uuid.uuid4())}] * 2
+
+    assert next_cursor(page, limit=3) is None
+    assert next_cursor([], limit=3) is None
+    assert decode_cursor(next_cursor(page, limit=2))[1] == page[-1]["document_id"]
+
+
+def test_audit_cursor_round_trip():
+    event = {"timestamp": datetime(2026, 10, 17, 8, 0, 1), "audit_id": str(uuid.uuid4())}
+
+    assert decode_audit_cursor(encode_audit_cursor(event)) == (event["timestamp"], event["audit_id"])
+
+
+@pytest.mark.parametrize("cursor", ["", "@@@", "WyIyMDI2LTAxLTAxIiwgIm5vdC1hLXV1aWQiXQ"])
+def test_malformed_audit_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_audit_cursor(cursor)
@@ -0,0 +1,38 @@
+import time
+
+from starlette.requests import Request
+
+from src.core.db_routing import PIN_COOKIE, PrimaryPinMiddleware, is_pinned_to_primary
+
+
+def request(headers=()):
+    return Request({"type": "http", "method": "GET", "headers": [
+        (name.encode(), value.encode()) for name, value in headers
+    ]})
+
+
+def test_pin_is_read_from_cookie_or_header():
+    future, past = f"{time.time() + 5:.3f}", f"{time.time() - 5:.3f}"
+
+    assert is_pinned_to_primary(request([("cookie", f"{PIN_COOKIE}={future}")]))
+    assert is_pinned_to_primary(request([("x-primary-until", future)]))
+    assert not is_pinned_to_primary(request([("x-primary-until", past)]))
+    assert not is_pinned_to_primary(request([("x-primary-until", "soon")]))
+    assert not is_pinned_to_primary(request())
+
+
+async def test_successful_write_returns_pin_cookie_and_header():
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    await PrimaryPinMiddleware(app)({"type": "http", "method": "POST"}, None, send)
+
+    headers = dict(sent[0]["headers"])
+    assert headers[b"set-cookie"].startswith(PIN_COOKIE.encode())
+    assert float(headers[b"x-primary-until"]) > time.time()
+    assert is_pinned_to_primary(request([("x-primary-until", headers[b"x-primary-until"].decode())]))
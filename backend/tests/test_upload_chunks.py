@@ -0,0 +1,92 @@
+import pytest
+
+from src.services.upload_service import ChunkTooLargeError, check_chunk, read_chunk
+
+SESSION = {"chunk_size": 100, "total_size": 250}
+
+
+async def _stream(*parts):
+    for part in parts:
+        yield part
+
+
+@pytest.mark.parametrize("chunk_number, length, expected", [
+    (0, 100, (0, 100)),
+    (1, 100, (100, 200)),
+    (2, 50, (200, 250)),
+])
+def test_check_chunk_returns_offsets(chunk_number, length, expected):
+    assert check_chunk(SESSION, chunk_number, length) == expected
+
+
+def test_check_chunk_accepts_matching_offset():
+    assert check_chunk(SESSION, 1, 100, offset=100) == (100, 200)
+
+
+@pytest.mark.parametrize("chunk_number, length, offset", [
+    (-1, 100, None),   # Negative chunk number
+    (1, 100, 50),      # Offset does not match the chunk
+    (2, 100, None),    # Past the declared size
+    (0, 60, None),     # Short chunk that is not the last one
+])
+def test_check_chunk_rejects_invalid_chunks(chunk_number, length, offset):
+    with pytest.raises(ValueError):
+        check_chunk(SESSION, chunk_number, length, offset)
+
+
+async def test_read_chunk_joins_stream():
+    assert await read_chunk(_stream(b"ab", b"cd"), "4", 4) == b"abcd"
+
+
+async def test_read_chunk_rejects_declared_length_before_reading():
+    async def never_read():
+        raise AssertionError("body read despite Content-Length")
+        yield b""
+
+    with pytest.raises(ChunkTooLargeError):
+        await read_chunk(never_read(), "5", 4)
+
+
+async def test_read_chunk_caps_undeclared_body():
+    with pytest.raises(ChunkTooLargeError):
+        await read_chunk(_stream(b"abc", b"de"), None, 4)
+
+
+async def test_read_chunk_rejects_invalid_content_length():
+    with pytest.raises(ValueError):
+        await read_chunk(_stream(b""), "lots", 4)
+
+
+async def test_concurrent_retries_of_a_chunk_do_not_block_each_other(db, db_engine, admin_id, tmp_path):
+    import asyncio
+
+    from sqlalchemy import text
+    from sqlalchemy.orm import sessionmaker
+
+    from src.core.storage import BlobStore
+    from src.schemas import UploadSessionCreate
+    from src.services.upload_service import UploadService
+
+    def service(session):
+        upload_service = UploadService(session)
+        upload_service.blob_store = BlobStore(tmp_path)
+        return upload_service
+
+    session_id = service(db).create_session(UploadSessionCreate(
+        file_name="notes.txt", total_size=4, chunk_size=4, title="Notes"
+    ), admin_id)["session_id"]
+
+    retry_db = sessionmaker(bind=db_engine)()
+    try:
+        # Had the retry waited for the row lock on the event loop, the first write could
+        # never finish; the lock timeout turns that hang into an error
+        retry_db.execute(text("SET lock_timeout = '2s'"))
+        results = await asyncio.gather(
+            service(db).write_chunk(session_id, admin_id, 0, b"abcd"),
+            service(retry_db).write_chunk(session_id, admin_id, 0, b"abcd"),
+        )
+    finally:
+        retry_db.close()
+
+    assert [result["received_bytes"] for result in results] == [4, 4]
+    assert (tmp_path / "tmp" / f"session-{session_id}.part").read_bytes() == b"abcd"
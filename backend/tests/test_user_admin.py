@@ -0,0 +1,100 @@
+from datetime import datetime
+
+import pytest
+from jose import jwt
+from sqlalchemy import text
+
+from src.core import auth
+from src.core.config import settings
+from src.schemas import UserCreate
+from src.services import user_service as user_service_module
+from src.services.user_service import UserService
+
+EMAIL = "employee@docrepo.com"
+
+
+@pytest.fixture
+def employee(db) -> str:
+    return str(db.execute(text("""
+        INSERT INTO users (email, password_hash, first_name, last_name, department_id, role_id)
+        SELECT :email, 'x', 'Erin', 'Employee', d.department_id, r.role_id
+        FROM departments d, roles r
+        WHERE d.name = 'Finance' AND r.name = 'Employee'
+        RETURNING user_id
+    """), {"email": EMAIL}).scalar())
+
+
+@pytest.fixture
+def orm_reference_columns(db):
+    # The Department and Role models map columns that migrate_data.py creates
+    # but database_setup.sql does not
+    db.execute(text("""
+        ALTER TABLE departments ADD COLUMN code VARCHAR(20), ADD COLUMN is_active BOOLEAN DEFAULT true;
+        ALTER TABLE roles ADD COLUMN is_active BOOLEAN DEFAULT true
+    """))
+    db.commit()
+
+
+def test_deactivation_revokes_sessions_and_cached_principal(db, employee):
+    service = UserService(db)
+    refresh_token = service._start_session(employee)
+    auth.principal_cache.set(EMAIL, {"email": EMAIL, "is_active": True})
+
+    assert service.set_user_active(EMAIL, False)
+
+    assert auth.principal_cache.get(EMAIL) is None
+    assert service.refresh_session(refresh_token) is None
+    assert service.get_current_user(EMAIL)["is_active"] is False
+
+
+def test_assignment_change_invalidates_cached_principal(db, employee, orm_reference_columns):
+    service = UserService(db)
+    role_id = str(db.execute(text("SELECT role_id FROM roles WHERE name = 'Manager'")).scalar())
+    department_id = str(db.execute(text("SELECT department_id FROM departments WHERE name = 'Marketing'")).scalar())
+    auth.principal_cache.set(EMAIL, {"email": EMAIL, "role_name": "Employee"})
+
+    assert service.change_user_assignment(EMAIL, department_id, role_id)
+
+    assert auth.principal_cache.get(EMAIL) is None
+    user = service.get_current_user(EMAIL)
+    assert (user["role_name"], user["department_name"]) == ("Manager", "Marketing")
+
+
+def test_assignment_change_rejects_unknown_role(db, employee, orm_reference_columns):
+    department_id = str(db.execute(text("SELECT department_id FROM departments LIMIT 1")).scalar())
+    with pytest.raises(ValueError):
+        UserService(db).change_user_assignment(EMAIL, department_id, "00000000-0000-0000-0000-000000000000")
+
+
+async def test_registration_creates_a_session_and_rejects_duplicates(db, orm_reference_columns, monkeypatch):
+    async def fake_hash(password):
+        return "x"
+
+    monkeypatch.setattr(user_service_module, "get_password_hash_async", fake_hash)
+    user_data = UserCreate(
+        email=EMAIL, password="secret", first_name="Erin", last_name="Employee",
+        department_id=str(db.execute(text("SELECT department_id FROM departments WHERE name = 'Finance'")).scalar()),
+        role_id=str(db.execute(text("SELECT role_id FROM roles WHERE name = 'Employee'")).scalar())
+    )
+
+    tokens = await UserService(db).register_user(user_data)
+
+    assert tokens["user"]["email"] == EMAIL
+    assert db.execute(text("SELECT COUNT(*) FROM auth_sessions")).scalar() == 1
+    with pytest.raises(ValueError):
+        await UserService(db).register_user(user_data)
+
+
+@pytest.mark.parametrize("trust_claims, expected_minutes", [(False, 30), (True, 5)])
+def test_trusted_claim_tokens_are_short_lived(monkeypatch, trust_claims, expected_minutes):
+    monkeypatch.setattr(settings, "ACCESS_TOKEN_EXPIRE_MINUTES", 30)
+    monkeypatch.setattr(settings, "AUTH_TRUSTED_TOKEN_EXPIRE_MINUTES", 5)
+    monkeypatch.setattr(settings, "AUTH_TRUST_TOKEN_CLAIMS", trust_claims)
+    user = {"email": EMAIL, "user_id": "u1", "first_name": "Erin", "last_name": "Employee",
+            "department_name": "Finance", "role_name": "Employee", "created_at": None}
+
+    token = UserService(None)._issue_tokens(user, "refresh")["access_token"]
+
+    expires = jwt.decode(token, auth.SECRET_KEY, algorithms=[auth.ALGORITHM])["exp"]
+    remaining = expires - datetime.utcnow().timestamp()
+    assert expected_minutes * 60 - 5 < remaining <= expected_minutes * 60 + 5
@@ -11,10 +11,16 @@
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 
 -- Drop all tables if they exist (in reverse dependency order)
+DROP TABLE IF EXISTS document_summary CASCADE;
+DROP VIEW IF EXISTS document_summary_source;
 DROP TABLE IF EXISTS user_document_permissions CASCADE;
 DROP TABLE IF EXISTS document_audit CASCADE;
 DROP TABLE IF EXISTS document_permissions CASCADE;
+DROP TABLE IF EXISTS auth_sessions CASCADE;
+DROP TABLE IF EXISTS upload_sessions CASCADE;
 DROP TABLE IF EXISTS document_tags CASCADE;
+DROP TABLE IF EXISTS document_contents CASCADE;
+DROP TABLE IF EXISTS blobs CASCADE;
 DROP TABLE IF EXISTS document_versions CASCADE;
 DROP TABLE IF EXISTS documents CASCADE;
 DROP TABLE IF EXISTS tags CASCADE;
@@ -64,7 +70,18 @@ CREATE TABLE documents (
     current_version_id UUID,
     created_at TIMESTAMP DEFAULT NOW(),
     updated_at TIMESTAMP DEFAULT NOW(),
-    is_active BOOLEAN DEFAULT TRUE
+    is_active BOOLEAN DEFAULT TRUE,
+    -- True while the document has an active document_permissions grant; only its creator,
+    -- grantees and administrators may then read it (kept up to date by a trigger)
+    is_restricted BOOLEAN NOT NULL DEFAULT FALSE,
+    -- Extracted body text of the current version, copied from document_contents
+    content_vector TSVECTOR,
+    -- Full-text search vector, kept up to date by Postgres on every insert/update
+    search_vector TSVECTOR GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'B') ||
+        coalesce(content_vector, ''::tsvector)
+    ) STORED
 );
 
 -- Create document_versions table
@@ -84,6 +101,26 @@ CREATE TABLE document_versions (
     CONSTRAINT positive_version_number CHECK (version_number > 0)
 );
 
+-- Create blobs table (content-addressed file store, one row per distinct SHA-256)
+CREATE TABLE blobs (
+    checksum VARCHAR(64) PRIMARY KEY,
+    file_path VARCHAR(500) NOT NULL,
+    file_size BIGINT NOT NULL,
+    ref_count INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT NOW()
+);
+
+-- Create document_contents table (text extracted from uploaded files, one row per distinct checksum)
+CREATE TABLE document_contents (
+    checksum VARCHAR(64) PRIMARY KEY,
+    content TEXT,
+    status VARCHAR(20) NOT NULL CHECK (status IN ('extracted', 'truncated', 'unsupported', 'failed')),
+    content_vector TSVECTOR GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(content, '')), 'C')
+    ) STORED,
+    extracted_at TIMESTAMP DEFAULT NOW()
+);
+
 -- Create tags table
 CREATE TABLE tags (
     tag_id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -102,6 +139,35 @@ CREATE TABLE document_tags (
     PRIMARY KEY (document_id, tag_id)
 );
 
+-- Create auth_sessions table (refresh-token sessions, keyed by the SHA-256 of the token)
+CREATE TABLE auth_sessions (
+    session_id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    user_id UUID NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+    token_hash VARCHAR(64) NOT NULL UNIQUE,
+    previous_token_hash VARCHAR(64) UNIQUE,
+    created_at TIMESTAMP DEFAULT NOW(),
+    last_used_at TIMESTAMP DEFAULT NOW(),
+    expires_at TIMESTAMP NOT NULL,
+    revoked_at TIMESTAMP
+);
+
+-- Create upload_sessions table (resumable chunked uploads in progress)
+CREATE TABLE upload_sessions (
+    session_id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    user_id UUID NOT NULL REFERENCES users(user_id) ON DELETE CASCADE,
+    document_id UUID REFERENCES documents(document_id) ON DELETE CASCADE,
+    title VARCHAR(255),
+    description TEXT,
+    tags TEXT,
+    file_name VARCHAR(255) NOT NULL,
+    file_type VARCHAR(100),
+    total_size BIGINT NOT NULL,
+    chunk_size INTEGER NOT NULL,
+    received_bytes BIGINT NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT NOW(),
+    expires_at TIMESTAMP NOT NULL
+);
+
 -- Create document_permissions table
 CREATE TABLE document_permissions (
     permission_id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
@@ -115,18 +181,40 @@ CREATE TABLE document_permissions (
     is_active BOOLEAN DEFAULT TRUE
 );
 
--- Create document_audit table
+-- Create document_audit table (written in batches by the API's audit logger; no foreign
+-- key to documents, so the trail of a deleted document is kept). Range-partitioned by
+-- month on timestamp: the API creates upcoming partitions and drops those past
+-- AUDIT_RETENTION_MONTHS; rows outside every monthly partition land in the default one.
 CREATE TABLE document_audit (
-    audit_id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
-    document_id UUID NOT NULL REFERENCES documents(document_id) ON DELETE CASCADE,
+    audit_id UUID NOT NULL DEFAULT uuid_generate_v4(),
+    document_id UUID NOT NULL,
     user_id UUID NOT NULL REFERENCES users(user_id),
     action VARCHAR(50) NOT NULL,
     old_values JSONB,
     new_values JSONB,
-    timestamp TIMESTAMP DEFAULT NOW(),
+    timestamp TIMESTAMP NOT NULL DEFAULT NOW(),
     ip_address INET,
-    user_agent TEXT
-);
+    user_agent TEXT,
+    PRIMARY KEY (audit_id, timestamp)
+) PARTITION BY RANGE (timestamp);
+
+CREATE TABLE document_audit_default PARTITION OF document_audit DEFAULT;
+
+-- Partitions for this month and the next three; named document_audit_yYYYYmMM
+DO $$
+DECLARE
+    month_start DATE;
+BEGIN
+    FOR i IN 0..3 LOOP
+        month_start := (date_trunc('month', NOW()) + make_interval(months => i))::date;
+        EXECUTE format(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF document_audit FOR VALUES FROM (%L) TO (%L)',
+            'document_audit_' || to_char(month_start, '"y"YYYY"m"MM'),
+            month_start, (month_start + INTERVAL '1 month')::date
+        );
+    END LOOP;
+END;
+$$;
 
 -- Create user_document_permissions table
 CREATE TABLE user_document_permissions (
@@ -146,14 +234,234 @@ CREATE INDEX idx_users_email ON users(email);
 CREATE INDEX idx_users_department ON users(department_id);
 CREATE INDEX idx_users_role ON users(role_id);
 CREATE INDEX idx_documents_created_by ON documents(created_by);
-CREATE INDEX idx_documents_created_at ON documents(created_at);
+-- Matches the listing order so keyset pagination is a single index range scan
+CREATE INDEX idx_documents_created_at ON documents(created_at DESC, document_id DESC);
+CREATE INDEX idx_documents_search_vector ON documents USING GIN (search_vector);
 CREATE INDEX idx_document_versions_document_id ON document_versions(document_id);
-CREATE INDEX idx_document_versions_is_current ON document_versions(is_current);
+-- At most one current version per document; also serves current-version lookups
+CREATE UNIQUE INDEX idx_document_versions_current ON document_versions(document_id) WHERE is_current;
+CREATE INDEX idx_document_versions_checksum ON document_versions(checksum);
 CREATE INDEX idx_document_tags_document_id ON document_tags(document_id);
 CREATE INDEX idx_document_tags_tag_id ON document_tags(tag_id);
-CREATE INDEX idx_document_permissions_document_id ON document_permissions(document_id);
-CREATE INDEX idx_document_audit_document_id ON document_audit(document_id);
-CREATE INDEX idx_document_audit_timestamp ON document_audit(timestamp);
+CREATE INDEX idx_auth_sessions_user_id ON auth_sessions(user_id);
+CREATE INDEX idx_upload_sessions_expires_at ON upload_sessions(expires_at);
+-- ACL checks: per-document probes (covering the principal columns) and per-principal grant lookups
+CREATE INDEX idx_document_permissions_document_id ON document_permissions(document_id)
+    INCLUDE (user_id, role_id, department_id) WHERE is_active;
+CREATE INDEX idx_document_permissions_user_id ON document_permissions(user_id) WHERE is_active;
+CREATE INDEX idx_document_permissions_role_id ON document_permissions(role_id) WHERE is_active;
+CREATE INDEX idx_document_permissions_department_id ON document_permissions(department_id) WHERE is_active;
+CREATE INDEX idx_user_document_permissions_document_id ON user_document_permissions(document_id, user_id);
+-- Audit trails are read per document or user within a time window; BRIN keeps
+-- time-range scans cheap on the append-only partitions
+CREATE INDEX idx_document_audit_document_id ON document_audit(document_id, timestamp);
+CREATE INDEX idx_document_audit_user_id ON document_audit(user_id, timestamp);
+CREATE INDEX idx_document_audit_timestamp ON document_audit USING BRIN (timestamp);
+
+-- Document listing read model: one row per document with everything GET /api/documents
+-- returns, so the listing is a single-table read. document_summary_source computes the
+-- rows from the normalized tables; triggers refresh affected documents in the writing
+-- transaction. Rebuild/verify with: python -m src.maintenance rebuild-document-summary
+-- (or check-document-summary). Versions are immutable apart from is_current and
+-- file_path, and the current one is tracked by documents.current_version_id, so
+-- document_versions needs no trigger.
+CREATE OR REPLACE VIEW document_summary_source AS
+SELECT
+    d.document_id, d.title, d.description, d.created_by, d.created_at,
+    u.first_name || ' ' || u.last_name AS creator_name,
+    dept.name AS department_name,
+    dv.version_id, dv.version_number, dv.file_name, dv.file_type, dv.file_size, dv.uploaded_at,
+    COALESCE(
+        (SELECT array_agg(t.name::text ORDER BY t.name)
+         FROM document_tags dt
+         JOIN tags t ON t.tag_id = dt.tag_id
+         WHERE dt.document_id = d.document_id),
+        '{}'
+    ) AS tag_names,
+    d.search_vector,
+    d.is_restricted
+FROM documents d
+JOIN users u ON d.created_by = u.user_id
+JOIN departments dept ON u.department_id = dept.department_id
+LEFT JOIN document_versions dv ON dv.version_id = d.current_version_id;
+
+CREATE TABLE document_summary (
+    document_id UUID PRIMARY KEY REFERENCES documents(document_id) ON DELETE CASCADE,
+    title VARCHAR(255) NOT NULL,
+    description TEXT,
+    created_by UUID NOT NULL,
+    created_at TIMESTAMP,
+    creator_name TEXT,
+    department_name VARCHAR(100),
+    version_id UUID,
+    version_number INTEGER,
+    file_name VARCHAR(255),
+    file_type VARCHAR(100),
+    file_size BIGINT,
+    uploaded_at TIMESTAMP,
+    tag_names TEXT[] NOT NULL DEFAULT '{}',
+    search_vector TSVECTOR,
+    is_restricted BOOLEAN NOT NULL DEFAULT FALSE
+);
+
+-- Same order as the listing, so keyset pagination is a single index range scan
+CREATE INDEX idx_document_summary_created_at ON document_summary(created_at DESC, document_id DESC);
+CREATE INDEX idx_document_summary_search_vector ON document_summary USING GIN (search_vector);
+CREATE INDEX idx_document_summary_tag_names ON document_summary USING GIN (tag_names);
+
+-- Recompute the summary rows of the given documents (removing rows of deleted ones)
+CREATE OR REPLACE FUNCTION refresh_document_summary(ids UUID[]) RETURNS VOID AS $$
+BEGIN
+    DELETE FROM document_summary s
+    WHERE s.document_id = ANY(ids)
+      AND NOT EXISTS (SELECT 1 FROM documents d WHERE d.document_id = s.document_id);
+
+    INSERT INTO document_summary (
+        document_id, title, description, created_by, created_at, creator_name, department_name,
+        version_id, version_number, file_name, file_type, file_size, uploaded_at,
+        tag_names, search_vector, is_restricted
+    )
+    SELECT
+        src.document_id, src.title, src.description, src.created_by, src.created_at,
+        src.creator_name, src.department_name, src.version_id, src.version_number,
+        src.file_name, src.file_type, src.file_size, src.uploaded_at,
+        src.tag_names, src.search_vector, src.is_restricted
+    FROM document_summary_source src
+    WHERE src.document_id = ANY(ids)
+    ON CONFLICT (document_id) DO UPDATE SET
+        title = EXCLUDED.title,
+        description = EXCLUDED.description,
+        created_by = EXCLUDED.created_by,
+        created_at = EXCLUDED.created_at,
+        creator_name = EXCLUDED.creator_name,
+        department_name = EXCLUDED.department_name,
+        version_id = EXCLUDED.version_id,
+        version_number = EXCLUDED.version_number,
+        file_name = EXCLUDED.file_name,
+        file_type = EXCLUDED.file_type,
+        file_size = EXCLUDED.file_size,
+        uploaded_at = EXCLUDED.uploaded_at,
+        tag_names = EXCLUDED.tag_names,
+        search_vector = EXCLUDED.search_vector,
+        is_restricted = EXCLUDED.is_restricted;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Statement-level triggers: a bulk insert refreshes each affected document once
+CREATE OR REPLACE FUNCTION document_summary_new_rows() RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM refresh_document_summary(ARRAY(SELECT DISTINCT document_id FROM new_rows));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION document_summary_old_rows() RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM refresh_document_summary(ARRAY(SELECT DISTINCT document_id FROM old_rows));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER document_summary_documents_insert
+    AFTER INSERT ON documents REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION document_summary_new_rows();
+CREATE TRIGGER document_summary_documents_update
+    AFTER UPDATE ON documents REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION document_summary_new_rows();
+CREATE TRIGGER document_summary_tags_insert
+    AFTER INSERT ON document_tags REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION document_summary_new_rows();
+CREATE TRIGGER document_summary_tags_delete
+    AFTER DELETE ON document_tags REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION document_summary_old_rows();
+
+-- Creator, department and tag renames are rare and fan out to that entity's documents
+CREATE OR REPLACE FUNCTION document_summary_user_changed() RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM refresh_document_summary(ARRAY(
+        SELECT document_id FROM documents WHERE created_by = NEW.user_id
+    ));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION document_summary_department_changed() RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM refresh_document_summary(ARRAY(
+        SELECT d.document_id
+        FROM documents d
+        JOIN users u ON d.created_by = u.user_id
+        WHERE u.department_id = NEW.department_id
+    ));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION document_summary_tag_changed() RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM refresh_document_summary(ARRAY(
+        SELECT document_id FROM document_tags WHERE tag_id = NEW.tag_id
+    ));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER document_summary_users_update
+    AFTER UPDATE OF first_name, last_name, department_id ON users
+    FOR EACH ROW
+    WHEN (OLD.first_name IS DISTINCT FROM NEW.first_name
+          OR OLD.last_name IS DISTINCT FROM NEW.last_name
+          OR OLD.department_id IS DISTINCT FROM NEW.department_id)
+    EXECUTE FUNCTION document_summary_user_changed();
+CREATE TRIGGER document_summary_departments_update
+    AFTER UPDATE OF name ON departments
+    FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+    EXECUTE FUNCTION document_summary_department_changed();
+CREATE TRIGGER document_summary_tags_rename
+    AFTER UPDATE OF name ON tags
+    FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+    EXECUTE FUNCTION document_summary_tag_changed();
+
+-- documents.is_restricted follows the active grants in document_permissions (and, through
+-- the documents trigger above, document_summary does too)
+CREATE OR REPLACE FUNCTION sync_document_restricted(ids UUID[]) RETURNS VOID AS $$
+BEGIN
+    UPDATE documents d
+    SET is_restricted = EXISTS (
+        SELECT 1 FROM document_permissions p
+        WHERE p.document_id = d.document_id AND p.is_active
+    )
+    WHERE d.document_id = ANY(ids)
+      AND d.is_restricted IS DISTINCT FROM EXISTS (
+          SELECT 1 FROM document_permissions p
+          WHERE p.document_id = d.document_id AND p.is_active
+      );
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION document_restricted_new_rows() RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM sync_document_restricted(ARRAY(SELECT DISTINCT document_id FROM new_rows));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION document_restricted_old_rows() RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM sync_document_restricted(ARRAY(SELECT DISTINCT document_id FROM old_rows));
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER document_restricted_permissions_insert
+    AFTER INSERT ON document_permissions REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION document_restricted_new_rows();
+CREATE TRIGGER document_restricted_permissions_update
+    AFTER UPDATE ON document_permissions REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION document_restricted_new_rows();
+CREATE TRIGGER document_restricted_permissions_delete
+    AFTER DELETE ON document_permissions REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION document_restricted_old_rows();
 
 -- Insert default departments
 INSERT INTO departments (department_id, name, description) VALUES
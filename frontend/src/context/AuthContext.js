@@ -26,6 +26,7 @@ export const AuthProvider = ({ children }) => {
       } catch (error) {
         console.error('Error parsing user data:', error);
         localStorage.removeItem('token');
+        localStorage.removeItem('refreshToken');
         localStorage.removeItem('user');
       }
     }
@@ -46,12 +47,13 @@ export const AuthProvider = ({ children }) => {
       console.log(`🔍 API call completed in ${(apiEndTime - apiStartTime).toFixed(3)}ms`);
       console.log("🔍 Response received:", response);
       
-      const { access_token, user: userData } = response;
+      const { access_token, refresh_token, user: userData } = response;
       
       console.log("🔍 Storing token and user data...");
       const storageStartTime = performance.now();
       
       localStorage.setItem('token', access_token);
+      localStorage.setItem('refreshToken', refresh_token);
       localStorage.setItem('user', JSON.stringify(userData));
       setUser(userData);
       
@@ -92,9 +94,10 @@ export const AuthProvider = ({ children }) => {
   const register = async (userData) => {
     try {
       const response = await authAPI.register(userData);
-      const { access_token, user: newUser } = response;
+      const { access_token, refresh_token, user: newUser } = response;
       
       localStorage.setItem('token', access_token);
+      localStorage.setItem('refreshToken', refresh_token);
       localStorage.setItem('user', JSON.stringify(newUser));
       setUser(newUser);
       
@@ -121,7 +124,13 @@ export const AuthProvider = ({ children }) => {
   };
 
   const logout = () => {
+    const refreshToken = localStorage.getItem('refreshToken');
+    if (refreshToken) {
+      // End the server-side session; local sign-out does not wait for it
+      authAPI.logout(refreshToken).catch(() => {});
+    }
     localStorage.removeItem('token');
+    localStorage.removeItem('refreshToken');
     localStorage.removeItem('user');
     setUser(null);
   };
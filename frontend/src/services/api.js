@@ -10,6 +10,10 @@ const api = axios.create({
   },
 });
 
+// After a write the API pins this client to the primary database for a few seconds so it
+// reads its own writes. The pin cookie is not sent cross-origin, so echo the pin header.
+let primaryPinnedUntil = null;
+
 // Add token to requests if available
 api.interceptors.request.use(
   (config) => {
@@ -17,6 +21,9 @@ api.interceptors.request.use(
     if (token) {
       config.headers.Authorization = `Bearer ${token}`;
     }
+    if (primaryPinnedUntil) {
+      config.headers['X-Primary-Until'] = primaryPinnedUntil;
+    }
     return config;
   },
   (error) => {
@@ -24,12 +31,74 @@ api.interceptors.request.use(
   }
 );
 
+// Refresh the access token once per expiry, shared by all requests that hit the 401.
+// Tabs share the tokens in localStorage: the refresh runs under a cross-tab lock where
+// supported, and a tab whose token was already rotated by another tab uses the stored one
+// instead of presenting its spent refresh token (which would revoke the session).
+let refreshPromise = null;
+
+const rotateTokens = async (staleToken) => {
+  const storedToken = localStorage.getItem('token');
+  if (storedToken && storedToken !== staleToken) {
+    return storedToken;
+  }
+  const refreshToken = localStorage.getItem('refreshToken');
+  if (!refreshToken) {
+    throw new Error('No refresh token');
+  }
+  try {
+    const response = await axios.post(`${API_BASE_URL}/api/auth/refresh`, { refresh_token: refreshToken });
+    localStorage.setItem('token', response.data.access_token);
+    localStorage.setItem('refreshToken', response.data.refresh_token);
+    localStorage.setItem('user', JSON.stringify(response.data.user));
+    return response.data.access_token;
+  } catch (error) {
+    // Another tab rotated the refresh token while this request was in flight
+    const currentRefreshToken = localStorage.getItem('refreshToken');
+    if (currentRefreshToken && currentRefreshToken !== refreshToken) {
+      return localStorage.getItem('token');
+    }
+    throw error;
+  }
+};
+
+const refreshAccessToken = (staleToken) => {
+  if (!refreshPromise) {
+    const rotate = () => rotateTokens(staleToken);
+    refreshPromise = (navigator.locks ? navigator.locks.request('docrepo-token-refresh', rotate) : rotate())
+      .finally(() => {
+        refreshPromise = null;
+      });
+  }
+  return refreshPromise;
+};
+
 // Handle token expiration
 api.interceptors.response.use(
-  (response) => response,
-  (error) => {
+  (response) => {
+    const pinnedUntil = response.headers['x-primary-until'];
+    if (pinnedUntil) {
+      primaryPinnedUntil = pinnedUntil;
+    }
+    return response;
+  },
+  async (error) => {
+    const original = error.config;
+    const isAuthCall = original?.url?.startsWith('/api/auth/');
+    if (error.response?.status === 401 && original && !original._retried && !isAuthCall) {
+      original._retried = true;
+      try {
+        const staleToken = original.headers?.Authorization?.replace('Bearer ', '');
+        const token = await refreshAccessToken(staleToken);
+        original.headers.Authorization = `Bearer ${token}`;
+        return api(original);
+      } catch (refreshError) {
+        // Fall through to a fresh login
+      }
+    }
     if (error.response?.status === 401) {
       localStorage.removeItem('token');
+      localStorage.removeItem('refreshToken');
       localStorage.removeItem('user');
       window.location.href = '/login';
     }
@@ -64,6 +133,10 @@ export const authAPI = {
     const response = await api.post('/api/auth/register', userData);
     return response.data;
   },
+
+  logout: async (refreshToken) => {
+    await api.post('/api/auth/logout', { refresh_token: refreshToken });
+  },
 };
 
 // Documents API - Updated for optimized server with /api prefix